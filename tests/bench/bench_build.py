@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark skalowania builda na syntetycznym CMS.
+
+Dla każdego rozmiaru (domyślnie 100, 1k, 10k, 50k stron × 7 lokali) tworzy
+osobny workspace (synth.workspace) i uruchamia etapy w świeżych procesach,
+mierząc czas ścienny, czas CPU (user+sys) i szczytowe RSS procesu:
+  cms_parse     – cms_ingest.load_all bez snapshotu (czysty parse workbooka)
+  build_cold    – tools/build.py --force na pustych cache'ach
+  build_warm    – tools/build.py drugi raz (snapshot CMS + manifest stron)
+  cms_snapshot  – cms_ingest.load_all z trafieniem w snapshot
+Dla etapów builda dochodzą etapy z build-profile.json (np. build_cold/render).
+
+Wyniki trafiają do --out (JSON). --update-baseline zapisuje je jako baseline;
+w przeciwnym razie wyniki są porównywane z baseline i etap wolniejszy
+o więcej niż --threshold procent (oraz ponad próg szumu) kończy z kodem 1.
+
+  python tests/bench/bench_build.py --sizes 100,1000
+  python tests/bench/bench_build.py --update-baseline
+"""
+from __future__ import annotations
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import synth
+
+REPO = synth.REPO
+TOOLS = REPO / "tools"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+RESULTS = REPO / ".build-cache" / "bench-results.json"
+DEFAULT_SIZES = (100, 1_000, 10_000, 50_000)
+BENCH_VERSION = 1
+
+_LOAD_ALL = (
+    "import sys; from pathlib import Path; sys.path.insert(0, {tools!r}); "
+    "import cms_ingest; cms_ingest.load_all(Path('data/cms'))"
+)
+
+# ------------------------------ POMIAR ------------------------------
+def measure(cmd: Sequence[str], cwd: Path, env: Dict[str, str], log: Path) -> Dict[str, float]:
+    """Uruchamia ``cmd`` i zwraca wall_s, cpu_s i rss_mb (rusage tylko tego procesu)."""
+    with open(log, "ab") as fh:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(list(cmd), cwd=cwd, env=env, stdout=fh, stderr=subprocess.STDOUT)
+        _, status, ru = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(cmd)} -> exit {proc.returncode} (log: {log})")
+    return {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(ru.ru_utime + ru.ru_stime, 4),
+        "rss_mb": round(ru.ru_maxrss / 1024, 1),  # Linux: KiB
+    }
+
+def stages(ws: Path) -> List[tuple]:
+    py, build = sys.executable, str(TOOLS / "build.py")
+    load_all = [py, "-c", _LOAD_ALL.format(tools=str(TOOLS))]
+    return [
+        ("cms_parse", load_all, {"CMS_SNAPSHOT": "0"}),
+        ("build_cold", [py, build, "--force"], {}),
+        ("build_warm", [py, build], {}),
+        ("cms_snapshot", load_all, {}),
+    ]
+
+def build_spans(stage: str, ws: Path) -> Dict[str, Dict[str, float]]:
+    """Etapy z dist/_reports/build-profile.json jako ``<stage>/<span>`` (wall_s, cpu_s)."""
+    try:
+        data = json.loads((ws / "dist" / "_reports" / "build-profile.json").read_text("utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        f"{stage}/{sp['name']}": {"wall_s": sp["wall_s"], "cpu_s": sp["cpu_s"]}
+        for sp in data.get("spans", [])
+    }
+
+def run_size(pages: int, workdir: Path, jobs: Optional[int] = None) -> Dict[str, Any]:
+    ws = synth.workspace(workdir / f"pages-{pages}", pages)
+    env = {k: v for k, v in os.environ.items() if k not in ("CMS_SOURCE", "CMS_SNAPSHOT", "LOCAL_XLSX")}
+    env["CMS_SNAPSHOT_DIR"] = str(ws / "data" / "cms" / ".cache")
+    if jobs is not None:
+        env["BUILD_JOBS"] = str(jobs)
+    for p in ("dist", ".build-cache", "data/cms/.cache"):
+        shutil.rmtree(ws / p, ignore_errors=True)
+    out: Dict[str, Any] = {}
+    for name, cmd, extra in stages(ws):
+        out[name] = measure(cmd, ws, {**env, **extra}, ws / "bench.log")
+        if name.startswith("build_"):
+            out.update(build_spans(name, ws))
+        print(f"[bench] {pages:>6} pages  {name:<13} "
+              f"wall={out[name]['wall_s']:.2f}s cpu={out[name]['cpu_s']:.2f}s rss={out[name]['rss_mb']:.0f}MB",
+              flush=True)
+    out["pages_rendered"] = sum(1 for _ in (ws / "dist").rglob("index.html"))
+    return out
+
+# ------------------------------ BASELINE ------------------------------
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_seconds: float = 0.05, min_rss_mb: float = 8.0) -> List[str]:
+    """Lista regresji: metryka większa o > ``threshold`` % i ponad próg szumu.
+
+    Porównywane są tylko rozmiary i etapy obecne w obu wynikach.
+    """
+    floors = {"wall_s": min_seconds, "cpu_s": min_seconds, "rss_mb": min_rss_mb}
+    problems: List[str] = []
+    base_sizes = baseline.get("sizes", {})
+    for size, cur_stages in current.get("sizes", {}).items():
+        for stage, cur in cur_stages.items():
+            base = base_sizes.get(size, {}).get(stage)
+            if not isinstance(cur, dict) or not isinstance(base, dict):
+                continue
+            for metric, floor in floors.items():
+                b, c = base.get(metric), cur.get(metric)
+                if b is None or c is None:
+                    continue
+                if c - b > floor and c > b * (1 + threshold / 100):
+                    pct = (c / b - 1) * 100 if b else float("inf")
+                    problems.append(f"{size} pages {stage}.{metric}: {b} -> {c} (+{pct:.0f}%)")
+    return problems
+
+def _write(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", "utf-8")
+
+# ------------------------------ CLI ------------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                    help="liczby stron, po przecinku (domyślnie %(default)s)")
+    ap.add_argument("--jobs", type=int, default=None, help="BUILD_JOBS dla etapów builda")
+    ap.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_THRESHOLD", "20")),
+                    help="dopuszczalny wzrost metryki w %% (env BENCH_THRESHOLD, domyślnie 20)")
+    ap.add_argument("--min-seconds", type=float, default=0.05, help="próg szumu dla czasów")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--out", type=Path, default=RESULTS)
+    ap.add_argument("--workdir", type=Path, default=None, help="katalog workspace'ów (domyślnie tymczasowy)")
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="kras-bench-"))
+    result: Dict[str, Any] = {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} cpus={os.cpu_count()}",
+        "locales": len(synth.LOCALES),
+        "sizes": {},
+    }
+    try:
+        for n in sizes:
+            result["sizes"][str(n)] = run_size(n, workdir, args.jobs)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    _write(args.out, result)
+    print(f"[bench] wyniki: {args.out}")
+
+    if args.update_baseline:
+        _write(args.baseline, result)
+        print(f"[bench] baseline zapisany: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"[bench] brak baseline ({args.baseline}); uruchom z --update-baseline")
+        return 0
+    problems = compare(result, json.loads(args.baseline.read_text("utf-8")),
+                       args.threshold, args.min_seconds)
+    for p in problems:
+        print(f"[bench] REGRESJA {p}", file=sys.stderr)
+    if not problems:
+        print(f"[bench] OK (próg {args.threshold:g}%)")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
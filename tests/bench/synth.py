@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Syntetyczne dane CMS do benchmarku builda.
+- workbook(path, pages, services): menu.xlsx z arkuszami Pages/Nav/Strings
+  w kształcie produkcyjnego CMS; ``pages`` stron rozłożonych po wszystkich
+  lokalach, pierwsze ``services`` kluczy (poza home) ma typ service.
+- cities_csv(path, rows): city.csv z nagłówkiem city,voivodeship,slug,lang.
+- workspace(root, pages, services): kompletne drzewo do uruchomienia tools/build.py
+  (pages.yml, szablony, assets, data/) z danymi syntetycznymi zamiast realnych.
+Wszystko deterministyczne — ten sam rozmiar daje ten sam workbook.
+"""
+from __future__ import annotations
+import math, os, shutil
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+REPO = Path(__file__).resolve().parents[2]
+LOCALES: Sequence[str] = ("pl", "en", "de", "fr", "it", "ru", "ua")
+
+PAGES_HEADER = (
+    "lang", "type", "slug", "slugKey", "parentSlug", "template", "publish", "order",
+    "h1", "title", "seo_title", "meta_desc", "lead", "cta_label", "body_md",
+)
+NAV_HEADER = ("lang", "label", "href", "parent", "order", "col", "enabled")
+VOIVODESHIPS = ("mazowieckie", "łódzkie", "pomorskie", "śląskie", "małopolskie", "wielkopolskie")
+WORDS = ("transport", "spedycja", "ekspres", "chłodnia", "paleta", "magazyn", "odprawa", "flota")
+
+# ------------------------------ PAGES ------------------------------
+def page_rows(pages: int, services: int = 0) -> Iterator[tuple]:
+    """``pages`` wierszy Pages: ceil(pages/7) kluczy × 7 lokali (ostatni klucz przycięty).
+
+    Klucze 1..``services`` to usługi — źródło stron miasto × usługa.
+    """
+    keys = max(1, math.ceil(pages / len(LOCALES)))
+    n = 0
+    for k in range(keys):
+        key = "home" if k == 0 else f"svc-{k}"
+        for lang in LOCALES:
+            if n >= pages:
+                return
+            n += 1
+            word = WORDS[k % len(WORDS)]
+            title = f"{word.capitalize()} {k} — Kras-Trans ({lang})"
+            yield (
+                lang, "home" if k == 0 else ("service" if k <= services else "page"), "" if k == 0 else f"{word}-{k}", key,
+                "", "page.html", True, k,
+                title, title, f"{title} | Kras-Trans",
+                f"Szybka wycena i pewne terminy: {word} {k}. Flota EURO6, cała Europa, {lang}.",
+                f"Lead {word} {k} {lang}. " * 3, "Zamów wycenę",
+                "\n\n".join(f"Akapit {i}: {word} {k} " * 6 for i in range(3)),
+            )
+
+def nav_rows() -> Iterator[tuple]:
+    for lang in LOCALES:
+        for i, word in enumerate(WORDS[:5]):
+            yield (lang, word.capitalize(), f"/{lang}/{word}-{i + 1}/", "", i, "", True)
+
+def strings_rows() -> Iterator[tuple]:
+    for key in ("cta_quote", "nav_home", "footer_rights", "breadcrumbs_home"):
+        yield (key,) + tuple(f"{key} ({lang})" for lang in LOCALES)
+
+# ------------------------------ PLIKI ------------------------------
+def workbook(path: Path, pages: int, services: int = 0) -> Path:
+    """Zapisuje menu.xlsx (openpyxl write_only, więc 50k wierszy mieści się w pamięci)."""
+    from openpyxl import Workbook
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb = Workbook(write_only=True)
+    for title, header, rows in (
+        ("Pages", PAGES_HEADER, page_rows(pages, services)),
+        ("Nav", NAV_HEADER, nav_rows()),
+        ("Strings", ("key",) + tuple(LOCALES), strings_rows()),
+    ):
+        ws = wb.create_sheet(title)
+        ws.append(header)
+        for r in rows:
+            ws.append(r)
+    wb.save(path)
+    return path
+
+def cities_csv(path: Path, rows: int) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines: List[str] = ["city,voivodeship,slug,lang"]
+    for i in range(rows):
+        lang = LOCALES[i % len(LOCALES)]
+        lines.append(f"Miasto {i},{VOIVODESHIPS[i % len(VOIVODESHIPS)]},miasto-{i},{lang}")
+    path.write_text("\n".join(lines) + "\n", "utf-8")
+    return path
+
+def _link(src: Path, dst: Path) -> None:
+    try:
+        os.symlink(src, dst, target_is_directory=src.is_dir())
+    except OSError:
+        (shutil.copytree if src.is_dir() else shutil.copy2)(src, dst)
+
+def workspace(root: Path, pages: int, services: int = 0) -> Path:
+    """Drzewo builda w ``root``: kod i szablony z repo, CMS i city.csv syntetyczne."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    for name in ("templates", "assets"):
+        _link(REPO / name, root / name)
+    (root / "data" / "cms").mkdir(parents=True, exist_ok=True)
+    for p in (REPO / "data").iterdir():
+        if p.is_file():
+            _link(p, root / "data" / p.name)
+    cfg = (REPO / "pages.yml").read_text("utf-8")
+    (root / "pages.yml").write_text(cfg.replace("assets/media/city.csv", "bench/city.csv"), "utf-8")
+    workbook(root / "data" / "cms" / "menu.xlsx", pages, services)
+    cities_csv(root / "bench" / "city.csv", max(1, pages // len(LOCALES)))
+    return root
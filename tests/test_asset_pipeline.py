@@ -0,0 +1,71 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import asset_pipeline  # noqa: E402
+
+
+def _assets(root):
+    files = {"css/site.css": "body{background:url(/assets/img/bg.png)}", "img/bg.png": "PNG",
+             "js/site.js": "console.log(1)", "data/rates.csv": "a;b", "docs/cmr.pdf": "PDF",
+             "js/menu-bundle.pl.js": "stary"}
+    for rel, text in files.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text)
+
+
+def test_incremental_copy_exclusions_and_hashed_names(tmp_path):
+    src, dest, state = tmp_path / "assets", tmp_path / "dist" / "assets", tmp_path / "assets.json"
+    _assets(src)
+    dest.mkdir(parents=True)
+    (dest / "data").mkdir()
+    (dest / "data/rates.csv").write_text("a;b")  # kopia ze starszego builda
+    gen = ["js/menu-bundle.pl.js"]
+    rep = asset_pipeline.sync(src, dest, generated=gen, state_path=state)
+    assert (rep["copied"], rep["excluded"], rep["removed"], rep["hashed"]) == (4, 1, 1, 3)
+    assert not (dest / "data/rates.csv").exists() and not (dest / "js/menu-bundle.pl.js").exists()
+    files = rep["files"]
+    assert "/assets/docs/cmr.pdf" not in files and (dest / "docs/cmr.pdf").exists()
+    png, css = files["/assets/img/bg.png"], files["/assets/css/site.css"]
+    assert png.startswith("/assets/img/bg.") and png.endswith(".png") and len(png) == len("/assets/img/bg.png") + 9
+    assert (dest / css[len("/assets/"):]).read_text() == f"body{{background:url({png})}}"
+    assert (dest / "css/site.css").read_text() == "body{background:url(/assets/img/bg.png)}"
+
+    rep = asset_pipeline.sync(src, dest, generated=gen, state_path=state)
+    assert (rep["copied"], rep["unchanged"], rep["hashed"], rep["removed"]) == (0, 4, 0, 0)
+    assert rep["files"] == files
+
+
+def test_old_hashed_copies_survive_one_build(tmp_path):
+    src, dest, state = tmp_path / "assets", tmp_path / "dist", tmp_path / "assets.json"
+    _assets(src)
+    first = asset_pipeline.sync(src, dest, state_path=state)["files"]["/assets/js/site.js"]
+    (src / "js/site.js").write_text("console.log(2)")
+    second = asset_pipeline.sync(src, dest, state_path=state)["files"]["/assets/js/site.js"]
+    assert first != second
+    assert (dest / first[len("/assets/"):]).exists()  # strony z cache CDN
+    (src / "js/site.js").write_text("console.log(3)")
+    (src / "docs/cmr.pdf").unlink()
+    rep = asset_pipeline.sync(src, dest, state_path=state)
+    assert not (dest / first[len("/assets/"):]).exists() and (dest / second[len("/assets/"):]).exists()
+    assert not (dest / "docs/cmr.pdf").exists() and rep["removed"] == 2
+
+
+def test_manifest_and_headers():
+    mapping = {"/assets/js/site.js": "/assets/js/site.0123abcd.js"}
+    assert asset_pipeline.hashed_name("css/site.css", "0123abcdef") == "css/site.0123abcd.css"
+    assert asset_pipeline.hashed_name("v.1/LICENSE", "0123abcdef") == "v.1/LICENSE.0123abcd"
+    assert asset_pipeline.rewrite("src='/assets/js/site.js' /assets/js/x.js", mapping) == \
+        "src='/assets/js/site.0123abcd.js' /assets/js/x.js"
+    assert '"/assets/js/site.js": "/assets/js/site.0123abcd.js"' in asset_pipeline.manifest_json(mapping)
+    assert "/assets/js/site.0123abcd.js\n  Cache-Control: public, max-age=31536000, immutable\n" in \
+        asset_pipeline.headers_file(mapping)
+
+
+def test_built_pages_use_hashed_urls_and_cms_fallback_sees_them():
+    manifest = json.loads(Path("dist/assets/asset-manifest.json").read_text(encoding="utf-8"))["files"]
+    cms = manifest["/assets/js/cms.js"]
+    html = Path("dist/pl/index.html").read_text(encoding="utf-8")
+    assert f'<script defer src="{cms}"></script>' in html
+    assert f'script[src*="{cms}"]' in html  # fallback nie doładuje drugiej kopii
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import autolinks  # noqa: E402
+
+RULES = [
+    {"anchor": "transport drogowy", "href": "/pl/transport-drogowy/", "lang": "pl"},
+    {"anchor": "spedycja", "href": "/pl/spedycja/", "lang": ""},
+    {"anchor": "cennik", "href": "/pl/cennik/", "lang": "pl"},
+    {"anchor": "kontakt", "href": "/pl/kontakt/", "lang": "pl"},
+]
+CFG = {"inline": {"maxPerPage": 2, "minDistanceChars": 10, "ignoreSelectors": ["h1", ".hero"]},
+       "fallback": {"enabled": True, "limit": 3}}
+HTML = """<html><head><title>t</title></head><body><header><a href="https://ex.com/h">x</a></header>
+<main><h1>Transport drogowy</h1><div class="hero"><p>spedycja w hero</p><img src="/h.webp"></div>
+<article><p>Oferujemy Transport Drogowy i spedycja w całej Polsce.</p>
+<p>Nasza spedycja działa 24/7 <a href="https://ex.com">ex</a></p>
+<ul><li>Zobacz cennik usług, spedycja<!-- spedycja --></li></ul>
+<script>var x = "spedycja";</script><img src="/a.webp"></article></main></body></html>"""
+
+
+def _engine(**kw):
+    return autolinks.AutolinkEngine(RULES, {**CFG, **kw}, "https://kras-trans.com", ["pl", "en"])
+
+
+def test_inline_links_respect_ignored_subtrees_and_limits():
+    out, made, fb = _engine().apply(HTML, "pl", "/pl/kontakt/")
+    assert made == 2  # maxPerPage
+    assert '<a href="/pl/transport-drogowy/" title="transport drogowy">Transport Drogowy</a> i spedycja' in out
+    assert '<li>Zobacz cennik usług, <a href="/pl/spedycja/" title="spedycja">spedycja</a><!-- spedycja --></li>' in out
+    assert "<p>spedycja w hero</p>" in out and 'var x = "spedycja";' in out
+    # poza <main> nic się nie zmienia
+    assert out.startswith('<html><head><title>t</title></head><body><header><a href="https://ex.com/h">x</a></header>')
+    assert '<a href="https://ex.com" rel="noopener noreferrer" target="_blank">ex</a>' in out
+    assert '<img decoding="async" loading="lazy" src="/a.webp"/>' in out
+    # karty: reguły bez linku, bez strony bieżącej (kontakt), limit - made
+    assert fb == 1 and out.count('class="tile3d"') == 1 and 'href="/pl/cennik/"' in out
+
+
+def test_min_distance_and_no_rules():
+    html = "<main><p>Cennik.</p><p>spedycja</p><p>Tu jest nasz transport drogowy</p></main>"
+    out, made, fb = _engine(fallback={"enabled": False}).apply(html, "pl")
+    # jeden link na akapit; "spedycja" jest za blisko poprzedniego linku, trzeci akapit już nie
+    assert made == 2 and fb == 0
+    assert ">Cennik</a>.</p>" in out and "<p>spedycja</p>" in out and '>transport drogowy</a>' in out
+    assert _engine().apply(html, "de") == (html, 0, 0)
+    assert _engine().apply(html, "en")[1] == 1  # reguła bez języka działa wszędzie
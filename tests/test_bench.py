@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tests/bench").resolve()))
+sys.path.insert(0, str(Path("tools").resolve()))
+
+import bench_build  # noqa: E402
+import cms_ingest  # noqa: E402
+import synth  # noqa: E402
+
+
+def test_synthetic_workbook_has_requested_pages(tmp_path):
+    xlsx = synth.workbook(tmp_path / "menu.xlsx", 30)
+    sheets = cms_ingest.load_sheets(xlsx)
+    data = cms_ingest.normalize(sheets)
+    assert len(data["pages_rows"]) == 30
+    assert {p["lang"] for p in data["pages_rows"]} == set(synth.LOCALES)
+    assert data["menu_rows"], "Nav sheet should be detected as menu"
+
+
+def test_compare_flags_only_regressions_above_threshold_and_noise():
+    base = {"sizes": {"100": {"build_cold": {"wall_s": 2.0, "cpu_s": 2.0, "rss_mb": 80.0},
+                              "cms_parse": {"wall_s": 0.01, "cpu_s": 0.01, "rss_mb": 40.0}}}}
+    cur = {"sizes": {"100": {"build_cold": {"wall_s": 2.6, "cpu_s": 2.1, "rss_mb": 84.0},
+                             "cms_parse": {"wall_s": 0.03, "cpu_s": 0.03, "rss_mb": 40.0}},
+                     "1000": {"build_cold": {"wall_s": 99.0, "cpu_s": 99.0, "rss_mb": 500.0}}}}
+    problems = bench_build.compare(cur, base, threshold=20)
+    assert problems == ["100 pages build_cold.wall_s: 2.0 -> 2.6 (+30%)"]
+    assert bench_build.compare(cur, base, threshold=50) == []
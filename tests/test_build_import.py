@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+
+
+def test_import_has_no_side_effects(tmp_path):
+    # pusty katalog roboczy: bez pages.yml, workbooka i assets/
+    code = (
+        "import build\n"
+        "assert build._truthy('tak') and not build._truthy('0')\n"
+        "assert build.norm_slug('Kraków Nowa Huta') == 'krakow-nowa-huta'\n"
+        "assert build._CONTEXT is None\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(TOOLS)}
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
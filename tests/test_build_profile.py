@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPORT = Path("dist/_reports/build-profile.json")
+STAGES = ("cms_load", "menu_bundles", "render", "render/template", "render/head_injection",
+          "render/file_write", "sitemaps", "search_index", "feeds", "link_checker")
+
+
+def _profile(*args):
+    subprocess.run([sys.executable, "tools/build.py", *args], check=True)
+    return json.loads(REPORT.read_text(encoding="utf-8"))
+
+
+def test_build_profile_has_stage_spans():
+    data = _profile("--force")  # zimny build niezależnie od stanu .build-cache
+    spans = {s["name"]: s for s in data["spans"]}
+    for name in STAGES:
+        assert name in spans, f"missing span {name}"
+        assert spans[name]["wall_s"] >= 0 and spans[name]["cpu_s"] >= 0
+    render = spans["render"]["items"]
+    assert render["pages"] == render["rendered"] + render["cached"] and render["cached"] == 0
+    assert spans["render/template"]["calls"] == render["rendered"]
+    assert data["total"]["wall_s"] >= sum(s["wall_s"] for s in data["spans"] if "/" not in s["name"]) * 0.99
+    assert data["metrics"]["pages_count"] == render["pages"]
+
+
+def test_render_spans_present_with_warm_cache():
+    _profile()
+    data = _profile()
+    spans = {s["name"]: s for s in data["spans"]}
+    assert spans["render"]["items"]["rendered"] == 0
+    for name in STAGES:
+        assert name in spans, f"missing span {name}"
+    assert spans["render/template"]["calls"] == 0
@@ -0,0 +1,115 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("tests/bench").resolve()))
+sys.path.insert(0, str(Path("tools").resolve()))
+import city_service  # noqa: E402
+import synth  # noqa: E402
+
+BUILD = str(Path("tools/build.py").resolve())
+
+
+def _slug(s):
+    return "-".join(s.lower().split())
+
+
+CFG = {
+    "langs": ["pl", "en"],
+    "limits": {"perLang": 4000, "maxPages": 20000},
+    "slugPolicy": {"pattern": "{service.slug}-{city.slug}", "transliterate": True},
+    "fields": {
+        "type": "city_service",
+        "publish": True,
+        "h1": "{service.h1} — {city.name}",
+        "title": "{service.title or service.h1} — {city.name}",
+        "lead": "{service.lead or service.title}",
+    },
+}
+
+
+def test_compile_pattern_alternatives_and_constants():
+    fn = city_service.compile_pattern("{service.title or service.h1} — {city.name}")
+    assert fn({"service": {"h1": "Transport"}, "city": {"name": "Gdańsk"}}) == "Transport — Gdańsk"
+    assert fn({"service": {"title": "T", "h1": "H"}, "city": {}}) == "T — "
+    assert city_service.compile_pattern("stały")({}) == "stały"
+    with pytest.raises(ValueError):
+        city_service.compile_pattern("{service.h1()}")
+
+
+def test_records_follow_fields_slug_policy_and_languages():
+    services = [
+        {"lang": "pl", "slug": "przeprowadzki", "slugKey": "moving", "h1": "Przeprowadzki", "lead": "Szybko"},
+        {"lang": "en", "slug": "moving", "slugKey": "moving", "h1": "Moving"},
+    ]
+    places = [
+        {"lang": "pl", "city": "Nowy Sącz", "voivodeship": "małopolskie", "slug": ""},
+        {"lang": "en", "city": "Gdansk", "slug": "gdansk"},
+    ]
+    recs = list(city_service.CityServicePages(CFG, services, places, _slug, ["pl"]))
+    assert [(r.lang, r.slug, r.slug_key) for r in recs] == [
+        ("pl", "przeprowadzki-nowy-sącz", "moving__nowy-sącz"),
+        ("en", "moving-gdansk", "moving__gdansk"),
+    ]
+    page = recs[0].page()
+    assert page["h1"] == page["title"] == "Przeprowadzki — Nowy Sącz"
+    assert page["lead"] == "Szybko"
+    assert page["type"] == "city_service" and page["publish"] is True
+    assert page["canonical_path"] == "/pl/przeprowadzki-nowy-sącz/"
+    assert page["voivodeship"] == "małopolskie"
+    assert recs[1].page()["lead"] == ""
+
+
+def test_limits_and_lazy_generation_keep_memory_flat():
+    services = [{"lang": "", "slug": f"svc{i}", "slugKey": f"s{i}", "h1": f"Usługa {i}"} for i in range(6)]
+    places = [{"lang": L, "city": f"Miasto {i}", "slug": f"m{i}"} for L in ("pl", "en") for i in range(1000)]
+    cfg = {**CFG, "limits": {"perLang": 4000, "maxPages": 5000}}
+    pages = city_service.CityServicePages(cfg, services, places, _slug, [])
+    assert sum(1 for r in pages if r.lang == "pl") == 4000
+    assert sum(1 for _ in pages) == 5000  # każda iteracja od nowa
+
+    tracemalloc.start()
+    for _ in pages:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 256 * 1024
+
+
+def _sitemap_locs(dist):
+    return "".join(gzip.decompress(p.read_bytes()).decode() for p in dist.glob("sitemap-*.xml.gz"))
+
+
+def test_thin_city_pages_from_cms_services_stay_out_of_sitemap():
+    # usługi z arkusza Pages × city.csv; strony bez treści nie przechodzą thin_min_chars
+    html = Path("dist/pl/transport-drogowy-gdansk/index.html").read_text(encoding="utf-8")
+    assert '<meta name="robots" content="noindex,follow" />' in html
+    assert "https://kras-trans.com/pl/transport-drogowy-gdansk/" not in _sitemap_locs(Path("dist"))
+    assert not any("/pl/transport-drogowy-gdansk/" in p.read_text(encoding="utf-8")
+                   for p in Path("dist/search/pl").glob("d-*.json"))
+    urls = json.loads(Path("dist/_manifest.json").read_text(encoding="utf-8"))["urls"]
+    assert "pl/transport-drogowy-gdansk/index.html" not in urls  # IndexNow też jej nie zgłosi
+
+
+def test_quality_threshold_decides_city_page_indexing(tmp_path):
+    ws = synth.workspace(tmp_path / "ws", 14, services=1)
+    env = {k: v for k, v in os.environ.items() if k not in ("CMS_SOURCE", "CMS_SNAPSHOT", "LOCAL_XLSX")}
+    env["CMS_SNAPSHOT_DIR"] = str(ws / "data" / "cms" / ".cache")
+    page = ws / "dist" / "pl" / "spedycja-1-miasto-0" / "index.html"
+    loc = "<loc>https://kras-trans.com/pl/spedycja-1-miasto-0/</loc>"
+
+    subprocess.run([sys.executable, BUILD], cwd=ws, env=env, check=True, capture_output=True)
+    assert 'content="noindex,follow"' in page.read_text(encoding="utf-8")
+    assert loc not in _sitemap_locs(ws / "dist")
+
+    cfg = ws / "pages.yml"
+    cfg.write_text(cfg.read_text("utf-8").replace("thin_min_chars: 900", "thin_min_chars: 0"), "utf-8")
+    subprocess.run([sys.executable, BUILD], cwd=ws, env=env, check=True, capture_output=True)
+    assert 'content="index,follow"' in page.read_text(encoding="utf-8")
+    assert loc in _sitemap_locs(ws / "dist")
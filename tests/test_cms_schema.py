@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import cms_ingest  # noqa: E402
+import cms_schema  # noqa: E402
+
+
+def test_classification_uses_aliases():
+    pages = cms_schema.Sheet("Strony", ["Język", "URL", "slug_key", "Szablon", "Widoczne"])
+    assert pages.klass == "pages"
+    assert pages.field_col("pages", "lang") == 0
+    assert pages.field_col("pages", "key") == 2
+    menu = cms_schema.Sheet("Nav", ["lang", "label", "href", "enabled", "order"])
+    assert menu.klass == "menu"
+    assert cms_schema.Sheet("X", ["foo", "bar"]).klass == "collection"
+
+
+def test_columns_pad_short_and_long_rows():
+    sh = cms_schema.Sheet("S", ["a", "b", "a"])
+    cols = sh.columns("a", "b", "missing")
+    assert cols.get(sh.text(sh.pad((" x ", 2)))) == ("x", "2", "")
+    assert cols.get(sh.text(sh.pad(("x", None, "y", "beyond-header")))) == ("x", "", "")
+
+
+def test_normalize_single_pass_matches_per_class_semantics():
+    sheets = [
+        ("Pages", [
+            ("lang", "slug", "slugKey", "template", "publish", "order", "title", "h1", "seo_title", "meta_desc"),
+            ("pl", "/pl/kontakt/", "contact", "page.html", "TRUE", 2, "Kontakt", "Kontakt", "Kontakt", "Opis"),
+            (None, None),
+            ("en", "/en/", "", "", "no", "", "", "", "", ""),
+        ]),
+        ("Menu", [
+            ("lang", "label", "href", "enabled", "order", "col"),
+            ("pl", "Start", "/pl/", "tak", "1", None),
+            ("pl", "", "/pl/x/", "tak", None, None),
+        ]),
+        ("Strings", [("key", "pl", "en"), ("cta", "Zadzwoń", None)]),
+    ]
+    data = cms_ingest.normalize(sheets)
+    assert [(r["lang"], r["key"], r["slug"], r["order"]) for r in data["pages_rows"]] == [("pl", "contact", "kontakt", 2)]
+    assert data["routes"]["contact"] == {"pl": "kontakt"}
+    assert data["menu_rows"] == [{"lang": "pl", "label": "Start", "href": "/pl/", "parent": "",
+                                  "order": 1, "col": 1, "enabled": True}]
+    assert data["strings"] == [{"key": "cta", "pl": "Zadzwoń"}]
@@ -0,0 +1,59 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import cms_ingest  # noqa: E402
+
+
+def _workbook(path: Path, title: str = "Start") -> Path:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Pages"
+    ws.append(["lang", "slug", "slugKey", "template", "publish", "title", "h1", "seo_title", "meta_desc"])
+    ws.append(["pl", "/pl/", "home", "page.html", "TRUE", title, title, title, "Opis"])
+    ws.append(["en", "/en/contact/", "contact", "page.html", "TRUE", "Contact", "Contact", "Contact", "Desc"])
+    blog = wb.create_sheet("Blog")
+    blog.append(["lang", "slug", "title", "published_at"])
+    blog.append(["pl", "/pl/blog/a/", "A", datetime(2024, 5, 1, 12, 30)])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def snap_dir(tmp_path, monkeypatch):
+    d = tmp_path / "cache"
+    monkeypatch.setenv("CMS_SNAPSHOT_DIR", str(d))
+    monkeypatch.delenv("CMS_SNAPSHOT", raising=False)
+    return d
+
+
+def _data(d):
+    return {k: v for k, v in d.items() if k != "report"}
+
+
+def test_snapshot_roundtrip(tmp_path, snap_dir):
+    xlsx = _workbook(tmp_path / "menu.xlsx")
+    first = cms_ingest.load_all(tmp_path, explicit_src=xlsx)
+    assert len(list(snap_dir.glob("*.json.gz"))) == 1
+    second = cms_ingest.load_all(tmp_path, explicit_src=xlsx)
+    assert "[cms_ingest] snapshot:" in second["report"]
+    assert _data(second) == _data(first)
+    assert second["page_routes"] is second["routes"]
+    sheets = dict(cms_ingest.load_sheets(xlsx))
+    assert sheets["Blog"][1][3] == datetime(2024, 5, 1, 12, 30)
+
+
+def test_snapshot_invalidation(tmp_path, snap_dir):
+    xlsx = _workbook(tmp_path / "menu.xlsx")
+    cms_ingest.load_all(tmp_path, explicit_src=xlsx)
+    _workbook(xlsx, title="Nowy tytuł")  # inne bajty → inny klucz sha256
+    data = cms_ingest.load_all(tmp_path, explicit_src=xlsx)
+    assert "[cms_ingest] snapshot:" not in data["report"]
+    assert data["page_meta"]["pl"]["home"]["title"] == "Nowy tytuł"
+    assert cms_ingest.invalidate(xlsx) == 1
+    assert cms_ingest.invalidate() == 1  # poprzednia wersja workbooka
+    assert not list(snap_dir.glob("*.json.gz"))
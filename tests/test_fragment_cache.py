@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+from jinja2 import DictLoader, Environment
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import build_cache  # noqa: E402
+import fragment_cache  # noqa: E402
+
+TEMPLATES = {
+    "page.html": '<body>{{ cached_include("head.html") }}|{{ body }}</body>',
+    "head.html": '<nav>{{ lang }}:{{ fragment_hole("links.html") }}:{{ counter() }}</nav>',
+    "links.html": "<a href='/{{ lang }}/{{ slug }}/'>",
+}
+
+
+def _env():
+    env = Environment(loader=DictLoader(TEMPLATES))
+    calls = []
+    env.globals["counter"] = lambda: calls.append(1) or len(calls)
+    cache = fragment_cache.install(env)
+    return env, cache, calls
+
+
+def test_fragment_rendered_once_per_key_with_page_specific_holes():
+    env, cache, calls = _env()
+    tpl = env.get_template("page.html")
+    a = tpl.render(lang="pl", slug="a", body="A", fragment_key="pl-1")
+    b = tpl.render(lang="pl", slug="b", body="B", fragment_key="pl-1")
+    c = tpl.render(lang="en", slug="a", body="C", fragment_key="en-1")
+    assert a == "<body><nav>pl:<a href='/pl/a/'>:1</nav>|A</body>"
+    assert b == "<body><nav>pl:<a href='/pl/b/'>:1</nav>|B</body>"
+    assert c == "<body><nav>en:<a href='/en/a/'>:2</nav>|C</body>"
+    assert len(cache.store) == 2 and len(calls) == 2
+
+
+def test_without_key_behaves_like_include(monkeypatch):
+    env, cache, calls = _env()
+    tpl = env.get_template("page.html")
+    tpl.render(lang="pl", slug="a", body="A")
+    monkeypatch.setenv(fragment_cache.FRAGMENT_ENV, "0")
+    tpl.render(lang="pl", slug="a", body="A", fragment_key="pl-1")
+    assert not cache.store and len(calls) == 2
+
+
+def test_cached_partials_count_as_template_dependencies():
+    env, _, _ = _env()
+    assert build_cache.template_deps(env, "page.html") == {"page.html", "head.html", "links.html"}
@@ -0,0 +1,43 @@
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+DIST = Path("dist")
+
+
+def test_rebuild_without_changes_hits_cache():
+    before = {str(p): p.read_bytes() for p in DIST.rglob("index.html")}
+    subprocess.run([sys.executable, "tools/build.py"], check=True)
+    summary = (DIST / "_reports" / "summary.txt").read_text(encoding="utf-8")
+    assert "cache_misses=0" in summary, summary
+    assert "files_written=0 " in summary and "precompressed=0 " in summary, summary  # raporty i bundle menu też
+    assert "files_deleted=0" in summary, summary
+    after = {str(p): p.read_bytes() for p in DIST.rglob("index.html")}
+    assert after == before
+
+
+def test_manifest_covers_all_routes():
+    manifest = json.loads(Path(".build-cache/manifest.json").read_text(encoding="utf-8"))
+    routes = json.loads(Path("_routes.json").read_text(encoding="utf-8"))
+    assert {r["out"] for r in routes} == set(manifest["pages"])
+
+
+def test_force_keeps_lastmod_history():
+    path = DIST / "_manifest.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert "lastmod" in data
+    data["lastmod"]["pl/index.html"][1] = "2026-01-01T00:00:00+00:00"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    subprocess.run([sys.executable, "tools/build.py", "--force"], check=True)
+    sitemaps = "".join(gzip.decompress(p.read_bytes()).decode() for p in DIST.glob("sitemap-*.xml.gz"))
+    assert "<loc>https://kras-trans.com/pl/</loc>\n    <lastmod>2026-01-01T00:00:00+00:00</lastmod>" in sitemaps
+    assert json.loads(path.read_text(encoding="utf-8"))["lastmod"]["pl/index.html"][1] == "2026-01-01T00:00:00+00:00"
+
+
+def test_build_without_dist_but_with_warm_cache():
+    shutil.rmtree(DIST)
+    subprocess.run([sys.executable, "tools/build.py"], check=True)  # bundle menu zapisany przed sanity check
+    assert (DIST / "assets" / "data" / "menu" / "bundle_pl.json").exists()
@@ -0,0 +1,107 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import deploy_manifest  # noqa: E402
+import indexnow  # noqa: E402
+
+
+SITE = "https://kras-trans.com"
+
+
+def test_manifest_diff_and_changed_urls(tmp_path):
+    root, cache = tmp_path / "dist", tmp_path / "hashes.json"
+    for rel, text in {"pl/index.html": "a", "pl/x/index.html": "x", "pl/old/index.html": "o", "404.html": "n",
+                      "google4377ff145fac0f52.html": "g", "app.css": "c", "_reports/summary.txt": "s"}.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text)
+    pages = {"pl/index.html": f"{SITE}/pl/", "pl/x/index.html": f"{SITE}/pl/x/", "pl/old/index.html": f"{SITE}/pl/old/"}
+    first = deploy_manifest.update(root, pages, cache_path=cache)
+    assert first["baseline"] and first["files"] == {"added": 6, "changed": 0, "removed": 0}
+    manifest = json.loads((root / "_manifest.json").read_text())
+    assert manifest["files"]["app.css"]["size"] == 1 and len(manifest["files"]["app.css"]["sha256"]) == 64
+    assert "_reports/summary.txt" not in manifest["files"] and manifest["urls"] == pages
+
+    # zmiany w 404.html, plikach weryfikacyjnych i stubach nie są stronami; usunięta strona — z poprzedniego manifestu
+    for rel in ("pl/x/index.html", "app.css", "404.html", "google4377ff145fac0f52.html"):
+        (root / rel).write_text("zmiana")
+    (root / "pl/old/index.html").write_text("<meta http-equiv=refresh>")  # teraz stub przekierowania
+    (root / "en").mkdir()
+    (root / "en/index.html").write_text("e")
+    pages = {"pl/index.html": f"{SITE}/pl/", "pl/x/index.html": f"{SITE}/pl/x/", "en/index.html": f"{SITE}/en/"}
+    ch = deploy_manifest.update(root, pages, cache_path=cache)
+    assert not ch["baseline"]
+    assert ch["paths"]["added"] == ["en/index.html"] and "404.html" in ch["paths"]["changed"]
+    assert ch["urls"] == {"added": [f"{SITE}/en/"], "changed": [f"{SITE}/pl/x/"], "removed": []}
+
+    (root / "pl/x/index.html").unlink()
+    (root / "404.html").unlink()
+    ch = deploy_manifest.update(root, {"pl/index.html": f"{SITE}/pl/", "en/index.html": f"{SITE}/en/"}, cache_path=cache)
+    assert ch["paths"]["removed"] == ["404.html", "pl/x/index.html"]
+    assert ch["urls"] == {"added": [], "changed": [], "removed": [f"{SITE}/pl/x/"]}
+    assert indexnow.collect(ch) == [f"{SITE}/pl/x/"]
+
+
+def test_missing_or_broken_previous_manifest_is_baseline(tmp_path):
+    root, cache = tmp_path / "dist", tmp_path / "hashes.json"
+    (root / "pl").mkdir(parents=True)
+    (root / "pl/index.html").write_text("a")
+    (root / "_manifest.json").write_text("<!doctype html><title>404</title>")  # nieudane pobranie z CDN
+    pages = {"pl/index.html": f"{SITE}/pl/"}
+    ch = deploy_manifest.update(root, pages, cache_path=cache)
+    assert ch["baseline"] and ch["urls"]["added"] == [f"{SITE}/pl/"]
+    assert json.loads((root / "_reports/changed-urls.json").read_text())["baseline"]
+    assert indexnow.collect(ch) == [f"{SITE}/pl/"]
+
+    # przywrócony manifest ostatniego wdrożenia: bez zmian treści nic do wysłania
+    (root / "_reports/changed-urls.json").unlink()
+    ch = deploy_manifest.update(root, pages, cache_path=None)
+    assert not ch["baseline"] and ch["urls"] == {"added": [], "changed": [], "removed": []}
+
+
+class _Stub(BaseHTTPRequestHandler):
+    received = []
+    statuses = []
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((self.path, self.headers["Content-Type"], json.loads(body)))
+        self.send_response(self.statuses.pop(0) if self.statuses else 200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_submitter_batches_with_rate_limit_against_stub_server():
+    server = HTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Stub.received, _Stub.statuses = [], [200, 202, 429]
+    now = [100.0]
+    waits = []
+    try:
+        sub = indexnow.Submitter(f"http://127.0.0.1:{server.server_port}/IndexNow", "k3y", "https://kras-trans.com/",
+                                 batch_size=2, min_interval=5.0, sleep=waits.append, clock=lambda: now[0])
+        urls = [f"https://kras-trans.com/pl/{i}/" for i in range(7)] + ["https://example.com/x/"]
+        res = sub.submit(urls)
+    finally:
+        server.shutdown()
+    assert res == {"sent": 4, "batches": 3, "statuses": [200, 202, 429], "remaining": 3, "pending": urls[4:7],
+                   "skipped_foreign": 1}
+    path, ctype, first = _Stub.received[0]
+    assert path == "/IndexNow" and ctype.startswith("application/json")
+    assert first == {"host": "kras-trans.com", "key": "k3y", "keyLocation": "https://kras-trans.com/k3y.txt",
+                     "urlList": urls[:2]}
+    assert [r[2]["urlList"] for r in _Stub.received[1:]] == [urls[2:4], urls[4:6]]
+    assert waits == [5.0, 5.0]  # zegar stoi: pełny odstęp przed każdą kolejną paczką
+
+
+def test_settings_from_pages_yml_shape():
+    cfg = {"indexing": {"bing": {"indexnow": {"enabled": True, "key": "${INDEXNOW_KEY}", "batch_size": 50000}},
+                        "ui_button": {"rate_limit_minutes": 30}}}
+    s = indexnow.settings(cfg)
+    assert s["enabled"] and s["key"] == "" and s["batch_size"] == indexnow.MAX_BATCH
+    assert s["rate_limit_minutes"] == 30 and indexnow.settings(cfg, "abc")["key"] == "abc"
@@ -0,0 +1,64 @@
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import keyword_automaton as ka  # noqa: E402
+
+
+def _phrases(hits, a, text):
+    return sorted((a.patterns[pid]["phrase"], text[s:e]) for pid, s, e in hits)
+
+
+def test_word_boundaries_and_case_folding():
+    a = ka.Automaton()
+    for p in ("transport", "transport Łódź", "firma transportowa", "Łódź", "ёлка", "straße"):
+        a.add(p, "csv")
+    text = "TRANSPORT ŁÓDŹ, transportowa firma; Firma Transportowa — елка i STRASSE-nord, teleport"
+    assert _phrases(a.scan(text), a, text) == sorted([
+        ("transport", "TRANSPORT"), ("transport Łódź", "TRANSPORT ŁÓDŹ"), ("Łódź", "ŁÓDŹ"),
+        ("firma transportowa", "Firma Transportowa"), ("ёлка", "елка"), ("straße", "STRASSE"),
+    ])
+    assert a.lookup("Transport  łódź") == a.lookup("transport Łódź") is not None
+    assert a.lookup("transport kraków") is None
+
+
+def test_matches_regex_reference_on_random_text():
+    rnd = random.Random(5)
+    vocab = ["transport", "firma", "spedycja", "Kraków", "w", "i", "palet", "грузоперевозки", "Київ", "x"]
+    phrases = sorted({" ".join(rnd.choice(vocab) for _ in range(rnd.randint(1, 3))) for _ in range(40)})
+    a = ka.Automaton()
+    for p in phrases:
+        a.add(p, "csv")
+    text = " ".join(rnd.choice(vocab).upper() if rnd.random() < 0.2 else rnd.choice(vocab) for _ in range(3000))
+    got = sorted((a.patterns[pid]["phrase"], s, e) for pid, s, e in a.scan(text))
+    want = sorted(
+        (p, m.start(), m.start() + len(m.group(1)))
+        for p in phrases
+        for m in re.finditer(r"(?<!\w)(?=(" + r"\W+".join(map(re.escape, p.split())) + r")(?!\w))", text, re.I)
+    )
+    assert got == want
+
+
+def test_index_expands_dynamic_phrases_and_autolinks():
+    idx = ka.KeywordIndex.from_sources(
+        [{"lang": "pl", "term": "Transport Kraków", "cluster": "city"}, {"lang": "uk", "term": "перевезення"}],
+        {"pl": ["transport {city}", "FTL"], "ua": ["перевезення {city}"]},
+        [("", "Kraków"), ("pl", "Gdańsk"), ("ua", "Київ")],
+        [{"lang": "", "anchor": "transport Gdańsk", "href": "/pl/gdansk/"}],
+        langs=["pl", "ua"],
+    )
+    pl = idx.langs["pl"]
+    rec = pl.patterns[pl.lookup("transport kraków")]
+    assert rec["sources"] == ["csv", "dynamic"] and rec["cluster"] == "city" and rec["city"] == "Kraków"
+    assert pl.lookup("transport Gdańsk") is not None and pl.lookup("FTL") is not None
+    assert idx.langs["ua"].lookup("перевезення Київ") is not None
+    assert idx.langs["ua"].lookup("transport Gdańsk") is not None  # autolink bez języka trafia wszędzie
+
+    text = "Transport Gdańsk i transport Kraków. FTL, FTL!"
+    found = idx.analyze("pl", text)
+    assert found.count("ftl") == 2 and found.count("transport Kraków") == 1 and found.count("nic") is None
+    assert found.summary()["top"][0] == ["FTL", 2]
+    assert found.autolink_candidates() == [{"start": 0, "end": 16, "anchor": "transport Gdańsk", "href": "/pl/gdansk/"}]
+    assert idx.analyze("de", text).summary() == {"matched": 0, "hits": 0, "words": 0, "top": []}
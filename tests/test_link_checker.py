@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import link_checker  # noqa: E402
+
+FILES = {"index.html", "404.html", "pl/index.html", "pl/a/index.html", "pl/b/index.html", "pl/sierota/index.html",
+         "pl/stary/index.html", "assets/css/site.css", "assets/img/x.webp", "docs/cennik.pdf"}
+
+
+def _check(pages, redirects=None):
+    checker = link_checker.LinkChecker(FILES, "https://kras-trans.com", redirects)
+    for url, links, refs, ids in pages:
+        checker.add_page(url, links, refs, ids)
+    return checker.finish((url, ids) for url, _, _, ids in pages)
+
+
+def test_links_assets_and_fragments():
+    report = _check([
+        ("/pl/", ["/pl/a/", "a/#cena", "/pl/b/#brak", "#main", "#nie-ma", "#", "https://kras-trans.com/pl/b/",
+                  "https://example.com/x/", "mailto:x@y.pl", "/pl/c/", "/docs/cennik.pdf", "/pl/a"],
+         ["/assets/css/site.css", "/assets/img/x.webp", "/assets/img/y.webp", "https://cdn.example/z.js"], ["main"]),
+        ("/pl/a/", ["../", "/pl/b/?utm=1", "/pl/b/#%C5%BC%C3%B3%C5%82w"], [], ["cena"]),
+        ("/pl/b/", ["/pl/"], [], ["żółw"]),
+        ("/pl/sierota/", ["/pl/"], [], []),
+    ])
+    assert report["broken"] == [
+        {"page": "/pl/", "href": "#nie-ma", "reason": "fragment"},
+        {"page": "/pl/", "href": "/pl/c/", "reason": "missing"},
+        {"page": "/pl/", "href": "/assets/img/y.webp", "reason": "missing"},
+        {"page": "/pl/", "href": "/pl/b/#brak", "reason": "fragment"},
+    ]
+    assert report["checked"] == 18
+    assert report["inbound"] == {"/docs/cennik.pdf": 1, "/pl/": 3, "/pl/a/": 1, "/pl/b/": 2}
+    assert report["orphans"] == ["/pl/sierota/"]
+
+
+def test_redirect_sources_resolve_to_their_targets():
+    report = _check([("/pl/", ["/pl/stary/", "/pl/petla", "/pl/zly/", "/pl/zewn/"], [], [])], {
+        "/pl/stary/": "/pl/a/", "/pl/petla/": "/pl/petla2/", "/pl/petla2/": "/pl/petla/",
+        "/pl/zly/": "/pl/nie-ma/", "/pl/zewn/": "https://example.com/",
+    })
+    assert [(b["href"], b["reason"]) for b in report["broken"]] == [
+        ("/pl/petla", "redirect_loop"), ("/pl/zly/", "redirect_target_missing")]
+    assert [(r["href"], r["to"]) for r in report["redirected"]] == [
+        ("/pl/stary/", "/pl/a/"), ("/pl/zewn/", "https://example.com/")]
+    assert report["inbound"] == {"/pl/a/": 1}
+
+
+def test_output_index_skips_excluded_and_temp_files(tmp_path):
+    for rel in ("pl/index.html", "pl/.index.html.1.2.tmp", "assets/a.css", "stare/index.html"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("x")
+    assert link_checker.output_index(tmp_path, exclude={"stare/index.html"}) == {"pl/index.html", "assets/a.css"}
@@ -0,0 +1,48 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import link_graph  # noqa: E402
+
+
+def _graph(by_region=2, alt_services=2):
+    g = link_graph.LinkGraph(by_region, alt_services)
+    for svc in ("ftl", "ltl", "adr"):
+        for city, region in (("Łódź", "łódzkie"), ("Zgierz", "łódzkie"), ("Pabianice", "Łódzkie"),
+                             ("Kutno", "łódzkie"), ("Gdańsk", "pomorskie"), ("Hel", "")):
+            key = f"{svc}__{city.lower()}"
+            g.add("pl", key, f"/pl/{key}/", f"{svc} {city}", city, region, svc)
+    return g
+
+
+def test_neighbors_by_region_and_alt_services():
+    g = _graph()
+    nb = g.neighbors("pl", "ftl__łódź")
+    assert [(n["url"], n["rel"]) for n in nb] == [
+        ("/pl/ftl__zgierz/", "region"),
+        ("/pl/ftl__pabianice/", "region"),  # województwo porównywane bez wielkości liter
+        ("/pl/ltl__łódź/", "service"),
+        ("/pl/adr__łódź/", "service"),
+    ]
+    # pozycja w grupie przesuwa okno: linki przychodzące rozkładają się po regionie
+    assert [n["url"] for n in g.neighbors("pl", "ftl__kutno") if n["rel"] == "region"] == [
+        "/pl/ftl__łódź/", "/pl/ftl__zgierz/",
+    ]
+    # bez województwa — tylko inne usługi w mieście; nieznana strona — brak sąsiadów
+    assert {n["rel"] for n in g.neighbors("pl", "ltl__hel")} == {"service"}
+    assert g.neighbors("en", "ftl__łódź") == []
+    assert g.neighbors("pl", "ftl__łódź") == nb
+
+
+def test_config_limits_and_report(tmp_path):
+    g = link_graph.LinkGraph.from_config({"linkGraph": {"neighbors": {"byRegion": 1, "altServices": 0}}})
+    for city in ("A", "B", "C"):
+        g.add("pl", f"ftl__{city}", f"/pl/ftl-{city}/", city, city, "r", "ftl")
+    g.add("pl", "ftl__A", "/pl/dup/", "dup", "A", "r", "ftl")
+    assert len(g) == 3
+    data = g.write(tmp_path / "link-graph.json")
+    assert json.loads((tmp_path / "link-graph.json").read_text("utf-8")) == data
+    assert data["neighbors"] == {"byRegion": 1, "altServices": 0}
+    assert data["graph"]["pl"]["ftl__A"] == {"url": "/pl/ftl-A/", "region": ["ftl__B"], "services": []}
+    assert data["langs"]["pl"] == {"pages": 3, "links": 3, "no_inbound": 0}
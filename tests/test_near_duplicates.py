@@ -0,0 +1,61 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import near_duplicates as nd  # noqa: E402
+
+
+def _reference(text):
+    sh = nd.shingles(text)
+    counts = [0] * 64
+    for s in sh:
+        h = int.from_bytes(nd._digests([s]), "little")
+        for i in range(64):
+            counts[i] += (h >> i) & 1
+    return sum(1 << i for i in range(64) if 2 * counts[i] > len(sh))
+
+
+def test_simhash_batch_matches_bitwise_reference(monkeypatch):
+    rnd = random.Random(7)
+    words = [f"słowo{i}" for i in range(300)]
+    texts = [" ".join(rnd.choice(words) for _ in range(rnd.randint(0, 400))) for _ in range(12)]
+    expected = [_reference(t) for t in texts]
+    assert nd.simhash_batch(texts) == expected
+    monkeypatch.setattr(nd, "np", None)
+    assert nd.simhash_batch(texts) == expected
+    base = " ".join(words[:200])
+    assert nd.hamming(nd.simhash(base), nd.simhash(base + " jeszcze jedno zdanie")) <= nd.max_distance(0.9)
+
+
+def test_page_text_uses_main_without_scripts():
+    html = "<header>menu</header><main><h1>Tytuł &amp; co</h1><script>x=1</script><p>treść</p></main>"
+    assert nd.page_text(html).split() == ["Tytuł", "&", "co", "treść"]
+
+
+def test_lsh_finds_same_pairs_as_brute_force_within_language():
+    rnd = random.Random(3)
+    fps = [rnd.getrandbits(64) for _ in range(400)]
+    fps += [f ^ (1 << rnd.randrange(64)) ^ (1 << rnd.randrange(64)) ^ (1 << rnd.randrange(64)) for f in fps[:150]]
+    fps += fps[:30]
+    pages = [{"url": f"/pl/{i}/", "lang": "pl", "simhash": f} for i, f in enumerate(fps)]
+    pages.append({"url": "/en/0/", "lang": "en", "simhash": fps[0]})
+    rep = nd.find_duplicates(pages, 0.9, max_pairs=10**6)
+    brute = {(i, j) for i in range(len(fps)) for j in range(i + 1, len(fps))
+             if nd.hamming(fps[i], fps[j]) <= 6}
+    assert rep["pairs_count"] == len(brute)
+    assert {(p["a"], p["b"]) for p in rep["pairs"]} == {(f"/pl/{i}/", f"/pl/{j}/") for i, j in brute}
+    assert "/en/0/" not in rep["duplicates"]
+    # pierwsza strona klastra (kolejność builda) zostaje kanoniczna
+    assert "/pl/0/" not in rep["duplicates"] and "/pl/550/" in rep["duplicates"]
+
+    capped = nd.find_duplicates(pages, 0.9, max_pairs=10)
+    assert len(capped["pairs"]) == 10 and capped["pairs_truncated"]
+    assert capped["duplicates"] == rep["duplicates"]
+
+
+def test_set_noindex_toggles_robots_meta():
+    html = '<head><meta name="robots" content="index,follow" /></head>'
+    on = nd.set_noindex(html, True)
+    assert 'content="noindex,follow"' in on
+    assert nd.set_noindex(on, False) == html
@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import output_sink  # noqa: E402
+
+
+def _build(root, state, files, keep=()):
+    sink = output_sink.OutputSink(root, output_sink.load_state(state), threads=2)
+    sink.prepare(root / rel for rel in files)
+    for rel, text in files.items():
+        sink.write(root / rel, text)
+    for rel in keep:
+        sink.keep(root / rel)
+    sink.remove_stale()
+    stats = sink.stats()
+    sink.close(state)
+    return stats
+
+
+def test_unchanged_files_keep_mtime_and_stale_files_go(tmp_path):
+    root, state = tmp_path / "dist", tmp_path / "outputs.json"
+    files = {"pl/index.html": "<h1>A</h1>", "pl/a/index.html": "a", "en/b/index.html": "b", "robots.txt": "x"}
+    assert _build(root, state, files) == {"written": 4, "unchanged": 0, "deleted": 0}
+    os.utime(root / "pl/index.html", (1, 1))
+
+    files.update({"pl/index.html": "<h1>A</h1>", "robots.txt": "y"})
+    del files["en/b/index.html"]
+    stats = _build(root, state, {k: v for k, v in files.items() if k != "pl/a/index.html"}, keep=["pl/a/index.html"])
+    assert stats == {"written": 1, "unchanged": 1, "deleted": 1}
+    assert (root / "pl/index.html").stat().st_mtime == 1  # bez zmian — plik nietknięty
+    assert (root / "robots.txt").read_text() == "y" and (root / "pl/a/index.html").read_text() == "a"
+    assert not (root / "en").exists()  # pusty katalog po usuniętej stronie też znika
+    assert not list(root.rglob("*.tmp"))
+
+
+def test_worker_records_merge_and_unknown_files_are_compared_on_disk(tmp_path):
+    root = tmp_path / "dist"
+    (root / "pl").mkdir(parents=True)
+    (root / "pl/index.html").write_text("same")
+    os.utime(root / "pl/index.html", (1, 1))
+    worker = output_sink.OutputSink(root, threads=0)
+    worker.write(root / "pl/index.html", "same")   # brak skrótu z poprzedniego builda: porównanie z dyskiem
+    worker.write(root / "pl/nowy/index.html", "n")  # katalog zakładany przy zapisie
+    worker.write(tmp_path / "outside.txt", "o")     # poza root: zapis bez śledzenia
+    main = output_sink.OutputSink(root, threads=0)
+    main.merge(worker.take())
+    assert main.stats() == {"written": 1, "unchanged": 1, "deleted": 0}
+    assert sorted(main.records) == ["pl/index.html", "pl/nowy/index.html"]
+    assert (root / "pl/index.html").stat().st_mtime == 1 and (tmp_path / "outside.txt").read_text() == "o"
+    assert worker.take() == ({}, {"written": 0, "unchanged": 0, "deleted": 0})
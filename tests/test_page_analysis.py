@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import near_duplicates  # noqa: E402
+import page_analysis as pa  # noqa: E402
+
+HTML = """<!doctype html><html><head><title>Transport &amp; spedycja</title>
+<meta name="description" content="Opis
+ strony"><script>var t = "<title>x</title>";</script>
+<link rel="stylesheet" href="/assets/css/site.css"><link rel="preconnect" href="https://fonts.example">
+<script src="/assets/js/site.js"></script></head>
+<body id="top-of-page"><header><a href="/pl/menu/">menu</a><a href="#main">skip</a></header>
+<main id="main"><h1>Transport <b>chłodniczy</b></h1><!-- <a href="/ukryty/"> --><script>var a = "<a href='/x/'>";</script>
+<p>Transport chłodniczy w Polsce i transport krajowy a<b>b</b> 5 &lt; 7.</p>
+<a href="/pl/oferta/">oferta</a> <a href="https://kras-trans.pl/pl/oferta/#faq">znowu</a>
+<a href="https://example.com/">zewn</a> <a href="#top">góra</a> <a href="mailto:x@y.pl">mail</a> <a href="/pl/oferta/">raz</a>
+<img src="/a.webp" alt="ciężarówka"><img src="/b.webp" srcset="/b-1x.webp 1x, /b-2x.webp 2x"></main><footer><h1>stopka</h1></footer></body></html>"""
+
+
+def test_single_pass_fields():
+    page = pa.analyze(HTML, "https://kras-trans.pl/", "/pl/x/", "pl")
+    assert (page.url, page.lang) == ("/pl/x/", "pl")
+    assert page.title == "Transport & spedycja" and page.description == "Opis strony"
+    assert page.h1 == "Transport chłodniczy"
+    assert page.text.split() == near_duplicates.page_text(HTML.replace('<!-- <a href="/ukryty/"> -->', "")).split()
+    assert "menu" not in page.text and "var" not in page.text and "stopka" not in page.text
+    # wszystkie linki strony (dla link-checkera), bez powtórzeń i bez komentarzy/skryptów
+    assert page.links == ["/pl/menu/", "#main", "/pl/oferta/", "https://kras-trans.pl/pl/oferta/#faq",
+                          "https://example.com/", "#top", "mailto:x@y.pl"]
+    # zasoby i kotwice (bez preconnect i bez adresów z komentarzy/skryptów)
+    assert page.refs == ["/assets/css/site.css", "/assets/js/site.js", "/a.webp", "/b.webp", "/b-1x.webp", "/b-2x.webp"]
+    assert page.ids == ["top-of-page", "main"]
+    # liczniki treści: tylko <main>, ten sam adres wewnętrzny raz
+    assert (page.internal_links, page.external_links) == (1, 1)
+    assert (page.images, page.images_without_alt) == (2, 1)
+    assert page.words == 17 and page.unique_words == 14
+
+
+def test_store_spills_and_reuses_previous_lines(tmp_path):
+    path = tmp_path / "analysis.jsonl"
+    store = pa.AnalysisStore(path, max_in_memory=1)
+    refs = []
+    for url in ("/pl/a/", "/pl/b/"):
+        page = pa.analyze(HTML, "", url, "pl")
+        page.simhash, page.autolinks = "00ff", [1, 0]
+        refs.append(list(store.add(page)))
+    assert [p.url for p in store] == ["/pl/a/", "/pl/b/"]  # ponad limit pamięci: z pliku
+    store.close()
+
+    nxt = pa.AnalysisStore(path)
+    assert nxt.previous(refs[0], "/pl/b/") is None  # linia innej strony
+    page, ref = nxt.previous(refs[1], "/pl/b/")
+    assert (page.url, page.simhash, page.autolinks, ref) == ("/pl/b/", "00ff", [1, 0], (0, refs[1][1]))
+    nxt.close()
+    assert [p.url for p in nxt] == ["/pl/b/"] and len(nxt) == 1
+    assert pa.AnalysisStore(path).previous([0, ref[1]], "/pl/b/")[0].h1 == "Transport chłodniczy"
@@ -0,0 +1,31 @@
+import gzip
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+DIST = Path("dist")
+
+
+def _snapshot():
+    """Routes + indeks i paczki sitemap-N.xml.gz (bez lastmod = czas builda) + wszystkie strony."""
+    sitemaps = {
+        p.name: re.sub(r"<lastmod>[^<]*</lastmod>", "", p.read_text(encoding="utf-8"))
+        for p in sorted(DIST.glob("sitemap*.xml"))
+    }
+    sitemaps.update({
+        p.name: re.sub(r"<lastmod>[^<]*</lastmod>", "", gzip.decompress(p.read_bytes()).decode("utf-8"))
+        for p in sorted(DIST.glob("sitemap-*.xml.gz"))
+    })
+    assert any(name.endswith(".xml.gz") for name in sitemaps), "no sitemap shards"
+    pages = {str(p): p.read_bytes() for p in sorted(DIST.rglob("index.html"))}
+    return Path("_routes.json").read_text(encoding="utf-8"), sitemaps, pages
+
+
+def test_parallel_build_matches_serial():
+    serial = _snapshot()
+    subprocess.run([sys.executable, "tools/build.py", "--jobs", "2", "--force"], check=True)
+    parallel = _snapshot()
+    assert parallel[0] == serial[0], "_routes.json differs between serial and parallel build"
+    assert parallel[1] == serial[1], "sitemaps differ between serial and parallel build"
+    assert parallel[2] == serial[2], "rendered pages differ between serial and parallel build"
@@ -0,0 +1,64 @@
+import gzip
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import precompress  # noqa: E402
+
+PAGE = "<!doctype html><title>Transport</title>" + "<p>Transport drogowy i spedycja w Polsce.</p>" * 200
+
+
+def _site(root):
+    files = {"pl/index.html": PAGE, "assets/css/site.css": "body{margin:0}" * 100, "robots.txt": "x",
+             "assets/img/a.webp": "RIFF", "_reports/summary.txt": PAGE, "sitemap-1.xml.gz": "gz"}
+    for rel, text in files.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text)
+
+
+def test_siblings_report_and_incremental_skip(tmp_path, monkeypatch):
+    root, state = tmp_path / "dist", tmp_path / "precompress.json"
+    _site(root)
+    rep = precompress.run(root, formats=("gz",), state_path=state)
+    assert gzip.decompress((root / "pl/index.html.gz").read_bytes()).decode() == PAGE
+    assert not (root / "robots.txt.gz").exists()  # mniejszy nie byłby
+    assert not (root / "_reports/summary.txt.gz").exists() and not (root / "assets/img/a.webp.gz").exists()
+    assert not (root / "sitemap-1.xml.gz.gz").exists()
+    assert rep["compressed"] == 3 and rep["by_type"][".txt"] == {"files": 1, "raw": 1, "gz": 1}
+    assert rep["total"]["raw"] == len(PAGE) + 1400 + 1
+    assert rep["by_type"][".html"]["gz"] == (root / "pl/index.html.gz").stat().st_size
+
+    # ta sama treść z nowym mtime (kopia assets/) i bez zmian — nic do kompresji
+    os.utime(root / "assets/css/site.css", ns=(1, 1))
+    gz_mtime = (root / "pl/index.html.gz").stat().st_mtime_ns
+    rep = precompress.run(root, formats=("gz",), state_path=state)
+    assert (rep["compressed"], rep["unchanged"]) == (0, 3)
+    assert (root / "pl/index.html.gz").stat().st_mtime_ns == gz_mtime
+
+    # zmieniona strona jest kompresowana ponownie, warianty usuniętej znikają
+    (root / "pl/index.html").write_text(PAGE + "<p>nowe</p>")
+    (root / "assets/css/site.css").unlink()
+    monkeypatch.setattr(precompress, "POOL_MIN_FILES", 1)  # przez pulę procesów
+    rep = precompress.run(root, jobs=2, formats=("gz",), state_path=state)
+    assert (rep["compressed"], rep["removed"]) == (1, 1)
+    assert not (root / "assets/css/site.css.gz").exists()
+    assert gzip.decompress((root / "pl/index.html.gz").read_bytes()).decode().endswith("<p>nowe</p>")
+
+
+def test_gzip_output_is_deterministic(tmp_path):
+    _site(tmp_path)
+    precompress.compress_file(str(tmp_path), "pl/index.html", ("gz",))
+    first = (tmp_path / "pl/index.html.gz").read_bytes()
+    precompress.compress_file(str(tmp_path), "pl/index.html", ("gz",))
+    assert (tmp_path / "pl/index.html.gz").read_bytes() == first
+
+
+def test_brotli_siblings_when_available(tmp_path):
+    brotli = pytest.importorskip("brotli")
+    _site(tmp_path)
+    rep = precompress.run(tmp_path, state_path=None)
+    assert rep["formats"] == ["br", "gz"]
+    assert brotli.decompress((tmp_path / "pl/index.html.br").read_bytes()).decode() == PAGE
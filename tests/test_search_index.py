@@ -0,0 +1,63 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import search_index  # noqa: E402
+
+
+def _index(docs):
+    idx = search_index.LangIndex("pl")
+    for path, title, text in docs:
+        idx.add(path, {"title": title, "description": "", "h1": "", "text": text})
+    return idx
+
+
+def _lookup(files, word):
+    shards = files["meta.json"]["shards"]
+    key = max((k for k in shards if word.startswith(k)), key=len)
+    ids, doc = [], 0
+    postings = files[shards[key]].get(word, [])
+    for i in range(0, len(postings), 2):
+        doc += postings[i]
+        ids.append((doc, postings[i + 1]))
+    return ids
+
+
+def test_fold_strips_case_and_diacritics():
+    assert search_index.fold("Łódź") == "lodz"
+    assert search_index.fold("STRAßE") == "strasse"
+    assert search_index.tokens("Przeprowadzki, Kraków-Zakopane a_b 7") == ["przeprowadzki", "krakow", "zakopane"]
+
+
+def test_postings_are_delta_encoded_and_weighted_by_field():
+    idx = _index([("/pl/a/", "Transport", "transport transport"), ("/pl/b/", "Inne", "x"),
+                  ("/pl/c/", "Przewóz", "transport")])
+    files = idx.files()
+    assert list(files["meta.json"]["shards"]) == [""]
+    assert files["t-0.json"]["transport"] == [0, 5, 2, 1]
+    assert _lookup(files, "przewoz") == [(2, 3)]
+    assert files["d-0.json"][2] == ["/pl/c/", "Przewóz", ""]
+
+
+def test_large_shards_split_by_longer_prefix_and_every_term_is_reachable():
+    words = [f"{a}{b}{c}" for a in "abc" for b in "xyz" for c in "mn"] + ["ab"]
+    idx = _index([(f"/pl/{i}/", "", " ".join(words[i % 5:])) for i in range(40)])
+    files = idx.files(limit=60, per_file=16)
+    shards = files["meta.json"]["shards"]
+    assert len(shards) > 3 and "" not in shards
+    assert sorted(n for n in files if n.startswith("d-")) == ["d-0.json", "d-1.json", "d-2.json"]
+    for word in words:
+        ids = _lookup(files, word)
+        assert [d for d, _ in ids] == [i for i in range(40) if word in words[i % 5:]]
+    assert sum(len(files[f]) for f in shards.values()) == len(idx.postings)
+
+
+def test_write_skips_empty_languages(tmp_path):
+    pages = [type("P", (), {"url": "/en/", "lang": "en", "title": "Home", "h1": "", "description": "", "text": "go"})]
+    written = {}
+    stats = search_index.write(search_index.build(pages, ["pl", "en"]),
+                               lambda p, t: written.setdefault(p.relative_to(tmp_path).as_posix(), t), tmp_path)
+    assert stats == {"en": {"docs": 1, "terms": 2, "shards": 1}}
+    assert sorted(written) == ["en/d-0.json", "en/meta.json", "en/t-0.json"]
+
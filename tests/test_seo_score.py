@@ -0,0 +1,49 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import page_analysis  # noqa: E402
+import seo_score  # noqa: E402
+
+CFG = {"seo": {"scoring": {
+    "enabled": True,
+    "fields": {"primary": "primary_keywords"},
+    "density": {"min_pct": 0.5, "max_pct": 2.0},
+    "coverage": {"min_unique_words": 5, "min_internal_links": 2, "min_images": 1},
+}}}
+
+HTML = """<html><body><header><a href="/pl/menu/">menu</a></header>
+<main><h1>Transport chłodniczy &amp; więcej</h1><script>var a = "<a href='/x/'>";</script>
+<p>Transport chłodniczy w Polsce i transport krajowy a<b>b</b> 5 &lt; 7.</p>
+<a href="/pl/oferta/">oferta</a> <a href="https://kras-trans.pl/pl/oferta/#faq">znowu</a>
+<a href="https://example.com/">zewn</a> <a href="#top">góra</a> <a href="mailto:x@y.pl">mail</a>
+<img src="/a.webp" alt="ciężarówka"><img src="/b.webp"></main></body></html>"""
+
+
+def test_score_page_density_and_coverage():
+    rule = seo_score.rules(CFG, "https://kras-trans.pl")
+    page = page_analysis.analyze(HTML, rule["site_url"])
+    kws = seo_score.page_keywords({"page": {"primary_keywords": "transport chłodniczy, chłodnia"}}, rule)
+    assert kws == ["transport chłodniczy", "chłodnia"]
+    sc = seo_score.score_page(page, kws, rule)
+    assert sc["keyword"] == "transport chłodniczy"
+    assert sc["density_pct"] == round(100 * 2 / sc["words"], 2)
+    assert sc["issues"] == ["keyword_density_high", "few_internal_links"]
+    assert sc["score"] == 50
+    # bez pola primary — najmocniejszy term TF-IDF
+    assert seo_score.page_keywords({"page": {}, "tfidf": {"keywords": ["ładunki", "adr"]}}, rule) == ["ładunki"]
+    assert seo_score.rules({"seo": {"scoring": {"enabled": False}}}) is None
+
+
+def test_report_metrics(tmp_path):
+    rule = seo_score.rules(CFG)
+    rep = seo_score.ScoreReport(rule)
+    rep.add("/pl/a/", "pl", {"score": 50, "issues": ["thin_content", "keyword_density_low"]})
+    rep.add("/pl/b/", "pl", {"score": 100, "issues": []})
+    rep.add("/pl/c/", "pl", None)  # strona bez oceny (np. stary wpis manifestu)
+    data = rep.write(tmp_path / "seo-scores.json")
+    assert json.loads((tmp_path / "seo-scores.json").read_text("utf-8")) == data
+    assert data["pages_count"] == 2 and data["average_score"] == 75.0
+    assert rep.metrics() == {"thin_content_count": 1, "keyword_density_outside_range": 1}
+    assert seo_score.ScoreReport(None).metrics()["thin_content_count"] is None
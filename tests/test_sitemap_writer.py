@@ -0,0 +1,58 @@
+import gzip
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import output_sink  # noqa: E402
+import sitemap_writer  # noqa: E402
+
+NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+def _locs(path):
+    root = ET.fromstring(gzip.decompress(path.read_bytes()))
+    return [u.find("s:loc", NS).text for u in root.findall("s:url", NS)]
+
+
+def test_shards_rotate_on_url_count_and_byte_limit(tmp_path):
+    w = sitemap_writer.SitemapWriter(tmp_path, "https://kras-trans.com/", max_urls=3)
+    for i in range(7):
+        w.add(f"https://kras-trans.com/pl/{i}/?a=1&b=2", f"2026-01-0{i + 1}T00:00:00+00:00", "weekly", 0.8,
+              {"en": f"https://kras-trans.com/en/{i}/"})
+    shards = w.close()
+    assert shards == [("https://kras-trans.com/sitemap-1.xml.gz", "2026-01-03T00:00:00+00:00"),
+                      ("https://kras-trans.com/sitemap-2.xml.gz", "2026-01-06T00:00:00+00:00"),
+                      ("https://kras-trans.com/sitemap-3.xml.gz", "2026-01-07T00:00:00+00:00")]
+    assert _locs(tmp_path / "sitemap-3.xml.gz") == ["https://kras-trans.com/pl/6/?a=1&b=2"]
+    xml = gzip.decompress((tmp_path / "sitemap-1.xml.gz").read_bytes()).decode()
+    assert "<changefreq>weekly</changefreq>" in xml and "<priority>0.8</priority>" in xml
+    assert '<xhtml:link rel="alternate" hreflang="en" href="https://kras-trans.com/en/0/"/>' in xml
+    assert not list(tmp_path.glob("*.tmp"))
+
+    entry = len(sitemap_writer.url_entry("https://kras-trans.com/x/0/").encode())
+    limit = len(sitemap_writer.HEADER) + 2 * entry + len(sitemap_writer.FOOTER)
+    w = sitemap_writer.SitemapWriter(tmp_path / "b", "https://kras-trans.com", max_bytes=limit)
+    for i in range(5):
+        w.add(f"https://kras-trans.com/x/{i}/")
+    assert len(w.close()) == 3
+    for shard in (tmp_path / "b").glob("*.gz"):
+        assert len(gzip.decompress(shard.read_bytes())) <= limit
+
+
+def test_same_content_keeps_shard_untouched(tmp_path):
+    state = tmp_path / "outputs.json"
+    stats = []
+    for _ in range(2):
+        sink = output_sink.OutputSink(tmp_path / "dist", output_sink.load_state(state), threads=0)
+        w = sitemap_writer.SitemapWriter(tmp_path / "dist", "https://kras-trans.com", commit=sink.adopt)
+        w.add("https://kras-trans.com/pl/", "2026-01-01T00:00:00+00:00")
+        w.close()
+        stats.append(sink.stats())
+        mtime = (tmp_path / "dist" / "sitemap-1.xml.gz").stat().st_mtime_ns
+        sink.close(state)
+    assert stats == [{"written": 1, "unchanged": 0, "deleted": 0}, {"written": 0, "unchanged": 1, "deleted": 0}]
+    assert (tmp_path / "dist" / "sitemap-1.xml.gz").stat().st_mtime_ns == mtime
+    assert not list((tmp_path / "dist").glob("*.tmp"))
+    index = sitemap_writer.index_xml([("https://kras-trans.com/sitemap-1.xml.gz", "")])
+    assert "<sitemap><loc>https://kras-trans.com/sitemap-1.xml.gz</loc></sitemap>" in index
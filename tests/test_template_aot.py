@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+from jinja2 import Environment, select_autoescape
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import template_aot  # noqa: E402
+
+
+def _env(tpl_dir):
+    return Environment(
+        loader=template_aot.AotLoader(tpl_dir, tpl_dir.parent / "aot"),
+        autoescape=select_autoescape(["html"]),
+    )
+
+
+def test_precompiled_templates_are_loaded_from_modules(tmp_path):
+    tpl = tmp_path / "templates"
+    tpl.mkdir()
+    (tpl / "base.html").write_text("<b>{% block x %}{% endblock %}</b>", "utf-8")
+    (tpl / "page.html").write_text('{% extends "base.html" %}{% block x %}{{ v }}{% endblock %}', "utf-8")
+    env = _env(tpl)
+    assert template_aot.precompile(env, tpl, tmp_path / "aot") == (2, 0)
+    assert env.get_template("page.html").render(v="<x>") == "<b>&lt;x&gt;</b>"
+    assert env.loader.hits == 2 and env.loader.fallbacks == 0
+    # drugi przebieg: nic do kompilacji, nowy worker też ładuje moduły
+    assert template_aot.precompile(_env(tpl), tpl, tmp_path / "aot") == (0, 2)
+
+
+def test_changed_template_falls_back_to_source(tmp_path):
+    tpl = tmp_path / "templates"
+    tpl.mkdir()
+    page = tpl / "page.html"
+    page.write_text("old {{ v }}", "utf-8")
+    template_aot.precompile(_env(tpl), tpl, tmp_path / "aot")
+    page.write_text("new version {{ v }}", "utf-8")
+    st = page.stat()
+    os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    env = _env(tpl)
+    assert env.get_template("page.html").render(v=1) == "new version 1"
+    assert env.loader.fallbacks == 1
+    assert template_aot.precompile(env, tpl, tmp_path / "aot") == (1, 0)
+    assert _env(tpl).get_template("page.html").render(v=2) == "new version 2"
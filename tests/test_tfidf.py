@@ -0,0 +1,83 @@
+import json
+import sys
+from pathlib import Path
+
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemLoader
+
+sys.path.insert(0, str(Path("tools").resolve()))
+import tfidf  # noqa: E402
+
+
+def _corpus():
+    c = tfidf.Corpus()
+    c.update("pl", "/pl/ftl/", "Transport całopojazdowy FTL — naczepy plandekowe, chłodnie i transport krajowy")
+    c.update("pl", "/pl/ltl/", "Transport drobnicowy LTL — palety, drobnica i transport krajowy")
+    c.update("pl", "/pl/adr/", "Przewóz ADR — materiały niebezpieczne, naczepy i transport krajowy")
+    c.update("pl", "/pl/kontakt/", "Kontakt z biurem obsługi klienta w Krakowie")
+    c.update("en", "/en/ftl/", "Full truck load transport with curtain trailers")
+    return c
+
+
+def test_keywords_prefer_rare_terms_and_skip_stopwords():
+    c = _corpus()
+    kw = c.keywords("pl", "/pl/ftl/", 3)
+    assert "krajowy" not in kw  # obecne w prawie każdej stronie
+    assert "całopojazdowy" in kw
+    assert kw[0] == "transport"  # dwa wystąpienia: tf = 1 + log 2
+    assert "with" not in c.keywords("en", "/en/ftl/")
+    assert c.keywords("de", "/de/ftl/") == []
+
+
+def test_related_is_deterministic_and_per_language():
+    c = _corpus()
+    rel = c.related("pl", "/pl/ftl/", 2)
+    assert rel[0] == "/pl/adr/"  # wspólne „naczepy” ważą więcej niż sam „transport”
+    assert "/pl/ftl/" not in rel and "/en/ftl/" not in rel
+    assert c.related("pl", "/pl/ftl/", 2) == rel
+
+
+def test_incremental_update_corrects_document_frequency():
+    c = _corpus()
+    m = c.model("pl")
+    naczepy = m.vocab["naczepy"]
+    assert m.df[naczepy] == 2
+    c.updated = c.reused = 0
+    c.update("pl", "/pl/ftl/", "Transport całopojazdowy FTL — naczepy plandekowe, chłodnie i transport krajowy")
+    c.update("pl", "/pl/adr/", "Przewóz ADR — materiały niebezpieczne i transport krajowy")
+    assert (c.updated, c.reused) == (1, 1)
+    assert m.df[naczepy] == 1
+
+
+def test_prune_and_round_trip(tmp_path):
+    c = _corpus()
+    c.seen = {"pl": {"/pl/ftl/", "/pl/ltl/", "/pl/adr/"}}  # strony obecne w tym buildzie
+    assert c.prune() == 2  # /pl/kontakt/ i cały język en
+    assert set(c.langs) == {"pl"}
+
+    c = _corpus()
+    path = tmp_path / "tfidf.json.gz"
+    c.save(path)
+    loaded = tfidf.Corpus.load(path)
+    assert loaded.stats() == c.stats()
+    for key in ("/pl/ftl/", "/pl/kontakt/"):
+        assert loaded.keywords("pl", key) == c.keywords("pl", key)
+        assert loaded.related("pl", key) == c.related("pl", key)
+    loaded.update("pl", "/pl/ftl/", "Transport całopojazdowy FTL — naczepy plandekowe, chłodnie i transport krajowy")
+    assert (loaded.updated, loaded.reused) == (0, 1)
+    assert tfidf.Corpus.load(tmp_path / "brak.json.gz").langs == {}
+
+
+def test_templates_render_keywords_and_related():
+    report = json.loads(Path("dist/_reports/tfidf.json").read_text(encoding="utf-8"))["keywords"]
+    html = Path("dist/pl/index.html").read_text(encoding="utf-8")
+    assert f'<meta name="keywords" content="{", ".join(report["/pl/"])}" />' in html
+
+    env = Environment(loader=ChoiceLoader([
+        DictLoader({"base.html": "{% block content %}{% endblock %}"}), FileSystemLoader("templates")]))
+    tpl = env.get_template("pages/generic.html")
+    related = [{"url": "/pl/ltl/", "title": "LTL"}]
+    out = tpl.render(pg={}, STR=lambda k: "", tfidf={"keywords": [], "related": related})
+    assert '<li class="tile3d"><a href="/pl/ltl/">LTL</a></li>' in out
+    out = tpl.render(pg={}, STR=lambda k: "", tfidf={"related": related},
+                     neighbors=[{"url": "/pl/ftl/", "title": "FTL", "rel": "sibling"}])
+    assert 'data-rel="sibling"' in out and "/pl/ltl/" not in out  # sąsiedzi z grafu mają pierwszeństwo
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zasoby assets/ → dist/assets dla tools/build.py.
+- Kopiowane są tylko pliki nowe albo zmienione (rozmiar/mtime źródła ≠ kopii;
+  copy2 zachowuje mtime). Pomijane: wejścia builda (EXCLUDE, np. *.csv, i ścieżki
+  z sources.* w pages.yml) oraz pliki, które build i tak generuje (bundle menu).
+  Pliki usunięte ze źródła znikają z dist/ (stan: .build-cache/assets.json).
+- Odciski treści: CSS, JS, fonty i obrazy (FINGERPRINT) dostają kopię
+  ``nazwa.<hash>.ext`` obok oryginału; oryginał zostaje dla adresów budowanych
+  w JS (np. flagi). W CSS adresy /assets/… są podmieniane przed liczeniem hasha.
+  Kopie z hashem z poprzedniego builda zostają jeszcze na jeden build (strony
+  z cache CDN mogą ich używać), starsze są usuwane.
+- Mapa adresów (oryginał → adres z hashem) trafia do dist/assets/asset-manifest.json,
+  do funkcji asset() w szablonach i do pliku _headers (hashowane = immutable).
+"""
+from __future__ import annotations
+import fnmatch, hashlib, json, os, re, shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+STATE = Path(".build-cache") / "assets.json"
+MANIFEST_NAME = "asset-manifest.json"
+EXCLUDE = ("*.csv", "*.tsv", "*.xlsx", "*.xls", ".keep", ".gitkeep", ".DS_Store")
+FINGERPRINT = (".css", ".js", ".mjs", ".woff2", ".woff", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif")
+HASH_LEN = 8
+IMMUTABLE = "public, max-age=31536000, immutable"
+_REF_RE = re.compile(r"/assets/[^\s\"'()<>,]+")
+
+def hashed_name(rel: str, digest: str) -> str:
+    """„css/site.css” + skrót → „css/site.<hash>.css”."""
+    head, dot, ext = rel.rpartition(".")
+    return f"{head}.{digest[:HASH_LEN]}.{ext}" if dot and "/" not in ext else f"{rel}.{digest[:HASH_LEN]}"
+
+def rewrite(text: str, mapping: Dict[str, str]) -> str:
+    """Podmienia znane adresy /assets/… na adresy z hashem (reszta bez zmian)."""
+    return _REF_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), text)
+
+def _load(path: Optional[Path]) -> Dict[str, Any]:
+    if not path:
+        return {}
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _excluded(rel: str, patterns: Tuple[str, ...]) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatchcase(rel, p) or fnmatch.fnmatchcase(name, p) for p in patterns)
+
+def sync(src: Path, dest: Path, url_prefix: str = "/assets/", exclude: Iterable[str] = EXCLUDE,
+         generated: Iterable[str] = (), fingerprint: Iterable[str] = FINGERPRINT,
+         state_path: Optional[Path] = STATE) -> Dict[str, Any]:
+    """Synchronizuje ``src`` → ``dest``; zwraca {"files": mapa adresów, "copied", "unchanged", …}."""
+    src, dest = Path(src), Path(dest)
+    exclude, fingerprint = tuple(exclude), tuple(e.lower() for e in fingerprint)
+    generated = set(generated)
+    state = _load(state_path)
+    digests: Dict[str, List[Any]] = state.get("digests", {})
+    stats = {"copied": 0, "unchanged": 0, "excluded": 0, "removed": 0, "hashed": 0}
+    copied: List[str] = []
+    to_hash: List[str] = []
+    for dirpath, dirnames, names in os.walk(src):
+        dirnames.sort()
+        rel_dir = Path(dirpath).relative_to(src).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for name in sorted(names):
+            rel = prefix + name
+            if rel in generated:
+                continue
+            if _excluded(rel, exclude):
+                stats["excluded"] += 1
+                if (dest / rel).is_file():  # kopia ze starszego builda (pełny copytree)
+                    (dest / rel).unlink()
+                    stats["removed"] += 1
+                continue
+            s, d = src / rel, dest / rel
+            st = s.stat()
+            try:
+                dt = d.stat()
+                same = dt.st_size == st.st_size and dt.st_mtime_ns == st.st_mtime_ns
+            except FileNotFoundError:
+                same = False
+            if same:
+                stats["unchanged"] += 1
+            else:
+                d.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(s, d)
+                stats["copied"] += 1
+            copied.append(rel)
+            if name.lower().endswith(fingerprint):
+                to_hash.append(rel)
+
+    # odciski: najpierw wszystko poza CSS, potem CSS z podmienionymi adresami
+    mapping: Dict[str, str] = {}
+    new_digests: Dict[str, List[Any]] = {}
+    hashed: List[str] = []
+    for rel in sorted(to_hash, key=lambda r: (r.lower().endswith(".css"), r)):
+        s = src / rel
+        st = s.stat()
+        if rel.lower().endswith(".css"):
+            data = rewrite(s.read_text("utf-8"), mapping).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            data = None
+            hit = digests.get(rel)
+            if isinstance(hit, list) and hit[:2] == [st.st_size, st.st_mtime_ns]:
+                digest = hit[2]
+            else:
+                digest = hashlib.sha256(s.read_bytes()).hexdigest()
+        new_digests[rel] = [st.st_size, st.st_mtime_ns, digest]
+        out_rel = hashed_name(rel, digest)
+        out = dest / out_rel
+        if not out.exists():  # nazwa z hashem = ta sama treść
+            if data is None:
+                shutil.copy2(s, out)
+            else:
+                out.write_bytes(data)
+            stats["hashed"] += 1
+        hashed.append(out_rel)
+        mapping[url_prefix + rel] = url_prefix + out_rel
+
+    # sprzątanie: pliki usunięte ze źródła i kopie z hashem starsze niż poprzedni build
+    keep = set(copied) | set(hashed) | set(state.get("hashed", []))
+    for rel in sorted((set(state.get("copied", [])) | set(state.get("hashed_previous", []))) - keep):
+        if rel in generated:
+            continue
+        try:
+            (dest / rel).unlink()
+            stats["removed"] += 1
+        except FileNotFoundError:
+            pass
+    if state_path:
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(state_path).write_text(json.dumps({
+            "copied": copied, "hashed": hashed,
+            "hashed_previous": sorted(set(state.get("hashed", [])) - set(hashed)),
+            "digests": new_digests,
+        }, ensure_ascii=False, separators=(",", ":")), "utf-8")
+    return {"files": mapping, **stats}
+
+def manifest_json(mapping: Dict[str, str]) -> str:
+    return json.dumps({"version": 1, "files": dict(sorted(mapping.items()))}, ensure_ascii=False, indent=1)
+
+def headers_file(mapping: Dict[str, str]) -> str:
+    """Plik _headers (Netlify / Cloudflare Pages): zasoby z hashem w nazwie są niezmienne."""
+    lines = ["# tools/build.py (asset_pipeline): zasoby z hashem w nazwie"]
+    for url in sorted(mapping.values()):
+        lines += [url, f"  Cache-Control: {IMMUTABLE}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Autolinki (autolinks.inline / autolinks.fallback z pages.yml) dla tools/build.py.
+- Jedno przejście po drzewie strony: poddrzewa z inline.ignoreSelectors są
+  oznaczane raz (zbiór id węzłów), a przy zejściu w dół flaga „pomiń” jest
+  dziedziczona, zamiast sprawdzać rodziców każdego akapitu.
+- Wszystkie kotwice języka szukane są naraz automatem Aho-Corasick
+  (keyword_automaton) w tekście <p>/<li> bez własnych linków; trafienie dzieli
+  węzeł tekstowy na tekst + <a> + tekst (bez serializacji i ponownego parsowania).
+- Limity: maxPerPage, minDistanceChars (odstęp od poprzedniego autolinku oraz
+  od początku długiego akapitu), każda reguła raz na stronę, jeden link na
+  akapit, bez linków do samej strony. Reguły bez trafienia trafiają do kart
+  „Zobacz też” (fallback.limit).
+- W tym samym przejściu: rel/target dla linków zewnętrznych, loading/decoding
+  (i fetchpriority w hero) dla obrazów.
+Parsowany jest tylko <main> (nagłówek z menu to większość dokumentu), a wynik
+wklejany z powrotem w HTML. Silnik działa w workerach renderu; bez reguł dla
+języka HTML nie jest dotykany.
+"""
+from __future__ import annotations
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+import keyword_automaton
+
+DEFAULT_CFG = {
+    "inline": {"ignoreSelectors": ["h1", "h2", "h3", ".hero", ".cta", ".btn", "nav", "header", "footer", ".no-autolink"],
+               "maxPerPage": 6, "minDistanceChars": 40},
+    "fallback": {"enabled": True, "limit": 3},
+}
+SEE_ALSO = {"pl": "Zobacz też", "en": "See also", "de": "Siehe auch", "fr": "Voir aussi",
+            "it": "Vedi anche", "ru": "См. также", "ua": "Див. також"}
+BLOCKS = ("p", "li")
+_SKIP_TAGS = {"script", "style", "noscript", "template", "a", "code", "pre"}
+_PLAIN_RE = re.compile(r"\w+(?:\s+\w+)*", re.U)  # kotwica nie przechodzi przez interpunkcję
+
+def is_external(href: str, site_url: str) -> bool:
+    return bool(re.match(r"^https?://", href)) and (not href.startswith(site_url))
+
+class AutolinkEngine:
+    """Reguły i automaty kotwic per język; ``apply()`` przetwarza jedną stronę."""
+
+    def __init__(self, rules: Sequence[Dict[str, str]], cfg: Optional[Dict[str, Any]] = None,
+                 site_url: str = "", langs: Sequence[str] = (), explainers: Optional[Dict[str, str]] = None):
+        cfg = cfg or DEFAULT_CFG
+        inline = {**DEFAULT_CFG["inline"], **(cfg.get("inline") or {})}
+        fallback = {**DEFAULT_CFG["fallback"], **(cfg.get("fallback") or {})}
+        self.ignore: List[str] = list(inline["ignoreSelectors"] or [])
+        self.max_per_page = int(inline["maxPerPage"])
+        self.min_dist = int(inline["minDistanceChars"])
+        self.fallback = bool(fallback["enabled"])
+        self.fallback_limit = int(fallback["limit"])
+        self.site_url = site_url
+        self.explainers = explainers or {}
+        self.rules: Dict[str, List[Dict[str, str]]] = {}
+        self.matchers: Dict[str, keyword_automaton.Automaton] = {}
+        for r in rules:
+            for L in ([r["lang"]] if r.get("lang") else list(langs)):
+                lst = self.rules.setdefault(L, [])
+                a = self.matchers.setdefault(L, keyword_automaton.Automaton())
+                a.add(r["anchor"], "autolink", rule=len(lst))
+                lst.append(r)
+        for a in self.matchers.values():
+            a.build()
+
+    # ------------------------------ strona ------------------------------
+    def apply(self, html: str, lang: str, self_url: str = "") -> Tuple[str, int, int]:
+        """Zwraca (html, linki w tekście, karty fallback); bez zmian — ten sam html."""
+        rules = self.rules.get(lang)
+        if not rules:
+            return html, 0, 0
+        html = html or ""
+        lo, hi = html.find("<main"), html.rfind("</main>")
+        if lo < 0 or hi < lo:
+            lo, hi = 0, len(html) - len("</main>")
+        soup = BeautifulSoup(html[lo:hi + len("</main>")], "html.parser")
+        ignored = {id(el) for sel in self.ignore for el in soup.select(sel)}
+        matcher = self.matchers[lang]
+        used = set()
+        made = 0
+        changed = False
+        pos = 0              # przesunięcie w tekście strony (tylko akapity kandydujące)
+        last_end = None      # koniec poprzedniego autolinku w tym układzie
+        stack: List[Tuple[Any, bool, bool]] = [(soup, False, False)]
+        while stack:
+            node, skip, hero = stack.pop()
+            if not isinstance(node, Tag):
+                continue
+            skip = skip or id(node) in ignored
+            hero = hero or node.get("id") == "hero"
+            if node.name == "img":
+                changed |= self._img_defaults(node, hero)
+            elif node.name == "a" and node.get("href"):
+                changed |= self._ext_attrs(node)
+            if node.name in BLOCKS and not skip and made < self.max_per_page and not node.find("a"):
+                text_len, link = self._link_block(soup, node, matcher, rules, used, self_url, pos, last_end)
+                if link is not None:
+                    made += 1
+                    last_end = link
+                pos += text_len
+            if node.name not in _SKIP_TAGS or node.name == "a":  # do <a> schodzimy po obrazy
+                stack.extend((c, skip or node.name in BLOCKS, hero) for c in reversed(node.contents)
+                             if isinstance(c, Tag))
+        fb = self._fallback(soup, lang, rules, used, self_url, made) if self.fallback else 0
+        if not (made or fb or changed):
+            return html, 0, 0
+        return html[:lo] + str(soup) + html[hi + len("</main>"):], made, fb
+
+    def _link_block(self, soup: BeautifulSoup, block: Tag, matcher: "keyword_automaton.Automaton",
+                    rules: List[Dict[str, str]], used: set, self_url: str, pos: int,
+                    last_end: Optional[int]) -> Tuple[int, Optional[int]]:
+        """Pierwsza dozwolona kotwica w akapicie → <a>; zwraca (długość tekstu, koniec linku)."""
+        nodes = [s for s in block.find_all(string=True) if type(s) is NavigableString and not _in_skipped(s, block)]
+        total = sum(len(s) for s in nodes)
+        offset = 0
+        for s in nodes:
+            text = str(s)
+            for pid, start, end in sorted(matcher.scan(text), key=lambda h: (h[1], h[1] - h[2])):
+                idx = matcher.patterns[pid]["rule"]
+                rule = rules[idx]
+                at = pos + offset + start
+                if idx in used or rule["href"] == self_url or not _PLAIN_RE.fullmatch(text[start:end]):
+                    continue
+                if total > 2 * self.min_dist and offset + start < self.min_dist:
+                    continue  # nie na samym początku długiego akapitu
+                if last_end is not None and at - last_end < self.min_dist:
+                    continue
+                a = soup.new_tag("a", href=rule["href"], title=rule["anchor"])
+                a.string = text[start:end]
+                s.replace_with(*(x for x in (text[:start], a, text[end:]) if not isinstance(x, str) or x))
+                used.add(idx)
+                return total, pos + offset + end
+            offset += len(text)
+        return total, None
+
+    def _fallback(self, soup: BeautifulSoup, lang: str, rules: List[Dict[str, str]], used: set,
+                  self_url: str, made: int) -> int:
+        missed = [r for i, r in enumerate(rules) if i not in used and r["href"] != self_url]
+        room = max(0, self.fallback_limit - made)
+        cont = soup.find(id="content") or soup.find("article") or soup.find("main") or soup.body
+        if not missed or not room or cont is None:
+            return 0
+        h = soup.new_tag("h3")
+        h.string = SEE_ALSO.get(lang, "See also")
+        wrap = soup.new_tag("div", attrs={"class": "see-also cards"})
+        expl = self.explainers.get(lang, "")
+        for r in missed[:room]:
+            card = soup.new_tag("article", attrs={"class": "tile3d"})
+            p = soup.new_tag("p")
+            p.string = expl or r["anchor"]
+            a = soup.new_tag("a", href=r["href"], attrs={"class": "tile-link"})
+            a.string = r["anchor"]
+            card.append(p)
+            card.append(a)
+            wrap.append(card)
+        cont.append(h)
+        cont.append(wrap)
+        return len(missed[:room])
+
+    # ------------------------------ atrybuty ------------------------------
+    def _ext_attrs(self, a: Tag) -> bool:
+        href = a["href"]
+        if href.startswith(("mailto:", "tel:")) or not is_external(href, self.site_url):
+            return False
+        rel = sorted(set(a.get("rel") or []) | {"noopener", "noreferrer"})
+        if a.get("rel") == rel and a.get("target") == "_blank":
+            return False
+        a["rel"] = rel
+        a["target"] = "_blank"
+        return True
+
+    @staticmethod
+    def _img_defaults(img: Tag, hero: bool) -> bool:
+        before = dict(img.attrs)
+        img.attrs.setdefault("loading", "lazy")
+        img.attrs.setdefault("decoding", "async")
+        if hero or "hero-media" in (img.get("class") or []):
+            img["fetchpriority"] = "high"
+            img["loading"] = "eager"
+        return img.attrs != before
+
+def _in_skipped(s: NavigableString, block: Tag) -> bool:
+    p = s.parent
+    while p is not None and p is not block:
+        if p.name in _SKIP_TAGS:
+            return True
+        p = p.parent
+    return False
@@ -11,7 +11,7 @@ CELE:
 NAJWAŻNIEJSZE FUNKCJE:
 - ENV override: SITE_URL, GA_ID, GSC_VERIFICATION, INDEXNOW_KEY, BING_SITE_AUTH_USER, NEWS_ENABLED
 - CMS: wczytywanie z lokalnych plików data/cms, robust timeout/log
-- Kopiowanie assets/ → dist/assets
+- Kopiowanie assets/ → dist/assets (tylko zmienione; odciski treści + asset() w szablonach)
 - Render Jinja + autolinki + sanity DOM (a11y/perf)
 - Head injections (jeśli brakuje w szablonie): GA (gtag), GSC meta, canonical, hreflang, OG/Twitter, JSON-LD
 - Root "/" = redirect do /{defaultLang}/ + GSC meta + canonical
@@ -27,26 +27,52 @@ OPCJONALNE:
 
 UŻYCIE (CI):
   python -u tools/build.py
+  python -u tools/build.py --jobs 4     # render w puli procesów (albo BUILD_JOBS=4)
+  python -u tools/build.py --force      # pomiń cache (.build-cache/manifest.json)
+  BUILD_PROFILE=cprofile python -u tools/build.py   # + najgorętsze funkcje renderu (albo =sample)
+  Etapy builda (czas, CPU, RSS, liczniki): dist/_reports/build-profile.json
 """
-import os, json, shutil
+import os, json, argparse
+from functools import cached_property, lru_cache
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from bs4 import BeautifulSoup
 try:
     import cms_ingest  # nasz mały moduł do czytania XLSX (pkt 4 poniżej)
 except Exception:
     cms_ingest = None
-import re, io, csv, math, sys, time, glob, hashlib, unicodedata, pathlib
+import re, io, csv, math, sys, time, glob, unicodedata, pathlib
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Tuple, Iterable, Optional, Set
+from typing import Dict, Any, List, Tuple, Iterable, Optional, Sequence, Set
 
 # --------------------------- ZALEŻNOŚCI ------------------------------------
 try:
     import yaml
     from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+    from markupsafe import escape as html_escape
     from markdown import markdown
-    import requests
     import menu_builder  # tools/menu_builder.py
+    import build_cache   # tools/build_cache.py (manifest builda przyrostowego)
+    import build_profile # tools/build_profile.py (etapy builda + profiler renderu)
+    import template_aot  # tools/template_aot.py (prekompilowane szablony + bytecode cache)
+    import fragment_cache  # tools/fragment_cache.py (cached_include dla header/footer)
+    import city_service    # tools/city_service.py (strumień stron miasto × usługa)
+    import link_graph      # tools/link_graph.py (sąsiedzi stron miasto × usługa)
+    import near_duplicates # tools/near_duplicates.py (SimHash + LSH)
+    import tfidf           # tools/tfidf.py (korpusowy TF-IDF per język)
+    import seo_score       # tools/seo_score.py (ocena seo.scoring w workerach)
+    import keyword_automaton  # tools/keyword_automaton.py (Aho-Corasick fraz kluczowych)
+    import autolinks       # tools/autolinks.py (autolinki w jednym przejściu, w workerach)
+    import page_analysis   # tools/page_analysis.py (jedna analiza HTML strony na build)
+    import output_sink     # tools/output_sink.py (zapis dist/ tylko przy zmianie, pula wątków I/O)
+    import deploy_manifest # tools/deploy_manifest.py (dist/_manifest.json + zmienione adresy dla IndexNow)
+    import search_index    # tools/search_index.py (odwrócony indeks wyszukiwarki w kawałkach)
+    import link_checker    # tools/link_checker.py (linki, zasoby, kotwice i przekierowania w pamięci)
+    import sitemap_writer  # tools/sitemap_writer.py (strumieniowe sitemap-N.xml.gz)
+    import precompress     # tools/precompress.py (.br/.gz obok plików tekstowych)
+    import asset_pipeline  # tools/asset_pipeline.py (kopia przyrostowa assets/, nazwy z hashem, _headers)
     try:
         from slugify import slugify as _slugify
     except Exception:
@@ -178,7 +204,6 @@ def _ssr_home(lang:str) -> Dict[str, Any]:
 # --------------------------- POMOCNICZE ------------------------------------
 ROOT = Path(".")
 DIST = Path("dist")
-DIST.mkdir(parents=True, exist_ok=True)
 DATA = Path("data")
 OUT = DIST
 
@@ -210,16 +235,26 @@ def read_yaml(path: "str|pathlib.Path") -> Dict[str, Any]:
 def read_text(p: pathlib.Path) -> str:
     return p.read_text("utf-8") if p.exists() else ""
 
+# Sink zapisu dist/ na czas build_all (poza buildem zapis bezpośredni).
+SINK: Optional["output_sink.OutputSink"] = None
+# Adresy zasobów z hashem (asset_pipeline) dla asset() w szablonach; workery dostają je w shared.
+ASSET_MAP: Dict[str, str] = {}
+
+def asset(path: str) -> str:
+    """/assets/css/site.css (albo css/site.css) → adres z hashem treści; nieznany adres bez zmian."""
+    path = str(path or "")
+    key = path if path.startswith("/assets/") else "/assets/" + path.lstrip("/")
+    return ASSET_MAP.get(key) or path
+
 def write_text(p: Path, s: str):
+    if SINK is not None:
+        SINK.write(p, s)
+        return
     p.parent.mkdir(parents=True, exist_ok=True)
     p.write_text(s, "utf-8")
 
 write = write_text
 
-SITE = read_yaml(DATA/"site.yml") if (DATA/"site.yml").exists() else {}
-SITE.setdefault("privacy", {})
-SITE["privacy"].setdefault("referrerPolicy", "strict-origin-when-cross-origin")
-
 def ensure_dir(p: pathlib.Path):
     p.mkdir(parents=True, exist_ok=True)
 
@@ -379,8 +414,7 @@ def _split_lang_rel(slug: str):
 def _out_for(L: str, rel: str) -> Path:
     base = Path("dist")/L
     if rel: base = base/rel
-    base.mkdir(parents=True, exist_ok=True)
-    return base/"index.html"
+    return base/"index.html"  # katalogi zakłada hurtem OutputSink.prepare
 
 def resolve_template(page: Dict[str, Any]) -> str:
     """Return template path relative to ``templates/`` with fallbacks."""
@@ -417,100 +451,69 @@ def soupify(html: str) -> BeautifulSoup:
 def text_of(html: str) -> str:
     return soupify(html).get_text(" ", strip=True)
 
-def is_external(href: str, site_url: str) -> bool:
-    return bool(re.match(r"^https?://", href)) and (not href.startswith(site_url))
-
-def set_img_defaults(soup: BeautifulSoup):
-    # lazy + hero LCP
-    for img in soup.find_all("img"):
-        if "loading" not in img.attrs:   img["loading"]="lazy"
-        if "decoding" not in img.attrs:  img["decoding"]="async"
-        if img.find_parent(id="hero") or "hero-media" in (img.get("class") or []):
-            img["fetchpriority"]="high"; img["loading"]="eager"
-
-def set_ext_link_attrs(soup: BeautifulSoup, site_url: str):
-    for a in soup.find_all("a", href=True):
-        href=a["href"]
-        if href.startswith("mailto:") or href.startswith("tel:"): continue
-        if is_external(href, site_url):
-            rel=set(a.get("rel") or []); rel.update(["noopener","noreferrer"]); a["rel"]=list(rel)
-            a["target"]="_blank"
-
 def hash_stable(s: str) -> int:
     h=5381
     for ch in (s or ""): h=((h<<5)+h)+ord(ch)
     return abs(h)
 
-def simhash(tokens: List[str], bits:int=64)->int:
-    v=[0]*bits
-    for t in tokens:
-        h=int(hashlib.md5(t.encode("utf-8")).hexdigest(),16)
-        for i in range(bits):
-            v[i]+=1 if (h>>i)&1 else -1
-    out=0
-    for i in range(bits):
-        if v[i]>0: out|=(1<<i)
-    return out
-
-def hamming(a:int,b:int)->int:
-    return (a^b).bit_count()
-
-def tfidf_keywords(text:str, top:int=8) -> List[str]:
-    tokens=[w.lower() for w in re.findall(r"[a-zA-ZąćęłńóśźżĄĆĘŁŃÓŚŹŻ0-9]{3,}", text)]
-    freq={}
-    for t in tokens: freq[t]=freq.get(t,0)+1
-    return [k for k,_ in sorted(freq.items(), key=lambda kv: kv[1], reverse=True)[:top]]
-
 # --------------------------- KONFIG + ENV -----------------------------------
-CFG = read_yaml("pages.yml")
-C   = CFG.get("constants", {})
+CANONICAL_BASE = "https://kras-trans.com"
+LANGS = {"pl","en","de","fr","it","ru","ua"}
+ASSETS_DIR = pathlib.Path("assets")
 
 def _env(name: str, default: Any) -> Any:
     v = os.getenv(name)
     return default if v is None or str(v).strip()=="" else v
 
-SITE_URL = (_env("SITE_URL", C.get("SITE_URL","")) or "").rstrip("/")
-CANONICAL_BASE = "https://kras-trans.com"
-GA_ID    = _env("GA_ID", C.get("GA_ID",""))
-GSC      = _env("GSC_VERIFICATION", C.get("GSC_VERIFICATION",""))
-INDEXNOW_KEY = _env("INDEXNOW_KEY", C.get("INDEXNOW_KEY",""))
-BING_USER    = _env("BING_SITE_AUTH_USER", C.get("BING_SITE_AUTH_USER",""))
-NEWS_ENABLED = str(_env("NEWS_ENABLED", C.get("NEWS_ENABLED", False))).lower() in ("1","true","yes")
-
-DEFAULT_LANG = CFG.get("site",{}).get("defaultLang","pl")
-LOCALES      = list((CFG.get("site",{}).get("locales") or {}).keys()) or ["pl"]
-LANGS = {"pl","en","de","fr","it","ru","ua"}
-
-# --------------------------- KOPIOWANIE ASSETS ------------------------------
-ASSETS_DIR = pathlib.Path("assets")
-if ASSETS_DIR.exists():
-    shutil.copytree(ASSETS_DIR, OUT / "assets", dirs_exist_ok=True)
+def _settings(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Stałe z pages.yml (constants/site) z nadpisaniem przez ENV."""
+    C = cfg.get("constants", {})
+    return {
+        "SITE_URL": (_env("SITE_URL", C.get("SITE_URL","")) or "").rstrip("/"),
+        "GA_ID": _env("GA_ID", C.get("GA_ID","")),
+        "GSC": _env("GSC_VERIFICATION", C.get("GSC_VERIFICATION","")),
+        "INDEXNOW_KEY": _env("INDEXNOW_KEY", C.get("INDEXNOW_KEY","")),
+        "BING_USER": _env("BING_SITE_AUTH_USER", C.get("BING_SITE_AUTH_USER","")),
+        "NEWS_ENABLED": str(_env("NEWS_ENABLED", C.get("NEWS_ENABLED", False))).lower() in ("1","true","yes"),
+        "DEFAULT_LANG": cfg.get("site",{}).get("defaultLang","pl"),
+        "LOCALES": list((cfg.get("site",{}).get("locales") or {}).keys()) or ["pl"],
+    }
 
 # ---------------------------- ŚRODOWISKO JINJA -----------------------------
-TEMPLATES = Path(CFG["paths"]["src"]["templates"])
-env = Environment(
-    loader=FileSystemLoader(TEMPLATES),
-    autoescape=select_autoescape(["html"])
-)
+def make_env(cfg: Dict[str, Any], templates: Path) -> Environment:
+    """Nowe środowisko Jinja z globalami z pages.yml (jedno na proces/worker).
+
+    Szablony przychodzą z modułów prekompilowanych (template_aot), a zmienione
+    od ostatniej kompilacji — ze źródła przez trwały bytecode cache.
+    """
+    e = Environment(
+        loader=template_aot.loader(templates),
+        autoescape=select_autoescape(["html"]),
+        bytecode_cache=template_aot.bytecode_cache(),
+    )
+    # Globalne dane dostępne w szablonach
+    settings = _settings(cfg)
+    e.globals.update({
+      "site": cfg.get("site", {}),
+      "cms_endpoint": "",  # Apps Script wyłączony
+      "ga_id": settings["GA_ID"],
+      "gsc_verification": settings["GSC"],
+      "assets": cfg.get("assets", {}),
+      "asset": asset,
+    })
+    e.filters["asset"] = asset
+    # Nawigacja + konfiguracja headera (_partials/header.html)
+    e.globals.update({
+        "nav": cfg.get("navigation", {}),
+        "header_cfg": cfg.get("header", {})
+    })
+    # cached_include/fragment_hole: header/footer renderowane raz na język w procesie
+    fragment_cache.install(e, timer=lambda name: _TIMES(name))
+    return e
 
 def render_template(name: str, ctx: Dict[str, Any]) -> str:
     return env.get_template(name).render(**ctx)
 
-# Globalne dane dostępne w szablonach
-env.globals.update({
-  "site": CFG.get("site", {}),
-  "cms_endpoint": "",  # Apps Script wyłączony
-  "ga_id": GA_ID,
-  "gsc_verification": GSC,
-  "assets": CFG.get("assets", {})
-})
-
-# Nawigacja + konfiguracja headera (_partials/header.html)
-env.globals.update({
-    "nav": CFG.get("navigation", {}),
-    "header_cfg": CFG.get("header", {})
-})
-
 # --------------------------- CMS: load (LOCAL) ------------------------------
 def _cms_local_read() -> Dict[str, Any]:
     """
@@ -550,13 +553,16 @@ def _cms_local_read() -> Dict[str, Any]:
         p_xlsx = base / "cms.xlsx"
     if p_xlsx.exists():
         try:
-            import openpyxl
-            wb = openpyxl.load_workbook(p_xlsx, read_only=True, data_only=True)
-            ws = wb.worksheets[0]
-            headers = [str(c.value).strip() if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))]
+            if cms_ingest:
+                _, sheet_rows = cms_ingest.load_sheets(p_xlsx)[0]  # snapshot, jeśli świeży
+            else:
+                import openpyxl
+                wb = openpyxl.load_workbook(p_xlsx, read_only=True, data_only=True)
+                sheet_rows = list(wb.worksheets[0].iter_rows(values_only=True))
+            headers = [str(v).strip() if v is not None else "" for v in sheet_rows[0]]
             idx = {h: i for i, h in enumerate(headers)}
             rows = []
-            for row in ws.iter_rows(min_row=2, values_only=True):
+            for row in sheet_rows[1:]:
                 d = {h: (row[idx[h]] if h in idx else "") for h in headers}
                 rows.append({(k or "").strip(): (str(v or "").strip()) for k, v in d.items()})
             print(f"[CMS] Lokalnie: {p_xlsx}")
@@ -586,38 +592,42 @@ def _cms_local_read() -> Dict[str, Any]:
         "blog": [],
     }
 
-def load_cms() -> Dict[str, Any]:
-    base = pathlib.Path("data") / "cms"
-    if cms_ingest:
-        try:
-            data = cms_ingest.load_all(base)
-            if data:
-                print(data.get("report", ""))
-                blocks_list = []
-                for lang, m in (data.get("blocks") or {}).items():
-                    for path, obj in m.items():
-                        b = {"lang": lang, "path": path}
-                        b.update(obj)
-                        blocks_list.append(b)
-                cms = {
-                    "ok": True,
-                    "pages": data.get("pages_rows", []),
-                    "blocks": blocks_list,
-                    "faq": data.get("faq_rows", []),
-                    "strings": data.get("strings", []),
-                    "props": data.get("props_rows", []),
-                    "hreflang": data.get("page_routes", {}),
-                    "menu_rows": data.get("menu_rows", []),
-                    "page_meta": data.get("page_meta", {}),
-                    "routes": data.get("routes", {}),
-                    "blog": data.get("blog_rows", []),
-                }
-                return cms
-        except Exception as e:
-            print(f"[CMS] cms_ingest error: {e}", file=sys.stderr)
-    return _cms_local_read()
+def _cms_ingest_read() -> Optional[Dict[str, Any]]:
+    """Jedyny parse workbooka w procesie (przez BuildContext.cms_data)."""
+    if not cms_ingest:
+        return None
+    data = cms_ingest.load_all(DATA / "cms")
+    print(data.get("report", "[cms] no report"))
+    return data
 
-CMS = load_cms()
+def load_cms(data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Znormalizowany widok CMS; surowe dane bierze z kontekstu (bez ponownego parsowania)."""
+    try:
+        data = data if data is not None else build_context().cms_data
+        if data:
+            blocks_list = []
+            for lang, m in (data.get("blocks") or {}).items():
+                for path, obj in m.items():
+                    b = {"lang": lang, "path": path}
+                    b.update(obj)
+                    blocks_list.append(b)
+            cms = {
+                "ok": True,
+                "pages": data.get("pages_rows", []),
+                "blocks": blocks_list,
+                "faq": data.get("faq_rows", []),
+                "strings": data.get("strings", []),
+                "props": data.get("props_rows", []),
+                "hreflang": data.get("page_routes", {}),
+                "menu_rows": data.get("menu_rows", []),
+                "page_meta": data.get("page_meta", {}),
+                "routes": data.get("routes", {}),
+                "blog": data.get("blog_rows", []),
+            }
+            return cms
+    except Exception as e:
+        print(f"[CMS] cms_ingest error: {e}", file=sys.stderr)
+    return _cms_local_read()
 
 # ---------------------------- CSV: cities / keywords ------------------------
 def read_csv(path:str, dialect="auto")->List[Dict[str,str]]:
@@ -651,21 +661,124 @@ def csv_map(rows:List[Dict[str,str]], mapping:Dict[str,List[str]])->List[Dict[st
         out.append(o)
     return out
 
-cities_src = CFG.get("sources",{}).get("cities_csv",{})
-cities_rows = csv_map(
-    read_csv(cities_src.get("path",""), cities_src.get("dialect","auto")),
-    cities_src.get("map_columns",{
+def _cities_rows(cfg: Dict[str, Any]) -> List[Dict[str, str]]:
+    cities_src = cfg.get("sources",{}).get("cities_csv",{})
+    if not cities_src: return []
+    mapping = cities_src.get("map_columns",{
         "city":["city","miasto"],"voivodeship":["voivodeship","region"],"slug":["slug"],"lang":["lang"]
     })
-) if cities_src else []
+    rows = read_csv(cities_src.get("path",""), cities_src.get("dialect","auto"))
+    if rows and len(rows[0]) == 1 and not any(k in al for k in rows[0] for al in mapping.values()):
+        # plik bez nagłówka (sama kolumna nazw, jak assets/media/city.csv): pierwszy wiersz to też miasto
+        first = next(iter(rows[0]))
+        col = (mapping.get("city") or ["city"])[0]
+        rows = [{col: n} for n in [first] + [r[first] for r in rows] if n]
+    return csv_map(rows, mapping)
+
+def _kw_rows(cfg: Dict[str, Any]) -> List[Dict[str, str]]:
+    kw_src = cfg.get("sources",{}).get("keywords_csv",{})
+    return csv_map(
+        read_csv(kw_src.get("path",""), kw_src.get("dialect","auto")),
+        kw_src.get("map_columns",{
+            "lang":["lang"],"term":["term","keyword"],"type":["type"],"weight":["weight"],"anchor":["anchor"]
+        })
+    ) if kw_src else []
 
-kw_src = CFG.get("sources",{}).get("keywords_csv",{})
-kw_rows = csv_map(
-    read_csv(kw_src.get("path",""), kw_src.get("dialect","auto")),
-    kw_src.get("map_columns",{
-        "lang":["lang"],"term":["term","keyword"],"type":["type"],"weight":["weight"],"anchor":["anchor"]
-    })
-) if kw_src else []
+# ------------------------- KONTEKST BUILDA (leniwy) -------------------------
+class BuildContext:
+    """
+    Stan builda budowany przy pierwszym użyciu: pages.yml, site.yml, CMS,
+    środowisko Jinja, CSV miast i słów kluczowych. Import modułu niczego
+    nie czyta ani nie kopiuje, a workbook jest parsowany raz na proces.
+    """
+
+    def __init__(self, root: Path = ROOT):
+        self.root = Path(root)
+
+    @cached_property
+    def cfg(self) -> Dict[str, Any]:
+        return read_yaml(self.root / "pages.yml")
+
+    @cached_property
+    def settings(self) -> Dict[str, Any]:
+        return _settings(self.cfg)
+
+    @cached_property
+    def site(self) -> Dict[str, Any]:
+        p = self.root / DATA / "site.yml"
+        site = (read_yaml(p) or {}) if p.exists() else {}
+        site.setdefault("privacy", {})
+        site["privacy"].setdefault("referrerPolicy", "strict-origin-when-cross-origin")
+        return site
+
+    @cached_property
+    def templates(self) -> Path:
+        return Path(self.cfg["paths"]["src"]["templates"])
+
+    @cached_property
+    def env(self) -> Environment:
+        return make_env(self.cfg, self.templates)
+
+    @cached_property
+    def cms_data(self) -> Optional[Dict[str, Any]]:
+        """Surowy wynik cms_ingest.load_all (None, gdy moduł niedostępny)."""
+        return _cms_ingest_read()
+
+    @cached_property
+    def cms(self) -> Dict[str, Any]:
+        return load_cms(self.cms_data)
+
+    @cached_property
+    def cities_rows(self) -> List[Dict[str, str]]:
+        return _cities_rows(self.cfg)
+
+    @cached_property
+    def kw_rows(self) -> List[Dict[str, str]]:
+        return _kw_rows(self.cfg)
+
+_CONTEXT: Optional[BuildContext] = None
+
+def build_context() -> BuildContext:
+    global _CONTEXT
+    if _CONTEXT is None:
+        _CONTEXT = BuildContext()
+    return _CONTEXT
+
+_seo = lambda c: c.cfg.get("seo", {})
+# Dawne globale modułu → wartości z kontekstu (materializowane przy pierwszym dostępie)
+_LAZY_GLOBALS = {
+    "CFG": lambda c: c.cfg,
+    "C": lambda c: c.cfg.get("constants", {}),
+    "SITE": lambda c: c.site,
+    "TEMPLATES": lambda c: c.templates,
+    "env": lambda c: c.env,
+    "CMS": lambda c: c.cms,
+    "cities_rows": lambda c: c.cities_rows,
+    "kw_rows": lambda c: c.kw_rows,
+    "TITLE_MIN": lambda c: _seo(c).get("titles",{}).get("min", 30),
+    "TITLE_MAX": lambda c: _seo(c).get("titles",{}).get("max", 65),
+    "DESC_MIN": lambda c: _seo(c).get("descriptions",{}).get("min", 80),
+    "DESC_MAX": lambda c: _seo(c).get("descriptions",{}).get("max", 165),
+    "THIN_MIN_CHARS": lambda c: c.cfg.get("collections",{}).get("city_service",{}).get("quality",{}).get("thin_min_chars", 400),
+    **{k: (lambda c, _k=k: c.settings[_k]) for k in (
+        "SITE_URL", "GA_ID", "GSC", "INDEXNOW_KEY", "BING_USER", "NEWS_ENABLED", "DEFAULT_LANG", "LOCALES",
+    )},
+}
+
+def __getattr__(name: str) -> Any:
+    """PEP 562: ``build.CFG``, ``build.CMS`` itd. liczone dopiero przy dostępie."""
+    getter = _LAZY_GLOBALS.get(name)
+    if getter is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getter(build_context())
+    globals()[name] = value
+    return value
+
+def bind_globals() -> None:
+    """Ustawia leniwe globale przed buildem (kod builda czyta je jako zwykłe globale)."""
+    for name in _LAZY_GLOBALS:
+        if name not in globals():
+            __getattr__(name)
 
 # ---------------------------- POMOC: wybór szablonu ------------------------
 def choose_template(page:Dict[str,Any])->str:
@@ -705,12 +818,12 @@ def base_pages() -> List[Dict[str, Any]]:
     return pages   # ← poza pętlą!
 
 # ------------------------ PAGES: city × service ----------------------------
-def merge_places()->List[Dict[str,str]]:
+def merge_places(slug_fn=norm_slug)->List[Dict[str,str]]:
     out=[]; seen=set()
     for row in CMS.get("places", []):
         lang=(row.get("lang") or "pl").lower()
         city=row.get("city") or ""
-        slug=row.get("slug") or norm_slug(city)
+        slug=row.get("slug") or slug_fn(city)
         key=f"{lang}::{slug}"
         if key in seen: continue
         seen.add(key)
@@ -718,58 +831,31 @@ def merge_places()->List[Dict[str,str]]:
     for row in cities_rows:
         lang=(row.get("lang") or "pl").lower()
         city=row.get("city") or ""
-        slug=row.get("slug") or norm_slug(city)
+        slug=row.get("slug") or slug_fn(city)
         key=f"{lang}::{slug}"
         if key in seen: continue
         seen.add(key)
         out.append({"lang":lang,"city":city,"voivodeship":row.get("voivodeship") or "","slug":slug})
     return out
 
-def generate_city_service()->List[Dict[str,Any]]:
-    cfg=CFG.get("collections",{}).get("city_service",{})
-    if not cfg: return []
-    per_lang = cfg.get("limits",{}).get("perLang", 0)
-    max_total= cfg.get("limits",{}).get("maxPages", 0)
-    langs    = cfg.get("langs", LOCALES)
-    services=[p for p in CMS.get("pages",[]) if (p.get("type")=="service" and p.get("publish",True))]
-    places=merge_places()
-    out=[]; total=0
-    for L in langs:
-        used=0
-        svcL=[s for s in services if (s.get("lang") or L)==L]
-        for svc in svcL:
-            svc_slug=svc.get("slug") or norm_slug(svc.get("slugKey") or svc.get("h1") or "service")
-            svc_h1=svc.get("h1") or svc.get("title") or svc_slug
-            for city in places:
-                if (city.get("lang") or L).lower()!=L: continue
-                city_slug=city.get("slug") or norm_slug(city.get("city") or "")
-                if not city_slug: continue
-                slug=norm_slug(f"{svc_slug}-{city_slug}")
-                h1=f"{svc_h1} — {city.get('city')}"
-                meta=f"Transport i spedycja — {svc_h1} w {city.get('city')}. Wycena w 15 min, kontakt 24/7."
-                row={
-                    "lang":L,"type":"city_service","slugKey":f"{svc.get('slugKey','service')}__{city_slug}",
-                    "slug":slug,"template":choose_template({"type":"city_service","slug":slug}),
-                    "publish":True,"h1":h1,"title":h1,"seo_title":f"{h1} | Kras-Trans","meta_desc":meta,
-                    "hero_alt":h1,"lead":svc.get("lead") or svc.get("title") or "",
-                    "og_image":svc.get("og_image") or CFG.get("seo",{}).get("open_graph",{}).get("default_image"),
-                    "canonical_path":f"/{L}/{slug}/",
-                    "city":city.get("city"),"voivodeship":city.get("voivodeship") or city.get("region") or "",
-                    "service_slug":svc_slug,"service_h1":svc_h1,"__from":"city_service",
-                    "body_html":""
-                }
-                out.append(row); used+=1; total+=1
-                if used>=per_lang or total>=max_total: break
-            if used>=per_lang or total>=max_total: break
-        if total>=max_total: break
-    return out
+def generate_city_service() -> "city_service.CityServicePages":
+    """Leniwy zbiór stron miasto × usługa (pusty, gdy kolekcja wyłączona)."""
+    cfg = CFG.get("collections", {}).get("city_service", {})
+    if not cfg or not cfg.get("generate", True):
+        return city_service.CityServicePages({}, [], [], norm_slug, [])
+    # cms.pages[type=service]: wiersze arkusza Pages (cms_ingest) trzymają h1/title/... w "meta",
+    # a klucz strony w "key"
+    services = [{**(p.get("meta") or {}), **p, "slugKey": p.get("slugKey") or p.get("key")}
+                for p in chain(CMS.get("pages", []), CMS.get("pages_rows", []))
+                if (p.get("type") == "service" and p.get("publish", True))]
+    # slugPolicy.transliterate: python-slugify zna też Ł/ł (NFD w norm_slug je gubi)
+    slug_fn = _slugify if ((cfg.get("slugPolicy") or {}).get("transliterate") and _slugify) else norm_slug
+    return city_service.CityServicePages(
+        cfg, services, merge_places(slug_fn), slug_fn, LOCALES,
+        og_image=CFG.get("seo", {}).get("open_graph", {}).get("default_image"),
+    )
 
 # ------------------------------ SEO / GATES --------------------------------
-TITLE_MIN = CFG.get("seo",{}).get("titles",{}).get("min", 30)
-TITLE_MAX = CFG.get("seo",{}).get("titles",{}).get("max", 65)
-DESC_MIN  = CFG.get("seo",{}).get("descriptions",{}).get("min", 80)
-DESC_MAX  = CFG.get("seo",{}).get("descriptions",{}).get("max", 165)
-THIN_MIN_CHARS = CFG.get("collections",{}).get("city_service",{}).get("quality",{}).get("thin_min_chars", 400)
 
 def clamp_len(s:str, minL:int, maxL:int)->Tuple[str,List[str]]:
     s=s or ""; warns=[]
@@ -783,11 +869,12 @@ def clamp_len(s:str, minL:int, maxL:int)->Tuple[str,List[str]]:
 def apply_quality(page:Dict[str,Any])->Tuple[Dict[str,Any],List[str]]:
     warns=[]
     page["seo_title"], w = clamp_len(page.get("seo_title") or page.get("title") or "", TITLE_MIN, TITLE_MAX); warns+=["title"+x for x in w]
-    fallback_desc = text_of(page.get("body_html",""))[:180]
+    body_text = text_of(page.get("body_html",""))  # jedno parsowanie treści na oba sprawdzenia
+    fallback_desc = body_text[:180]
     page["meta_desc"],  w = clamp_len(page.get("meta_desc") or fallback_desc, DESC_MIN, DESC_MAX); warns+=["desc"+x for x in w]
     if not (page.get("h1") or "").strip(): warns.append("missing_h1")
     # thin content – tylko generator
-    text_len=len(text_of(page.get("body_html","")))
+    text_len=len(body_text)
     if page.get("__from")=="city_service" and text_len<THIN_MIN_CHARS:
         page["noindex"]=True; warns.append(f"thin({text_len})")
     return page, warns
@@ -842,65 +929,24 @@ def fetch_explainer(lang:str)->str:
     body = pick.get("body_md") or pick.get("desc") or pick.get("title") or ""
     return text_of(md_to_html(body))[:600]
 
-def inject_autolinks(html:str, lang:str)->Tuple[str,int,int]:
+def autolink_rules()->List[Dict[str,str]]:
+    """Reguły autolinków z CMS (lang="" = każdy język); kolumny jak w arkuszu AutoLinks."""
     rules=[]
     for r in CMS.get("autolinks", []):
         if str(r.get("enabled","true")).lower() in ("false","0","no"): continue
-        rules.append({"anchor":(r.get("anchor") or r.get("a") or "").strip(),
-                      "href":(r.get("href") or "").strip(),
-                      "lang":(r.get("lang") or lang).lower()})
-    rules=[r for r in rules if r["anchor"] and r["href"] and r["lang"]==lang]
-    if not rules: return html,0,0
-
-    cfg=CFG.get("autolinks",{
-        "inline":{"ignoreSelectors":["h1","h2","h3",".hero",".cta",".btn","nav","header","footer",".no-autolink"],"maxPerPage":6,"minDistanceChars":40},
-        "fallback":{"enabled":True,"limit":3}
-    })
-    soup=soupify(html)
-    ignore_nodes=set()
-    for sel in cfg["inline"]["ignoreSelectors"]:
-        for el in soup.select(sel): ignore_nodes.add(el)
-
-    made=0; missed=[]
-    pattern_cache={}
-    maxN=cfg["inline"]["maxPerPage"]; minDist=cfg["inline"]["minDistanceChars"]
-
-    for r in rules:
-        if made>=maxN: break
-        anchor=r["anchor"]; href=r["href"]
-        found=False
-        for p in soup.find_all(["p","li"]):
-            if any(p is n or n in p.parents for n in ignore_nodes): continue
-            if p.find("a"): continue
-            txt=p.get_text()
-            if len(txt)>(minDist*2):
-                m=re.search(re.escape(anchor), txt, flags=re.IGNORECASE)
-                if m and m.start()<minDist: continue
-            if anchor not in pattern_cache:
-                pattern_cache[anchor]=re.compile(rf"(?<!\w){re.escape(anchor)}(?!\w)", flags=re.IGNORECASE)
-            html_p=str(p)
-            new=pattern_cache[anchor].sub(f'<a href="{href}" title="{anchor}">{anchor}</a>', html_p, count=1)
-            if new!=html_p:
-                p.replace_with(soupify(new)); made+=1; found=True; break
-        if not found: missed.append(r)
-
-    fb=0
-    if cfg["fallback"]["enabled"] and missed:
-        cont = soup.find(id="content") or soup.find("article") or soup.body
-        if cont:
-            title_map={"pl":"Zobacz też","en":"See also","de":"Siehe auch","fr":"Voir aussi","it":"Vedi anche","ru":"См. также","ua":"Див. також"}
-            h=soup.new_tag("h3"); h.string = title_map.get(lang,"See also"); cont.append(h)
-            wrap=soup.new_tag("div", **{"class":"see-also cards"})
-            expl = fetch_explainer(lang)
-            for r in missed[:max(0, cfg["fallback"]["limit"]-(made))]:
-                card=soup.new_tag("article", **{"class":"tile3d"})
-                p=soup.new_tag("p"); p.string = expl or r["anchor"]
-                a=soup.new_tag("a", href=r["href"], **{"class":"tile-link"}); a.string=r["anchor"]
-                card.append(p); card.append(a); wrap.append(card); fb+=1
-            cont.append(wrap)
-
-    set_ext_link_attrs(soup, SITE_URL); set_img_defaults(soup)
-    return str(soup), made, fb
+        rules.append({"anchor":(r.get("anchor") or r.get("a") or r.get("match") or "").strip(),
+                      "href":(r.get("href") or r.get("target_href") or "").strip(),
+                      "lang":(r.get("lang") or "").lower()})
+    return [r for r in rules if r["anchor"] and r["href"]]
+
+def build_keyword_index()->"keyword_automaton.KeywordIndex":
+    """Automaty fraz per język: CSV słów kluczowych, keywords.dynamic_phrases × miasta, kotwice autolinków."""
+    cities = [((r.get("lang") or "").lower(), r.get("city") or r.get("name") or "")
+              for r in chain(CMS.get("places", []), cities_rows)]
+    return keyword_automaton.KeywordIndex.from_sources(
+        kw_rows, (CFG.get("keywords", {}) or {}).get("dynamic_phrases", {}), cities,
+        autolink_rules(), langs=LOCALES,
+    )
 
 # ------------------------------ OG IMAGE (opcja) ---------------------------
 def og_image_for(page:Dict[str,Any])->Optional[str]:
@@ -928,124 +974,342 @@ def og_image_for(page:Dict[str,Any])->Optional[str]:
     return f"/og/{name}"
 
 # ------------------------------ HEAD INJECTIONS -----------------------------
-from bs4 import BeautifulSoup
-
-def ensure_head_injections(html: str, page: dict, hreflang_map: dict, *,
-                           site: dict, lang: str, meta_title: str,
-                           meta_description: str, canonical_url: str,
-                           canonical_path: str | None = None) -> str:
+def head_fields(page: dict, hreflang_map: dict, *, site: dict, meta_title: str,
+                meta_description: str, canonical_url: str) -> Dict[str, Any]:
     """
-    Wstrzykuje <title>, <meta>, <link rel='canonical'>, hreflang do <head>.
-    Używa attrs= zamiast kwargów kolidujących z 'name'.
+    Docelowe wartości <head> liczone raz, przy budowie zadania renderu.
+    Trafiają do kontekstu szablonu jako ``head`` (base.html emituje je wprost),
+    a ensure_head_injections tylko je dopina, jeśli szablon czegoś nie wypisał.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # head
-    head = soup.head
-    if not head:
-        head = soup.new_tag("head")
-        if soup.html:
-            soup.html.insert(0, head)
-        else:
-            soup.insert(0, head)
-
-    def set_title(text: str):
-        if not text:
-            return
-        t = head.find("title")
-        if not t:
-            t = soup.new_tag("title")
-            head.append(t)
-        t.string = text
-
-    def upsert_meta(**kv):
-        # przyjmuje np. upsert_meta(name="description", content="...")
-        # tworzy <meta ...> tylko przez attrs
-        if "name" in kv:
-            el = head.find("meta", attrs={"name": kv["name"]})
-        elif "property" in kv:
-            el = head.find("meta", attrs={"property": kv["property"]})
-        else:
-            el = None
-        if not el:
-            el = soup.new_tag("meta")
-            head.append(el)
-        el.attrs.clear()
-        el.attrs.update(kv)
-
-    def upsert_link(rel: str, href: str):
-        if not href:
-            return
-        el = head.find("link", attrs={"rel": rel})
-        if not el:
-            el = soup.new_tag("link")
-            head.append(el)
-        el.attrs.clear()
-        el.attrs.update({"rel": rel, "href": href})
-
-    # <title> i podstawowe meta
-    title_val = meta_title or page.get("title") or site.get("name")
-    if isinstance(title_val, dict):
-        title_val = site.get("name")
-    set_title(title_val)
-    if meta_description:
-        upsert_meta(name="description", content=meta_description)
-
-    # canonical
-    upsert_link("canonical", canonical_url)
-
-    # hreflang alternates
-    alts = hreflang_map or {}
-    for hrefl, href in alts.items():
-        el = soup.find("link", attrs={"rel": "alternate", "hreflang": hrefl})
-        if not el:
-            el = soup.new_tag("link")
-            head.append(el)
-        el.attrs.clear()
-        el.attrs.update({"rel": "alternate", "hreflang": hrefl, "href": href})
-
-    # Open Graph (minimal)
-    upsert_meta(property="og:title", content=meta_title or site.get("name",""))
-    if meta_description:
-        upsert_meta(property="og:description", content=meta_description)
-    upsert_meta(property="og:url", content=canonical_url)
-    slug_log = _norm_route_segment(lang, page.get("slug") or page.get("key") or "")
-    print(f"[head] injected for {lang}/{slug_log} canonical={canonical_path or canonical_url}")
-    return str(soup)
-# --------- LINK GRAPH (pozostawione jak w starym; może być użyte w szabl.) --
-def neighbors_for(
-    city_pages: List[Dict[str, Any]],
-    page: Dict[str, Any],
-    k_region: int,
-    k_alt: int
-) -> List[Dict[str, Any]]:
-    lang   = page.get("lang")
-    region = (page.get("voivodeship") or "").strip().lower()
-    city   = (page.get("city") or "").strip().lower()
-    svc    = page.get("service_h1")
-
-    # Strony z tym samym regionem, innym miastem, tą samą usługą
-    same_region = [
-        p for p in city_pages
-        if (p.get("lang") == lang)
-        and ((p.get("voivodeship") or "").strip().lower() == region)
-        and ((p.get("city") or "").strip().lower() != city)
-        and (p.get("service_h1") == svc)
-    ]
+    title = meta_title or page.get("title") or site.get("name")
+    if isinstance(title, dict):
+        title = site.get("name")
+    return {
+        "title": title or "",
+        "description": meta_description or "",
+        "canonical": canonical_url or "",
+        "alternates": dict(hreflang_map or {}),
+        "og_title": meta_title or site.get("name", ""),
+    }
 
-    # Strony z tym samym miastem, inną usługą
-    alt_service = [
-        p for p in city_pages
-        if (p.get("lang") == lang)
-        and ((p.get("city") or "").strip().lower() == city)
-        and (p.get("service_h1") != svc)
-    ]
+_HEAD_OPEN_RE = re.compile(r"<head\b[^>]*>", re.I)
+_HEAD_CLOSE_RE = re.compile(r"</head\s*>", re.I)
+_TITLE_RE = re.compile(r"<title\b[^>]*>.*?</title\s*>", re.I | re.S)
+
+@lru_cache(maxsize=None)
+def _tag_re(tag: str, attrs: Tuple[Tuple[str, str], ...]) -> "re.Pattern[str]":
+    """<tag ...> z podanymi atrybutami w dowolnej kolejności."""
+    looks = "".join(
+        rf"(?=[^>]*\b{re.escape(k)}\s*=\s*[\"']{re.escape(v)}[\"'])" for k, v in attrs
+    )
+    return re.compile(rf"<{tag}\b{looks}[^>]*>", re.I)
 
-    out = same_region[:k_region] + alt_service[:k_alt]
+def _attrs_html(attrs: Dict[str, str]) -> str:
+    return " ".join(f'{k}="{html_escape(str(v))}"' for k, v in attrs.items())
+
+def ensure_head_injections(html: str, head: Dict[str, Any]) -> str:
+    """
+    Upsert <title>, description, canonical, hreflang i og:* wyłącznie w <head>.
+    Dokument nie jest parsowany do DOM: wycinamy segment <head>…</head>
+    i podmieniamy/dopisujemy pojedyncze tagi regexami; reszta strony
+    przechodzi bez zmian. Gdy szablon już wypisał poprawne wartości
+    (base.html + ``head`` w kontekście), wynik jest identyczny z wejściem.
+    """
+    m_open = _HEAD_OPEN_RE.search(html)
+    m_close = _HEAD_CLOSE_RE.search(html, m_open.end() if m_open else 0)
+    if not m_close:
+        m_html = re.search(r"<html\b[^>]*>", html, re.I)
+        at = m_html.end() if m_html else 0
+        html = html[:at] + "<head></head>" + html[at:]
+        return ensure_head_injections(html, head)
+    start = m_open.end() if m_open else m_close.start()
+    seg = html[start:m_close.start()]
+    tail: List[str] = []
+
+    def upsert(rx: "re.Pattern[str]", tag: str):
+        nonlocal seg
+        m = rx.search(seg)
+        if m:
+            if m.group(0) != tag:
+                seg = seg[:m.start()] + tag + seg[m.end():]
+        else:
+            tail.append(tag)
+
+    def upsert_el(name: str, key: Tuple[Tuple[str, str], ...], attrs: Dict[str, str]):
+        upsert(_tag_re(name, key), f"<{name} {_attrs_html(attrs)} />")
+
+    if head.get("title"):
+        upsert(_TITLE_RE, f"<title>{html_escape(str(head['title']))}</title>")
+    desc = head.get("description")
+    if desc:
+        upsert_el("meta", (("name", "description"),), {"name": "description", "content": desc})
+    canonical = head.get("canonical")
+    if canonical:
+        upsert_el("link", (("rel", "canonical"),), {"rel": "canonical", "href": canonical})
+    for hrefl, href in (head.get("alternates") or {}).items():
+        upsert_el("link", (("rel", "alternate"), ("hreflang", hrefl)),
+                  {"rel": "alternate", "hreflang": hrefl, "href": href})
+    upsert_el("meta", (("property", "og:title"),), {"property": "og:title", "content": head.get("og_title") or ""})
+    if desc:
+        upsert_el("meta", (("property", "og:description"),), {"property": "og:description", "content": desc})
+    upsert_el("meta", (("property", "og:url"),), {"property": "og:url", "content": canonical or ""})
+
+    if tail:
+        seg = seg + "".join(f"  {t}\n" for t in tail)
+    return html[:start] + seg + html[m_close.start():]
+# ------------------- LINK GRAPH + TF-IDF (miasto × usługa) -----------------
+_TEXT_FIELDS = ("h1", "title", "meta_desc", "lead")
+
+def index_city_pages(city: "city_service.CityServicePages", corpus: Optional["tfidf.Corpus"] = None,
+                     titles: Optional[Dict[str, str]] = None) -> "link_graph.LinkGraph":
+    """Jedno przejście po stronach miasto × usługa: indeksy sąsiadów (tools/link_graph.py),
+    dokumenty korpusu TF-IDF i tytuły stron (kluczem jest URL strony)."""
+    graph = link_graph.LinkGraph.from_config(CFG.get("collections", {}).get("city_service", {}))
+    for rec in city.records(only=_TEXT_FIELDS):
+        url = _route_url(rec.lang, _norm_route_segment(rec.lang, rec.slug))
+        graph.add(rec.lang, rec.slug_key, url, rec.fields.get("h1") or rec.slug,
+                  rec.city["name"], rec.city["voivodeship"], rec.service["slug"])
+        if corpus is not None:
+            corpus.update(rec.lang, url, " ".join(str(rec.fields.get(f) or "") for f in _TEXT_FIELDS))
+        if titles is not None:
+            titles[url] = rec.fields.get("h1") or rec.slug
+    return graph
+
+def _route_url(L: str, rel: str) -> str:
+    return f"/{L}/" if not rel else f"/{L}/{rel}/"
+
+def _job_text(job: Dict[str, Any]) -> str:
+    """Tekst strony dla korpusu TF-IDF: nagłówki, opis, lead i treść z CMS."""
+    c = job["ctx"]
+    pg = c.get("page") or {}
+    parts = [c.get("title"), c.get("h1"), c.get("meta_desc"), pg.get("lead"), pg.get("body_md")]
+    if pg.get("body_html"):
+        parts.append(near_duplicates.page_text(str(pg["body_html"])))
+    return " ".join(p for p in parts if isinstance(p, str))
+
+# ------------------------------ RENDER (WORKERS) ----------------------------
+# Strony renderujemy jako "zadania": zadanie niesie tylko dane jednej strony
+# (szablon, kontekst bez callabli, dane do <head>, ścieżkę wyjścia), a dane
+# wspólne dla całego builda (routes, nav, strings) trafiają do procesu raz,
+# przez _render_init. Tryb szeregowy i pula procesów idą tą samą ścieżką,
+# więc wynik jest identyczny niezależnie od --jobs.
+# Moduły liczące w workerze to, co trafia do analizy strony — ich zmiana unieważnia cache.
+WORKER_MODULES = (page_analysis, seo_score, autolinks, near_duplicates, keyword_automaton)
+_SHARED: Dict[str, Any] = {}
+_LANG_CTX: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_TIMES = build_profile.StageTimes()
+# Pod-etapy renderu: w raporcie zawsze (0 wywołań przy ciepłym cache), schemat nie zależy od cache.
+RENDER_SPANS = ("render/template", "render/autolinks", "render/head_injection", "render/file_write",
+                "render/analysis", "render/simhash", "render/keywords", "render/seo_score",
+                "render/fragment_record", "render/fragment_splice")
+_PROFILER = None
+_AUTOLINKER = None
+_SINK = None
+RENDER_CHUNK = 8
+
+def resolve_jobs(jobs: Optional[int] = None) -> int:
+    """--jobs > BUILD_JOBS > 1; 0 albo 'auto' = liczba rdzeni."""
+    raw = jobs if jobs is not None else os.getenv("BUILD_JOBS", "1")
+    if str(raw).strip().lower() in ("0", "auto"):
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 1
+
+def _render_init(shared: Dict[str, Any]):
+    """Initializer workera: własne środowisko Jinja + dane wspólne builda."""
+    global env, _SHARED, _LANG_CTX, _PROFILER, _AUTOLINKER, _SINK, ASSET_MAP
+    _SHARED = shared
+    ASSET_MAP = shared.get("asset_map") or {}
+    _LANG_CTX = {}
+    _SINK = output_sink.OutputSink(OUT)
+    _PROFILER = build_profile.make_profiler()
+    al = shared.get("autolinks") or {}
+    _AUTOLINKER = autolinks.AutolinkEngine(al.get("rules", []), shared["cfg"].get("autolinks"), al.get("site_url", ""),
+                                           al.get("langs", []), al.get("explainers"))
+    env = make_env(shared["cfg"], Path(shared["templates"]))
+
+def _lang_ctx(L: str, kind: str) -> Dict[str, Any]:
+    """Część kontekstu wspólna dla wszystkich stron danego języka (cache na proces)."""
+    hit = _LANG_CTX.get((L, kind))
+    if hit is not None:
+        return hit
+    S = _SHARED
+    routes = S["routes"]
+
+    def path_for(kk, LL=None, _routes=routes):
+        LL = LL or L
+        rel2 = _norm_route_segment(LL, (_routes.get(kk, {}) or {}).get(LL, ""))
+        return f"/{LL}/" if not rel2 else f"/{LL}/{rel2}/"
+
+    out: Dict[str, Any] = {
+        "site": S["site"],
+        "nav": S["nav"],
+        "nav_data": {**S["nav_by_lang"].get(L, {}), "routes": routes},
+        "path_for": path_for,
+        # klucz cache fragmentów: (język, wersja bundla menu, hash konfiguracji + nawigacji)
+        "fragment_key": build_cache.digest({
+            "lang": L,
+            "bundle": S.get("bundle_versions", {}).get(L, ""),
+            "cfg": S["cfg_fp"],
+            "nav": S["nav_by_lang"].get(L, {}),
+        }),
+    }
+    if kind == "page":
+        strings_map, dlang = S["strings_map"], S["dlang"]
+        out["strings"] = {k: (v.get(L) or v.get(dlang) or "") for k, v in strings_map.items()}
+        out["STR"] = lambda key: ((strings_map.get(key, {}).get(L) or strings_map.get(key, {}).get(dlang) or "").strip())
+    _LANG_CTX[(L, kind)] = out
     return out
 
+def _render_job(job: Dict[str, Any]) -> "page_analysis.PageAnalysis":
+    """Renderuje jedno zadanie i zapisuje plik; zwraca analizę strony (z liczbami autolinków)."""
+    L = job["ctx"]["lang"]
+    ctx = {**_lang_ctx(L, job["kind"]), **job["ctx"]}
+    if "ssr" in ctx:
+        ctx["ssr"] = {**ctx["ssr"], "routes": _SHARED["routes"]}
+    ctx["head"] = job["head"]
+    with _TIMES("render/template"):
+        html = render_template(job["template"], ctx)
+    with _TIMES("render/autolinks"):
+        html, made, fb = _AUTOLINKER.apply(html, L, _route_url(L, job["route"]["rel"]))
+    with _TIMES("render/head_injection"):
+        html = ensure_head_injections(html, job["head"])
+    with _TIMES("render/file_write"):
+        _SINK.write(job["out"], html, job.get("sha"))
+    with _TIMES("render/analysis"):
+        page = page_analysis.analyze(html, _SHARED["autolinks"]["site_url"], _route_url(L, job["route"]["rel"]), L)
+    page.autolinks = [made, fb]
+    return page
+
+def _reanalyze(job: Dict[str, Any], url: str) -> "page_analysis.PageAnalysis":
+    """Strona z cache bez zapisanej analizy (np. po przerwanym buildzie): analiza pliku z dist/."""
+    page = page_analysis.analyze(read_text(Path(job["out"])), SITE_URL, url, job["route"]["lang"])
+    page.simhash = f"{near_duplicates.simhash(page.text):016x}"
+    return page
+
+def _render_batch(jobs: List[Dict[str, Any]]) -> Tuple[List["page_analysis.PageAnalysis"], Dict[str, List[float]], Any, Any]:
+    """Paczka w workerze: analizy stron (z simhashem i wynikiem SEO) + czasy pod-etapów (+ dane profilera)
+    + rekordy zapisów OutputSink (pliki są już na dysku, gdy paczka wraca)."""
+    if _PROFILER:
+        _PROFILER.start()
+    try:
+        outs = [_render_job(j) for j in jobs]
+        with _TIMES("render/simhash"):
+            for page, fp in zip(outs, near_duplicates.simhash_batch([page.text for page in outs])):
+                page.simhash = f"{fp:016x}"
+        rule = _SHARED.get("seo_rules")
+        if rule:
+            with _TIMES("render/keywords"):
+                found = [_SHARED["keywords"].analyze(page.lang, page.text) for page in outs]
+            with _TIMES("render/seo_score"):
+                for j, page, kw in zip(jobs, outs, found):
+                    page.seo = seo_score.score_page(page, seo_score.page_keywords(j["ctx"], rule), rule, kw)
+    finally:
+        if _PROFILER:
+            _PROFILER.stop()
+    with _TIMES("render/file_write"):
+        written = _SINK.take()
+    return outs, _TIMES.take(), (_PROFILER.export() if _PROFILER else None), written
+
+def _chunks(items: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    buf: List[Any] = []
+    for it in items:
+        buf.append(it)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+def render_pages(jobs: Iterable[Dict[str, Any]], shared: Dict[str, Any], n_jobs: int = 1,
+                 profile: Optional["build_profile.Profile"] = None
+                 ) -> Iterable[Tuple[Dict[str, Any], Optional["page_analysis.PageAnalysis"]]]:
+    """Zwraca (zadanie, analiza strony) w kolejności zadań — także przy puli procesów.
+
+    Zadania z ``cached=True`` (trafienie w manifeście) nie są renderowane;
+    ich analiza to None (builder bierze ją z pliku analiz poprzedniego builda).
+
+    Pula dostaje paczki po RENDER_CHUNK stron, a w locie jest najwyżej
+    kilka paczek na worker, więc pamięć nie rośnie z liczbą stron.
+
+    Z ``profile`` czasy pod-etapów renderu (sumy ze wszystkich procesów)
+    trafiają do profilu builda, a przy BUILD_PROFILE także najgorętsze funkcje.
+    """
+    profile = profile if profile is not None else build_profile.Profile()
+    for name in RENDER_SPANS:
+        profile.add(name)
+    profiler = build_profile.make_profiler()
+
+    def _merge(batch, result):
+        outs, times, prof_data, written = result or ([], {}, None, None)
+        if SINK is not None:
+            SINK.merge(written)
+        for name, (wall, cpu, calls) in times.items():
+            profile.add(name, wall, cpu, int(calls))
+        if profiler and prof_data:
+            profiler.merge(prof_data)
+        done = iter(outs)
+        for job in batch:
+            yield job, (None if job.get("cached") else next(done))
+
+    if n_jobs <= 1:
+        _render_init(shared)
+        for batch in _chunks(jobs, RENDER_CHUNK):
+            todo = [j for j in batch if not j.get("cached")]
+            yield from _merge(batch, _render_batch(todo) if todo else None)
+        _SINK.close(state=None)
+    else:
+        window = n_jobs * 4
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_render_init, initargs=(shared,)) as pool:
+            pending: deque = deque()
+            for batch in _chunks(jobs, RENDER_CHUNK):
+                todo = [j for j in batch if not j.get("cached")]
+                pending.append((batch, pool.submit(_render_batch, todo) if todo else None))
+                if len(pending) >= window:
+                    ready, fut = pending.popleft()
+                    yield from _merge(ready, fut.result() if fut else None)
+            while pending:
+                ready, fut = pending.popleft()
+                yield from _merge(ready, fut.result() if fut else None)
+    if profiler:
+        profile.extra["render_profile"] = {
+            "mode": profiler.mode,
+            "jobs": n_jobs,
+            "top": profiler.top(build_profile.top_n()),
+        }
+
 # ------------------------------ RENDER / BUILD ------------------------------
-def build_all():
+def build_all(jobs: Optional[int] = None, force: bool = False):
+    global SINK, ASSET_MAP
+    prof = build_profile.Profile()
+    prof.stage("cms_load")
+    build_context().cms_data
+    prof.stage("context")
+    bind_globals()
+    prof.stage("templates_compile")
+    if template_aot.enabled():
+        compiled, fresh = template_aot.precompile(env, TEMPLATES)
+        prof.spans["templates_compile"].count(compiled=compiled, fresh=fresh)
+    assets_span = prof.stage("assets_copy")
+    DIST.mkdir(parents=True, exist_ok=True)
+    SINK = output_sink.OutputSink(OUT, output_sink.load_state())
+    ASSET_MAP = {}
+    if ASSETS_DIR.exists():
+        # kopia tylko zmienionych plików; bez wejść builda (CSV z sources.*) i plików generowanych (bundle menu)
+        pipe_cfg = CFG.get("build", {}).get("assets", {}) or {}
+        sources = [str((v or {}).get("path") or "") for v in (CFG.get("sources", {}) or {}).values() if isinstance(v, dict)]
+        exclude = list(pipe_cfg.get("exclude") or asset_pipeline.EXCLUDE) + [
+            p[len("assets/"):] for p in sources if p.startswith("assets/")]
+        res = asset_pipeline.sync(ASSETS_DIR, OUT/"assets", exclude=exclude,
+                                  generated=[r[len("assets/"):] for r in SINK.previous if r.startswith("assets/")],
+                                  fingerprint=pipe_cfg.get("fingerprint") or asset_pipeline.FINGERPRINT)
+        ASSET_MAP = res.pop("files")
+        write_text(OUT/"assets"/asset_pipeline.MANIFEST_NAME, asset_pipeline.manifest_json(ASSET_MAP))
+        write_text(OUT/"_headers", asset_pipeline.headers_file(ASSET_MAP))
+        assets_span.count(**res)
+    prof.stage("cms_prepare")
     site_cfg = {
         "default_lang": CFG.get("default_lang") or CFG.get("site", {}).get("defaultLang", "pl"),
         "languages": CFG.get("languages") or LOCALES,
@@ -1067,9 +1331,9 @@ def build_all():
     nav_by_lang = nav_fallback
     # === CMS: wczytaj XLSX z katalogu DATA/cms (pobierany automatycznie) ===
     cms = {"menu_rows": [], "page_meta": {}, "blocks": {}, "report": "[cms] no module"}
-    if cms_ingest:
-        cms = cms_ingest.load_all(DATA / "cms")
-        print(cms.get("report", "[cms] no report"))
+    if build_context().cms_data is not None:
+        # płytka kopia: build dopisuje klucze, a surowe dane zostają w kontekście
+        cms = dict(build_context().cms_data)
     else:
         print("[cms] cms_ingest not available")
     global CMS
@@ -1120,7 +1384,7 @@ def build_all():
     for r in rows:
         if not _truthy((r.get("meta") or {}).get("publish", "true")):
             continue
-        if (r.get("type") or "page").strip().lower() not in {"page", "home"}:
+        if (r.get("type") or "page").strip().lower() not in {"page", "home", "service"}:
             continue
         pages_idx[(r.get("key"), r.get("lang"))] = r
 
@@ -1158,6 +1422,7 @@ def build_all():
     if "pages"     in locals(): pages     = page_list
 
     # === MENU: jeśli są wiersze z arkusza → buduj bundlery + HTML do SSR ===
+    menu_span = prof.stage("menu_bundles")
     rows = cms.get("menu_rows") or []
     if not rows:
         def _menu_from_pages(pages_rows):
@@ -1188,12 +1453,11 @@ def build_all():
         # zapisz bundlery do nowej i legacy ścieżki (żeby nie było 404)
         out_new = DIST / "assets" / "data" / "menu"
         out_old = DIST / "assets" / "nav"
-        out_new.mkdir(parents=True, exist_ok=True)
-        out_old.mkdir(parents=True, exist_ok=True)
         for L, b in bundles.items():
-            p = out_new / f"bundle_{L}.json"
-            p.write_text(json.dumps(b, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
-            shutil.copy2(p, out_old / p.name)
+            # bez generated_at (czas builda): ta sama treść menu = te same bajty, plik nie jest nadpisywany
+            raw = json.dumps({k: v for k, v in b.items() if k != "generated_at"}, ensure_ascii=False, separators=(",", ":"))
+            write_text(out_new / f"bundle_{L}.json", raw)
+            write_text(out_old / f"bundle_{L}.json", raw)
     else:
         bundles, html_by_lang = {}, {}
         print("[cms] menu_rows empty → pozostaje dotychczasowe menu (jeśli jest)")
@@ -1228,16 +1492,23 @@ def build_all():
                         if btn.name == "a" and blk.get("cta_href"):
                             btn["href"] = blk["cta_href"]
         return str(soup)
-    # === sanity: musi istnieć bundle dla domyślnego języka
+    # === sanity: musi istnieć bundle dla domyślnego języka (zapisy sinka są asynchroniczne)
+    SINK.flush()
     dlang_check = site_cfg.get("default_lang", "pl")
     assert (DIST/"assets"/"data"/"menu"/f"bundle_{dlang_check}.json").exists() or \
            (DIST/"assets"/"nav"/f"bundle_{dlang_check}.json").exists(), "❌ Brak bundla menu (404)"
+    menu_span.count(langs=len(bundles), menu_rows=len(rows))
+    jobs_span = prof.stage("page_jobs")
     pages = base_pages()
     city  = generate_city_service()
-    page_list = pages + city
+    corpus = tfidf.Corpus.load() if not force else tfidf.Corpus()
+    titles_by_url: Dict[str, str] = {}
+    graph = index_city_pages(city, corpus, titles_by_url)
+    graph.write(OUT/"_reports"/"link-graph.json", write_text)
+    jobs_span.count(link_graph=len(graph))
 
     slugs = {}
-    for p in page_list:
+    for p in pages:
         sl = p.get("slugs") or {p.get("lang", dlang_check): p.get("slug", "")}
         sl = {L: _norm_route_segment(L, s) for L, s in (sl or {}).items()}
         slugs[p["key"]] = sl
@@ -1251,21 +1522,19 @@ def build_all():
     print(f"[cms] pages autogen: keys={len(slugs)}; langs={len(languages)}")
 
     hreflang_map = CMS.get("hreflang", {})
-    indexables: List[Tuple[str,str,str]] = []
+    indexables: List[Tuple[str, str, str, str]] = []
     today=UTC()
     logs=[]
     autolink_inline=0; autolink_fb=0
 
-    # simhash (P4) – wykrywanie duplikatów
-    sim_index={}
+    # simhash (P4) – wykrywanie duplikatów (near_duplicates po renderze)
     dup_warns=0
 
-    # TF-IDF (P3) – z tekstu strony
-    tfidf_map={}
-
     writes = 0
     generated = []
     langs_seen: Set[str] = set()
+    page_jobs: List[Dict[str, Any]] = []
+    blog_jobs: List[Dict[str, Any]] = []
     for key, per_lang in routes.items():
         if key == "blog" or key.startswith("blog__") or key == "blog_post":
             continue
@@ -1299,62 +1568,46 @@ def build_all():
                 "services": [],
                 "faq": [],
                 "home": {"section_titles": {}, "section_subtitles": {}},
-                "routes": routes,
             }
 
             template_rel = resolve_template(page_rec)
-
-            def path_for(kk, LL=None, _routes=routes):
-                LL = LL or L
-                rel2 = _norm_route_segment(LL, (_routes.get(kk, {}) or {}).get(LL, ""))
-                return f"/{LL}/" if not rel2 else f"/{LL}/{rel2}/"
-
             canonical = _canonical_url(CANONICAL_BASE, L, rel, page_rec.get("canonical_path"))
 
             page_key = key
             meta = page_rec.get("meta") or {}
-            strings_local = {k: (v.get(L) or v.get(dlang) or "") for k, v in strings_map.items()}
             ctx = {
                 "lang": L,
-                "site": SITE,
                 "page": page_rec,
                 "pg": page_rec,
                 "meta": meta,
-                "nav": CFG.get("navigation", {}),
-                "nav_data": {**nav_by_lang.get(L, {}), "routes": routes},
-                "path_for": path_for,
                 "title": page_rec.get("seo_title") or page_rec.get("title") or SITE.get("brand") or SITE.get("title"),
                 "h1": page_rec.get("h1") or page_rec.get("title") or "",
                 "meta_desc": page_rec.get("meta_desc") or "",
                 "blocks": (blocks_by_page_lang.get((L, page_key)) if isinstance(blocks_by_page_lang, dict) else {}),
                 "faq": (faq_by_page_lang.get((L, page_key)) if isinstance(faq_by_page_lang, dict) else []),
                 "canonical": canonical,
-                "STR": lambda key, _L=L: STR(_L, key),
-                "strings": strings_local,
                 "ssr": ssr,
             }
             if (page_rec.get("slugKey") or "").lower() == "blog" or (page_rec.get("type") or "").lower() == "blog":
                 ctx["blog_posts"] = posts_by_lang.get(L, [])
-            html = render_template(template_rel, ctx)
-            html = ensure_head_injections(
-                html,
-                page_rec,
-                hreflang_map.get(page_key, {}),
-                site=SITE,
-                lang=L,
-                meta_title=ctx["title"],
-                meta_description=ctx["meta_desc"],
-                canonical_url=canonical,
-                canonical_path=page_rec.get("canonical_path"),
-            )
             out_path = _out_for(L, rel)
-            out_path.write_text(html, encoding="utf-8")
-            print(f"[write] {L}/{rel or ''} -> {out_path}")
-            generated.append({"lang": L, "key": key, "rel": rel, "out": str(out_path)})
-            if not page_rec.get("noindex"):
-                indexables.append((canonical, page_rec.get("lastmod") or today, key))
-            writes += 1
-            langs_seen.add(L)
+            page_jobs.append({
+                "kind": "page",
+                "template": template_rel,
+                "ctx": ctx,
+                "head": head_fields(
+                    page_rec,
+                    hreflang_map.get(page_key, {}),
+                    site=SITE,
+                    meta_title=ctx["title"],
+                    meta_description=ctx["meta_desc"],
+                    canonical_url=canonical,
+                ),
+                "out": str(out_path),
+                "route": {"lang": L, "key": key, "rel": rel, "out": str(out_path)},
+                "index": None if page_rec.get("noindex") else (
+                    canonical, page_rec.get("lastmod"), key, (page_rec.get("type") or "page").lower()),
+            })
 
     # --- Blog listing and post detail pages ---
     blog_list_tpl = TEMPLATES / "pages" / "blog.html"
@@ -1386,91 +1639,313 @@ def build_all():
             "meta_desc": meta.get("meta_desc") or STR(L, "blog_meta_desc") or "",
         }
 
-        def path_for(kk, LL=None, _routes=routes):
-            LL = LL or L
-            rel2 = _norm_route_segment(LL, (_routes.get(kk, {}) or {}).get(LL, ""))
-            return f"/{LL}/" if not rel2 else f"/{LL}/{rel2}/"
-
         canonical_list = _canonical_url(CANONICAL_BASE, L, blog_rel, None)
         ctx_list = {
             "lang": L,
-            "site": SITE,
             "posts": posts,
             "page": listing_page,
             "pg": listing_page,
             "meta": {},
-            "nav": CFG.get("navigation", {}),
-            "nav_data": {**nav_by_lang.get(L, {}), "routes": routes},
-            "path_for": path_for,
             "title": listing_page["title"],
             "h1": listing_page["h1"],
             "meta_desc": listing_page["meta_desc"],
             "canonical": canonical_list,
         }
-        html = render_template(blog_list_tpl_rel, ctx_list)
-        html = ensure_head_injections(
-            html,
-            listing_page,
-            {},
-            site=SITE,
-            lang=L,
-            meta_title=ctx_list["title"],
-            meta_description=ctx_list["meta_desc"],
-            canonical_url=canonical_list,
-            canonical_path=None,
-        )
         out_list = _out_for(L, blog_rel)
-        out_list.write_text(html, encoding="utf-8")
-        generated.append({"lang": L, "key": "blog_list", "rel": blog_rel, "out": str(out_list)})
-        indexables.append((canonical_list, today, "blog_list"))
-        writes += 1
-        langs_seen.add(L)
+        blog_jobs.append({
+            "kind": "blog",
+            "template": blog_list_tpl_rel,
+            "ctx": ctx_list,
+            "head": head_fields(
+                listing_page,
+                {},
+                site=SITE,
+                meta_title=ctx_list["title"],
+                meta_description=ctx_list["meta_desc"],
+                canonical_url=canonical_list,
+            ),
+            "out": str(out_list),
+            "route": {"lang": L, "key": "blog_list", "rel": blog_rel, "out": str(out_list)},
+            "index": (canonical_list, None, "blog_list", "blog"),
+        })
 
         for post in posts:
             post_rel = _norm_route_segment(L, (routes.get(post.get("slug_key"), {}) or {}).get(L, f"blog/{post['slug']}") )
             canonical_post = _canonical_url(CANONICAL_BASE, L, post_rel, None)
             ctx_post = {
                 "lang": L,
-                "site": SITE,
                 "post": post,
                 "page": post,
                 "pg": post,
                 "meta": {},
-                "nav": CFG.get("navigation", {}),
-                "nav_data": {**nav_by_lang.get(L, {}), "routes": routes},
-                "path_for": path_for,
                 "title": post.get("seo_title") or post.get("title") or "Blog",
                 "h1": post.get("h1") or post.get("title") or "",
                 "meta_desc": post.get("meta_desc") or "",
                 "canonical": canonical_post,
             }
-            html = render_template(blog_post_tpl_rel, ctx_post)
-            html = ensure_head_injections(
-                html,
-                post,
-                {},
-                site=SITE,
-                lang=L,
-                meta_title=ctx_post["title"],
-                meta_description=ctx_post["meta_desc"],
-                canonical_url=canonical_post,
-                canonical_path=post.get("canonical_path"),
-            )
             out_post = _out_for(L, post_rel)
-            out_post.write_text(html, encoding="utf-8")
-            generated.append(
-                {"lang": L, "key": "blog_detail", "rel": post_rel, "out": str(out_post)}
-            )
-            if not post.get("noindex"):
-                indexables.append(
-                    (
-                        canonical_post,
-                        post.get("lastmod") or post.get("published_at") or today,
-                        "blog_detail",
-                    )
-                )
-            writes += 1
-            langs_seen.add(L)
+            blog_jobs.append({
+                "kind": "blog",
+                "template": blog_post_tpl_rel,
+                "ctx": ctx_post,
+                "head": head_fields(
+                    post,
+                    {},
+                    site=SITE,
+                    meta_title=ctx_post["title"],
+                    meta_description=ctx_post["meta_desc"],
+                    canonical_url=canonical_post,
+                ),
+                "out": str(out_post),
+                "route": {"lang": L, "key": "blog_detail", "rel": post_rel, "out": str(out_post)},
+                "index": None if post.get("noindex") else (
+                    canonical_post,
+                    post.get("lastmod") or post.get("published_at"),
+                    "blog_detail",
+                    "blog_post",
+                ),
+            })
+
+    # --- Miasto × usługa: rekordy z generatora → zadania, leniwie (bez listy) ---
+    def city_jobs() -> Iterable[Dict[str, Any]]:
+        for rec in city:
+            L = rec.lang
+            # bramka jakości przed indeksem: za mało treści (thin_min_chars) → noindex, poza sitemapą
+            page_rec, warns = apply_quality(rec.page())
+            page_rec["template"] = page_rec.get("template") or choose_template(page_rec)
+            rel = _norm_route_segment(L, rec.slug)
+            if warns:
+                logs.append(f"[quality] {L}/{rel}: {' '.join(warns)}")
+            canonical = _canonical_url(CANONICAL_BASE, L, rel, page_rec.get("canonical_path"))
+            ctx = {
+                "lang": L,
+                "page": page_rec,
+                "pg": page_rec,
+                "meta": {},
+                "title": page_rec.get("seo_title") or page_rec.get("title") or "",
+                "h1": page_rec.get("h1") or "",
+                "meta_desc": page_rec.get("meta_desc") or "",
+                "blocks": {},
+                "faq": [],
+                "canonical": canonical,
+                "neighbors": graph.neighbors(L, rec.slug_key),
+                "tfidf": tfidf_ctx(L, _route_url(L, rel)),
+                "ssr": {
+                    "hero": {
+                        "title": page_rec.get("h1") or "",
+                        "lead": page_rec.get("lead") or "",
+                        "image": {"src": page_rec.get("og_image") or "", "srcset": "", "alt": page_rec.get("hero_alt") or ""},
+                    },
+                    "services": [],
+                    "faq": [],
+                },
+            }
+            out_path = _out_for(L, rel)
+            yield {
+                "kind": "page",
+                "template": resolve_template(page_rec),
+                "ctx": ctx,
+                "head": head_fields(
+                    page_rec,
+                    {},
+                    site=SITE,
+                    meta_title=ctx["title"],
+                    meta_description=ctx["meta_desc"],
+                    canonical_url=canonical,
+                ),
+                "out": str(out_path),
+                "route": {"lang": L, "key": rec.slug_key, "rel": rel, "out": str(out_path)},
+                "index": None if page_rec.get("noindex") else (canonical, None, rec.slug_key, "city_service"),
+                "city_service": True,
+            }
+
+    # === FRAZY KLUCZOWE: automat Aho-Corasick per język (raz na build) ===
+    kw_span = prof.stage("keywords")
+    keyword_index = build_keyword_index()
+    al_rules = autolink_rules()
+    kw_span.count(patterns=sum(len(a) for a in keyword_index.langs.values()))
+
+    # === RENDER: szeregowo albo w puli procesów; scalanie w kolejności zadań ===
+    shared = {
+        "cfg": CFG,
+        "templates": str(TEMPLATES),
+        "site": SITE,
+        "nav": CFG.get("navigation", {}),
+        "nav_by_lang": nav_by_lang,
+        "routes": routes,
+        "strings_map": strings_map,
+        "dlang": dlang,
+        "cfg_fp": build_cache.digest(CFG),
+        "bundle_versions": {L: (b or {}).get("version", "") for L, b in bundles.items()},
+        "seo_rules": seo_score.rules(CFG, SITE_URL),
+        "asset_map": ASSET_MAP,
+        "keywords": keyword_index,
+        "autolinks": {
+            "rules": al_rules,
+            "explainers": {L: fetch_explainer(L) for L in LOCALES} if al_rules else {},
+            "site_url": SITE_URL,
+            "langs": LOCALES,
+        },
+    }
+    all_jobs = page_jobs + blog_jobs
+
+    # === TF-IDF: korpus per język (strony miasto × usługa dodało index_city_pages) ===
+    tfidf_span = prof.stage("tfidf")
+    for job in all_jobs:
+        url = _route_url(job["route"]["lang"], job["route"]["rel"])
+        corpus.update(job["route"]["lang"], url, _job_text(job))
+        titles_by_url[url] = job["ctx"].get("h1") or job["head"]["title"]
+    removed = corpus.prune()
+
+    def tfidf_ctx(L: str, url: str) -> Dict[str, Any]:
+        return {
+            "keywords": corpus.keywords(L, url),
+            "related": [{"url": u, "title": titles_by_url.get(u, u)} for u in corpus.related(L, url)],
+        }
+    for job in all_jobs:
+        job["ctx"]["tfidf"] = tfidf_ctx(job["route"]["lang"], _route_url(job["route"]["lang"], job["route"]["rel"]))
+    corpus.save()
+    tfidf_report = {"version": 1, "updated": corpus.updated, "reused": corpus.reused, "removed": removed,
+                    "langs": corpus.stats(), "keywords": {}}
+    tfidf_span.count(updated=corpus.updated, reused=corpus.reused, removed=removed)
+
+    # === INCREMENTAL: odcisk wejść strony vs manifest poprzedniego builda ===
+    jobs_span.count(pages=len(page_jobs), blog=len(blog_jobs))
+    prof.stage("fingerprint", pages=len(all_jobs))
+    manifest = build_cache.load_manifest()
+    prev_pages = {} if force else manifest.get("pages", {})
+    # historia lastmod niezależna od decyzji o renderze: --force renderuje, ale daty zostają
+    prev_lastmod = deploy_manifest.load_lastmod(OUT)
+    new_lastmod: Dict[str, List[str]] = {}
+    analyses = page_analysis.AnalysisStore()
+    shared_fp = build_cache.digest({
+        "builder": build_cache.file_digest([Path(__file__)] + [Path(m.__file__) for m in WORKER_MODULES]),
+        "globals": {"ga_id": GA_ID, "gsc": GSC},
+        **{k: v for k, v in shared.items() if k not in ("strings_map", "nav_by_lang", "keywords")},
+        "keywords": keyword_index.digest(),
+    })
+    lang_fp: Dict[str, str] = {}
+    tpl_fp: Dict[str, str] = {}
+
+    def fingerprint(job: Dict[str, Any]) -> Dict[str, Any]:
+        L = job["ctx"]["lang"]
+        if L not in lang_fp:
+            lang_fp[L] = build_cache.digest({
+                "strings": {k: (v.get(L) or v.get(dlang) or "") for k, v in strings_map.items()},
+                "nav": nav_by_lang.get(L, {}),
+                "bundle": (bundles.get(L) or {}).get("version", ""),
+            })
+        if job["template"] not in tpl_fp:
+            tpl_fp[job["template"]] = build_cache.template_digest(env, job["template"])
+        job["fp"] = build_cache.digest({
+            "shared": shared_fp, "lang": lang_fp[L], "template": tpl_fp[job["template"]],
+            "job": {k: job[k] for k in ("kind", "template", "ctx", "head")},
+        })
+        prev = prev_pages.get(job["out"]) or {}
+        job["cached"] = (prev.get("fp") == job["fp"] and "an" in prev and analyses.has_previous()
+                         and Path(job["out"]).exists())
+        job["sha"] = SINK.previous.get(SINK.rel(job["out"]))
+        return job
+
+    for job in all_jobs:
+        fingerprint(job)
+    n_jobs = resolve_jobs(jobs)
+    cache_hits = sum(1 for j in all_jobs if j["cached"])
+    cache_misses = len(all_jobs) - cache_hits
+    print(f"[render] jobs={n_jobs} pages={len(all_jobs)} cache_hits={cache_hits} cache_misses={cache_misses}")
+    SINK.prepare(j["out"] for j in all_jobs if not j["cached"])
+    render_span = prof.stage("render", jobs=n_jobs, pages=len(all_jobs), rendered=cache_misses, cached=cache_hits)
+    # strony miasto × usługa dochodzą strumieniem: odcisk liczony przy pobraniu z generatora
+    stream = chain(all_jobs, (fingerprint(j) for j in city_jobs()))
+    new_pages: Dict[str, Dict[str, str]] = {}
+    titles: Counter = Counter()
+    city_count = city_hits = 0
+    city_thin: Set[str] = set()
+    dup_pages: List[Dict[str, Any]] = []
+    canonical_by_out: Dict[str, str] = {}
+    scores = seo_score.ScoreReport(shared["seo_rules"])
+    for job, page in render_pages(stream, shared, n_jobs, profile=prof):
+        route = job["route"]
+        url = _route_url(route["lang"], route["rel"])
+        prev = prev_pages.get(job["out"]) or {}
+        hit = analyses.previous(prev.get("an"), url) if page is None else None
+        if hit:
+            page, ref = hit
+        else:
+            page = page or _reanalyze(job, url)
+            ref = analyses.add(page)
+        fp = int(page.simhash, 16) if page.simhash else None
+        links = page.autolinks
+        if links:
+            autolink_inline += links[0]
+            autolink_fb += links[1]
+        if job["cached"]:
+            SINK.keep(job["out"])
+        else:
+            print(f"[write] {route['lang']}/{route['rel'] or ''} -> {job['out']}")
+        if job.get("city_service"):
+            city_count += 1
+            city_hits += job["cached"]
+            if job["index"] is None:
+                city_thin.add(url)
+        generated.append(route)
+        tfidf_report["keywords"][url] = job["ctx"]["tfidf"]["keywords"]
+        scores.add(url, route["lang"], page.seo)
+        # lastmod = czas ostatniej zmiany skrótu treści strony (nie czas builda); bez historii nieznany
+        sha = SINK.digest(job["out"])
+        rel = SINK.rel(job["out"])
+        old = (prev_lastmod or {}).get(rel) or []
+        if prev_lastmod is None:
+            lastmod = ""
+        elif sha and old[:1] == [sha]:
+            lastmod = old[1] if len(old) > 1 else ""
+        else:
+            lastmod = today
+        new_lastmod[rel] = [sha, lastmod]
+        if job["index"]:
+            loc, declared, key, kind = job["index"]
+            job["index"] = (loc, declared or lastmod or None, key, kind)
+            canonical_by_out[rel] = loc
+            indexables.append(job["index"])
+            titles[(route["lang"], job["head"]["title"])] += 1
+            dup_pages.append({"url": job["index"][0], "lang": route["lang"], "simhash": fp, "out": job["out"],
+                              "noindex": job["cached"] and prev.get("near_duplicate", False)})
+        new_pages[job["out"]] = {"fp": job["fp"], "an": list(ref)}
+        writes += 1
+        langs_seen.add(route["lang"])
+    if city_count:
+        print(f"[render] city×service pages={city_count} cache_hits={city_hits} cache_misses={city_count - city_hits} "
+              f"noindex={len(city_thin)}")
+        cache_hits += city_hits
+        cache_misses += city_count - city_hits
+        render_span.count(pages=city_count, rendered=city_count - city_hits, cached=city_hits)
+    render_span.count(city_service=city_count)
+    analyses.close()
+    dup_span = prof.stage("near_duplicates", pages=len(dup_pages))
+    near_cfg = CFG.get("seo", {}).get("scoring", {}).get("near_duplicate", {})
+    dups = near_duplicates.find_duplicates(dup_pages, float(near_cfg.get("simhash_threshold", 0.9)))
+    near_duplicates.write_report(OUT/"_reports"/"near-duplicates.json", dups, write_text)
+    dup_warns = len(dups["duplicates"])
+    noindex_dups = set(dups["duplicates"]) if _truthy(near_cfg.get("auto_noindex")) else set()
+    for d in dup_pages:
+        want = d["url"] in noindex_dups
+        if want != d["noindex"]:  # strona z cache mogła zostać oznaczona w poprzednim buildzie
+            path = Path(d["out"])
+            write_text(path, near_duplicates.set_noindex(read_text(path), want))
+        if want:
+            new_pages[d["out"]]["near_duplicate"] = True
+            canonical_by_out.pop(SINK.rel(d["out"]), None)  # noindex: nie idzie do IndexNow
+    if noindex_dups:
+        indexables = [u for u in indexables if u[0] not in noindex_dups]
+        print(f"[near-dup] noindex={len(noindex_dups)}")
+    dup_span.count(pairs=dups["pairs_count"], duplicates=dup_warns)
+    del dup_pages
+    write_text(OUT/"_reports"/"tfidf.json", json.dumps(tfidf_report, ensure_ascii=False, indent=1))
+    seo_report = scores.write(OUT/"_reports"/"seo-scores.json", write_text)
+    del scores
+    prof.stage("static_files")
+    manifest["pages"] = new_pages
+    build_cache.save_manifest(manifest)
 
     Path("_routes.json").write_text(json.dumps(generated, ensure_ascii=False, indent=2), "utf-8")
     print(f"[routes] exported by build count={len(generated)}")
@@ -1479,17 +1954,20 @@ def build_all():
         raise SystemExit("❌ No pages written — check routing or template mapping")
 
     # Redirect stubs (z CMS.redirects)
+    redirects: Dict[str, str] = {}
     for r in CMS.get("redirects", []):
         src = r.get("from") or r.get("src") or ""
         dst = r.get("to")   or r.get("dst") or ""
         if not src or not dst: continue
         if not src.startswith("/"): src="/"+src
         if not src.endswith("/"): src+="/"
+        redirects[src] = dst
         dest = OUT / src.strip("/")
         ensure_dir(dest)
         write_text(dest/"index.html", f"<!doctype html><meta charset='utf-8'><meta http-equiv='refresh' content='0;url={dst}'><link rel='canonical' href='{dst}'><meta name='robots' content='noindex,follow'><title>Redirect</title>")
 
     # root index: redirect or copy default language homepage
+    extra_pages: List["page_analysis.PageAnalysis"] = []
     if CFG.get("routing", {}).get("enforce_lang_prefix", True):
         root_html = (
             f"<!doctype html><html lang=\"{DEFAULT_LANG}\"><head><meta charset=\"utf-8\">"
@@ -1503,8 +1981,11 @@ def build_all():
         write_text(OUT/"index.html", root_html)
     else:
         src = OUT/DEFAULT_LANG/"index.html"
-        if src.exists():
-            shutil.copyfile(src, OUT/"index.html")
+        root_html = read_text(src) if src.exists() else ""
+        if root_html:
+            write_text(OUT/"index.html", root_html)
+    if root_html:
+        extra_pages.append(page_analysis.analyze(root_html, SITE_URL, "/", DEFAULT_LANG))
     # GSC HTML file verification (drugi, pewny sposób weryfikacji)
     html_file = (CFG.get("constants", {}).get("GSC_HTML_FILE") or "").strip()
     if html_file and html_file.startswith("google") and html_file.endswith(".html"):
@@ -1513,7 +1994,9 @@ def build_all():
         write_text(OUT / html_file, f"google-site-verification: {token}")
 
     # 404.html (prosty)
-    write_text(OUT/"404.html", "<h1>404</h1><p>Nie znaleziono strony. <a href='/pl/'>Wróć do strony głównej</a>.</p>")
+    html_404 = "<h1>404</h1><p>Nie znaleziono strony. <a href='/pl/'>Wróć do strony głównej</a>.</p>"
+    write_text(OUT/"404.html", html_404)
+    extra_pages.append(page_analysis.analyze(html_404, SITE_URL, "/404.html", DEFAULT_LANG))
 
     # robots.txt
     write_text(OUT/"robots.txt", f"User-agent: *\nAllow: /\nSitemap: {SITE_URL}/sitemap.xml\n")
@@ -1528,100 +2011,122 @@ def build_all():
 
 
     # SITEMAPY
+    prof.stage("sitemaps", urls=len(indexables))
     write_sitemaps(indexables, CMS.get("hreflang", {}))
     if NEWS_ENABLED or (CFG.get("blog",{}).get("news_sitemap",{}).get("enabled", False)):
         write_news_sitemap()
 
     # SEARCH INDEX (on-site)
-    build_search_indexes()
+    prof.stage("search_index")
+    build_search_indexes(analyses, skip=city_thin)
 
     # FEEDS (RSS/Atom prosty)
+    prof.stage("feeds")
     build_feeds()
 
     # Link-checker (wewnętrzny)
-    internal_link_checker()
+    links_span = prof.stage("link_checker")
+    link_report = internal_link_checker(analyses, redirects, extra_pages)
+    links_span.count(checked=link_report["checked"], broken=link_report["broken_count"], orphans=link_report["orphans_count"])
+
+    # Pliki poprzedniego builda, których ten build już nie tworzy (raporty z końca builda zapisujemy niżej)
+    outputs_span = prof.stage("stale_outputs")
+    SINK.remove_stale(keep=[OUT/"_reports"/name for name in ("summary.txt", "compression.json", "build-profile.json")])
+    outputs = SINK.stats()
+    outputs_span.count(**outputs)
+
+    # Prekompresja: .br/.gz obok plików tekstowych (tylko zmienione od poprzedniego builda)
+    compress_cfg = CFG.get("build", {}).get("precompress", {}) or {}
+    compression = None
+    if _truthy(compress_cfg.get("enabled", True)):
+        compress_span = prof.stage("precompress")
+        compression = precompress.run(OUT, n_jobs, compress_cfg.get("formats") or precompress.FORMATS)
+        write_text(OUT/"_reports"/"compression.json", json.dumps(compression, indent=1))
+        compress_span.count(files=compression["total"]["files"], compressed=compression["compressed"])
+
+    # Manifest wdrożenia + adresy zmienione względem poprzedniego builda (tools/indexnow.py)
+    deploy_span = prof.stage("deploy_manifest")
+    changes = deploy_manifest.update(OUT, canonical_by_out, lastmod=new_lastmod)
+    deploy_span.count(files=sum(changes["files"].values()), **{f"urls_{k}": len(v) for k, v in changes["urls"].items()})
+    prof.stop()
 
     # RAPORT
     report = [
-        f"[OK] pages={len(pages)} city×service={len(city)} indexable={len(indexables)}",
+        f"[OK] pages={len(pages)} city×service={city_count} indexable={len(indexables)}",
         f"autolinks_inline={autolink_inline} fallback_cards={autolink_fb}",
-        f"near_duplicates_warn={dup_warns}"
+        f"near_duplicates_warn={dup_warns}",
+        f"seo_score_avg={seo_report['average_score']} thin_content={seo_report['thin_content_count']} "
+        f"keyword_density_outside_range={seo_report['keyword_density_outside_range']}",
+        f"cache_hits={cache_hits} cache_misses={cache_misses}",
+        f"files_written={outputs['written']} files_unchanged={outputs['unchanged']} files_deleted={outputs['deleted']}",
+        f"urls_added={len(changes['urls']['added'])} urls_changed={len(changes['urls']['changed'])} "
+        f"urls_removed={len(changes['urls']['removed'])}" + (" (baseline)" if changes["baseline"] else "")
     ]
+    if compression:
+        total = compression["total"]
+        report.append(f"precompressed={compression['compressed']} raw_bytes={total['raw']} "
+                      + " ".join(f"{fmt}_bytes={total[fmt]}" for fmt in compression["formats"]))
     write_text(OUT/"_reports"/"summary.txt", "\n".join(report))
     print("\n".join(report))
     print("\n".join(logs[:80] + (["…"] if len(logs)>80 else [])))
+
+    # PROFIL: etapy builda + metryki z reports.metrics (null = jeszcze nie liczone)
+    known = {
+        "pages_count": writes,
+        "generated_city_service": city_count,
+        "indexable_count": len(indexables),
+        "autolinks_inline_count": autolink_inline,
+        "autolinks_fallback_count": autolink_fb,
+        "duplicate_titles_count": sum(n - 1 for n in titles.values() if n > 1),
+        "thin_content_count": seo_report["thin_content_count"],
+        "keyword_density_outside_range": seo_report["keyword_density_outside_range"],
+        "files_written": outputs["written"],
+        "files_unchanged": outputs["unchanged"],
+        "files_deleted": outputs["deleted"],
+    }
+    prof.extra["metrics"] = {m: known.get(m) for m in CFG.get("reports", {}).get("metrics", known)}
+    prof.write(OUT/"_reports"/"build-profile.json", write_text)
+    SINK.close()
+    SINK = None
+    print("\n".join(prof.summary()))
+    if "render_profile" in prof.extra:
+        rp = prof.extra["render_profile"]
+        print(f"[profile] render hot functions ({rp['mode']}, jobs={rp['jobs']}):")
+        for row in rp["top"][:15]:
+            print("  " + "  ".join(f"{k}={v}" for k, v in row.items()))
     print(f"[result] pages_rendered={writes}, langs={sorted(langs_seen)}")
 
 # ----------------------------- SITEMAPS ------------------------------------
-def write_sitemaps(urls: List[Tuple[str, str, str]] | List[Tuple[str, str]] , alternates: Dict[str, Dict[str, str]] | None = None):
-    # urls: [(loc, lastmod, slugKey?)] - trzeci element może nie wystąpić (wtedy alternates ignorujemy)
+def write_sitemaps(urls: Iterable[Tuple[str, ...]], alternates: Dict[str, Dict[str, str]] | None = None):
+    # urls: [(loc, lastmod, slugKey?, typ?)] — brakujące elementy = bez alternates / bez priority
     # alternates: { slugKey: { 'pl': '...', 'en': '...', ... } }
     alternates = alternates or {}
-    # wyciągnij slugKey jeśli jest; ujednolić do 3-elementowej krotki
-    norm_urls: List[Tuple[str, str, str]] = []
+    cfg = CFG.get("sitemap", {}) or {}
+    priority = cfg.get("priority_by_type", {}) or {}
+    changefreq = cfg.get("changefreq_by_type", {}) or {}
+    with_alternates = cfg.get("include_alternates", True)
+    writer = sitemap_writer.SitemapWriter(OUT, SITE_URL, max_urls=int(cfg.get("shard_size", 45000)),
+                                          commit=SINK.adopt)
     for u in urls:
-        if len(u) == 3:
-            norm_urls.append(u)  # (loc, lastmod, slugKey)
-        elif len(u) == 2:
-            loc, lastmod = u
-            norm_urls.append((loc, lastmod, ""))  # brak slugKey
-        else:
-            continue
-
-    shard = int(CFG.get("sitemap", {}).get("shard_size", 45000))
-    groups = [norm_urls[i:i+shard] for i in range(0, len(norm_urls), shard)]
-    index: List[Tuple[str, str]] = []
-
-    for i, g in enumerate(groups or [[]]):
-        name = f"sitemap-{i+1}.xml"
-        path = OUT / name
-        lines = ['<?xml version="1.0" encoding="UTF-8"?>',
-                 '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">']
-        for loc, lastmod, slugKey in g:
-            lines.append("  <url>")
-            lines.append(f"    <loc>{loc}</loc>")
-            lines.append(f"    <lastmod>{lastmod}</lastmod>")
-            # alternates (hreflang) jeśli mamy slugKey i są wpisy
-            if slugKey and CFG.get("sitemap", {}).get("include_alternates", True):
-                for L, href in (alternates.get(slugKey, {}) or {}).items():
-                    lines.append(f'    <xhtml:link rel="alternate" hreflang="{L}" href="{href}"/>')
-            lines.append("  </url>")
-        lines.append("</urlset>")
-        write_text(path, "\n".join(lines))
-        index.append((f"{SITE_URL}/{name}", UTC()))
-
-    # index
-    idx = ['<?xml version="1.0" encoding="UTF-8"?>',
-           '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    for loc, lastmod in index:
-        idx.append(f"  <sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>")
-    idx.append("</sitemapindex>")
-    write_text(OUT/"sitemap.xml", "\n".join(idx))
+        loc, lastmod, slugKey, kind = (tuple(u) + ("", ""))[:4]
+        if slugKey == "home":
+            kind = "home"
+        writer.add(loc, lastmod or "", changefreq.get(kind) or "", priority.get(kind),
+                   alternates.get(slugKey) if slugKey and with_alternates else None)
+    index = writer.close()
+    write_text(OUT/"sitemap.xml", sitemap_writer.index_xml(index))
+    return writer.urls
 
 # ------------------------------ SEARCH INDEX -------------------------------
-def build_search_indexes():
-    docs_by_lang={L:[] for L in LOCALES}
-    for lang_dir in (OUT).glob("*"):
-        if not lang_dir.is_dir(): continue
-        L=lang_dir.name
-        if L not in LOCALES: continue
-        for idx in lang_dir.rglob("index.html"):
-            html=read_text(idx)
-            s=soupify(html)
-            h1=(s.find("h1").get_text(" ",strip=True) if s.find("h1") else "")
-            title=(s.find("title").get_text(" ",strip=True) if s.find("title") else "")
-            desc=""
-            m=s.find("meta", attrs={"name":"description"})
-            if m and m.get("content"): desc=m["content"]
-            body=s.find("main") or s
-            text=body.get_text(" ",strip=True)
-            docs_by_lang[L].append({
-                "path": "/"+idx.relative_to(OUT).as_posix().replace("index.html",""),
-                "title": title, "h1": h1, "desc": desc, "text": text[:6000]
-            })
-    for L, arr in docs_by_lang.items():
-        if not arr: continue
-        write_text(OUT/f"search-index-{L}.json", json.dumps(arr, ensure_ascii=False))
+def build_search_indexes(analyses: "page_analysis.AnalysisStore", skip: Iterable[str] = ()):
+    # odwrócony indeks per język z analiz stron z renderu — bez ponownego czytania dist/;
+    # dist/search/<lang>/meta.json + kawałki termów t-<n>.json + dokumenty d-<n>.json
+    # skip: URL-e stron odrzuconych przez bramkę jakości (noindex)
+    skip = set(skip)
+    indexes = search_index.build((p for p in analyses if p.url not in skip), LOCALES)
+    stats = search_index.write(indexes, write_text, OUT/"search")
+    print("[search] " + " ".join(f"{L}:docs={st['docs']},terms={st['terms']},shards={st['shards']}" for L, st in stats.items()))
+    return stats
 
 # ------------------------------ FEEDS --------------------------------------
 def build_feeds():
@@ -1670,25 +2175,24 @@ def build_feeds():
         write_text(OUT/L/"atom.xml", "\n".join(atom))
 
 # ------------------------------ LINK-CHECKER -------------------------------
-def internal_link_checker():
-    all_paths=set()
-    for idx in OUT.rglob("index.html"):
-        url="/"+idx.relative_to(OUT).as_posix().replace("index.html","")
-        all_paths.add(url)
-    broken=[]
-    for idx in OUT.rglob("index.html"):
-        html=read_text(idx)
-        s=soupify(html)
-        for a in s.find_all("a", href=True):
-            href=a["href"]
-            if href.startswith("mailto:") or href.startswith("tel:"): continue
-            if href.startswith("http"): continue
-            if not href.endswith("/"): href=href+"/"
-            if href not in all_paths:
-                broken.append((str(idx.relative_to(OUT)), href))
-    if broken:
-        lines=["BROKEN INTERNAL LINKS (first 100):"] + [f"{p} → {h}" for p,h in broken[:100]]
+def internal_link_checker(analyses: "page_analysis.AnalysisStore", redirects: Dict[str, str],
+                          extra_pages: Sequence["page_analysis.PageAnalysis"] = ()):
+    # linki, zasoby i id z analiz renderu sprawdzane względem plików dist/ (bez nieaktualnych
+    # z poprzedniego builda); kopia strony głównej i 404.html dochodzą jako extra_pages
+    files = link_checker.output_index(OUT, exclude=SINK.stale())
+    checker = link_checker.LinkChecker(files, SITE_URL, redirects)
+    for page in analyses:
+        checker.add_page(page.url, page.links, page.refs or (), page.ids or ())
+    for page in extra_pages:
+        checker.add_page(page.url, page.links, page.refs or (), page.ids or (), orphan_check=False)
+    report = checker.finish(chain(((p.url, p.ids or ()) for p in analyses), ((p.url, p.ids or ()) for p in extra_pages)))
+    write_text(OUT/"_reports"/"links.json", json.dumps(report, ensure_ascii=False, indent=1))
+    if report["broken"]:
+        lines=["BROKEN INTERNAL LINKS (first 100):"] + [f"{b['page']} → {b['href']} ({b['reason']})" for b in report["broken"][:100]]
         write_text(OUT/"_reports"/"broken-links.txt", "\n".join(lines))
+    print(f"[links] pages={report['pages']} checked={report['checked']} broken={report['broken_count']} "
+          f"redirected={report['redirected_count']} orphans={report['orphans_count']}")
+    return report
 
 # ----------------------------- NEWS SITEMAP ---------------------------------
 def write_news_sitemap():
@@ -1734,5 +2238,15 @@ def write_news_sitemap():
 
 
 # ------------------------------ MAIN ---------------------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Kras-Trans static builder")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="liczba procesów renderujących (0 = wszystkie rdzenie; domyślnie BUILD_JOBS albo 1)")
+    ap.add_argument("--force", action="store_true",
+                    help="renderuj wszystkie strony, ignorując manifest .build-cache")
+    args = ap.parse_args(argv)
+    build_all(jobs=args.jobs, force=args.force)
+    return 0
+
 if __name__=="__main__":
-    build_all()
+    raise SystemExit(main())
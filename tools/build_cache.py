@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build cache dla tools/build.py.
+- Manifest .build-cache/manifest.json: ścieżka wyjścia -> odcisk wejść strony.
+- Odcisk = sha256 ze stabilnego JSON-a (sort_keys), więc nie zależy od kolejności kluczy.
+- Odcisk szablonu obejmuje jego źródło oraz wszystkie partiale dołączane
+  przez include/extends/import (przechodnio).
+Katalog cache leży poza dist/, żeby nie trafiał do artefaktu Pages.
+"""
+from __future__ import annotations
+import hashlib, json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+CACHE_DIR = Path(".build-cache")
+MANIFEST = CACHE_DIR / "manifest.json"
+MANIFEST_VERSION = 3  # 3: wpisy stron wskazują linię analizy (page_analysis) zamiast simhash/SEO
+
+def digest(obj: Any) -> str:
+    """sha256 ze stabilnej serializacji JSON (obiekty spoza JSON przez str())."""
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def file_digest(paths: Iterable[Path]) -> str:
+    h = hashlib.sha256()
+    for p in paths:
+        p = Path(p)
+        h.update(p.name.encode("utf-8"))
+        if p.exists():
+            h.update(p.read_bytes())
+    return h.hexdigest()
+
+def template_deps(env, name: str, _seen: Optional[Set[str]] = None) -> Set[str]:
+    """Zbiór szablonów, od których zależy ``name`` (łącznie z nim samym).
+
+    Dynamiczne include'y (np. ``{% include footer_path %}``) nie są znane
+    statycznie i są pomijane. Partiale z ``cached_include``/``fragment_hole``
+    (fragment_cache) są liczone jak include.
+    """
+    from jinja2 import meta, TemplateNotFound
+    from fragment_cache import referenced_templates
+    seen = _seen if _seen is not None else set()
+    if name in seen:
+        return seen
+    seen.add(name)
+    try:
+        source, _, _ = env.loader.get_source(env, name)
+    except TemplateNotFound:
+        return seen
+    refs = list(meta.find_referenced_templates(env.parse(source))) + referenced_templates(source)
+    for ref in refs:
+        if ref:
+            template_deps(env, ref, seen)
+    return seen
+
+def template_digest(env, name: str) -> str:
+    from jinja2 import TemplateNotFound
+    h = hashlib.sha256()
+    for dep in sorted(template_deps(env, name)):
+        h.update(dep.encode("utf-8"))
+        try:
+            source, _, _ = env.loader.get_source(env, dep)
+        except TemplateNotFound:
+            continue
+        h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+def load_manifest(path: Path = MANIFEST) -> Dict[str, Any]:
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except Exception:
+        return {"version": MANIFEST_VERSION, "pages": {}}
+    if data.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "pages": {}}
+    data.setdefault("pages", {})
+    return data
+
+def save_manifest(data: Dict[str, Any], path: Path = MANIFEST) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), "utf-8")
+    tmp.replace(path)
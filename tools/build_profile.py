@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profil builda dla tools/build.py.
+- Profile.span(name): etap builda — czas ścienny, CPU, przyrost RSS i liczniki.
+- StageTimes: tani licznik pod-etapów w pętli renderu (także w workerach);
+  sumy z workerów dopisuje Profile.add.
+- make_profiler(): BUILD_PROFILE=cprofile|sample włącza profiler funkcji dla
+  renderu; dane z workerów są scalane, a najgorętsze funkcje trafiają do raportu.
+Raport: dist/_reports/build-profile.json.
+"""
+from __future__ import annotations
+import json, os, sys, time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_VERSION = 1
+PROFILE_ENV = "BUILD_PROFILE"
+PROFILE_TOP_ENV = "BUILD_PROFILE_TOP"
+SAMPLE_INTERVAL = 0.002  # s CPU między próbkami (BUILD_PROFILE=sample)
+
+def rss_mb() -> Optional[float]:
+    """Bieżące RSS procesu (Linux: /proc/self/statm); None, gdy nieznane."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+# ------------------------------ ETAPY ------------------------------
+class Span:
+    __slots__ = ("name", "wall", "cpu", "rss_delta_mb", "calls", "items")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss_delta_mb: Optional[float] = None
+        self.calls = 0
+        self.items: Dict[str, Any] = {}
+
+    def count(self, **items: Any) -> None:
+        """Liczniki etapu (liczby się sumują, reszta jest nadpisywana)."""
+        for k, v in items.items():
+            prev = self.items.get(k)
+            is_num = isinstance(v, (int, float)) and not isinstance(v, bool)
+            self.items[k] = prev + v if is_num and isinstance(prev, (int, float)) else v
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall_s": round(self.wall, 4),
+            "cpu_s": round(self.cpu, 4),
+            "rss_delta_mb": None if self.rss_delta_mb is None else round(self.rss_delta_mb, 1),
+            "calls": self.calls,
+            "items": self.items,
+        }
+
+class Profile:
+    """Etapy builda w kolejności pierwszego wystąpienia; ta sama nazwa się kumuluje."""
+
+    def __init__(self):
+        self.spans: Dict[str, Span] = {}
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        self.extra: Dict[str, Any] = {}
+        self._open = None
+
+    def _get(self, name: str) -> Span:
+        sp = self.spans.get(name)
+        if sp is None:
+            sp = self.spans[name] = Span(name)
+        return sp
+
+    @contextmanager
+    def span(self, name: str, **items: Any) -> Iterator[Span]:
+        sp = self._get(name)
+        sp.count(**items)
+        r0, t0, c0 = rss_mb(), time.perf_counter(), time.process_time()
+        try:
+            yield sp
+        finally:
+            sp.wall += time.perf_counter() - t0
+            sp.cpu += time.process_time() - c0
+            sp.calls += 1
+            r1 = rss_mb()
+            if r0 is not None and r1 is not None:
+                sp.rss_delta_mb = (sp.rss_delta_mb or 0.0) + (r1 - r0)
+
+    def stage(self, name: str, **items: Any) -> Span:
+        """Zamyka bieżący etap i otwiera kolejny (dla długich funkcji liniowych)."""
+        self.stop()
+        self._open = self.span(name, **items)
+        return self._open.__enter__()
+
+    def stop(self) -> None:
+        if self._open is not None:
+            cm, self._open = self._open, None
+            cm.__exit__(None, None, None)
+
+    def add(self, name: str, wall: float = 0.0, cpu: float = 0.0, calls: int = 0, **items: Any) -> Span:
+        """Dopisuje czasy zmierzone gdzie indziej (np. sumy StageTimes z workerów)."""
+        sp = self._get(name)
+        sp.wall += wall
+        sp.cpu += cpu
+        sp.calls += calls
+        sp.count(**items)
+        return sp
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.stop()
+        return {
+            "version": PROFILE_VERSION,
+            "total": {
+                "wall_s": round(time.perf_counter() - self._t0, 4),
+                "cpu_s": round(time.process_time() - self._c0, 4),
+                "peak_rss_mb": None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+            },
+            "spans": [sp.to_dict() for sp in self.spans.values()],
+            **self.extra,
+        }
+
+    def write(self, path: Path, write: Optional[Callable[[Path, str], Any]] = None) -> Dict[str, Any]:
+        """``write(path, text)`` pozwala zapisać przez OutputSink builda."""
+        data = self.to_dict()
+        path = Path(path)
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if write is not None:
+            write(path, text)
+            return data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, "utf-8")
+        return data
+
+    def summary(self) -> List[str]:
+        return [
+            f"[profile] {sp.name:<24} wall={sp.wall:8.3f}s cpu={sp.cpu:8.3f}s"
+            + (f" rss={sp.rss_delta_mb:+.1f}MB" if sp.rss_delta_mb is not None else "")
+            + "".join(f" {k}={v}" for k, v in sp.items.items())
+            for sp in self.spans.values()
+        ]
+
+class StageTimes:
+    """Sumy (wall, cpu, wywołania) pod-etapów mierzonych wiele razy na stronę."""
+
+    def __init__(self):
+        self.acc: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            a = self.acc[name]
+            a[0] += time.perf_counter() - t0
+            a[1] += time.process_time() - c0
+            a[2] += 1
+
+    def take(self) -> Dict[str, List[float]]:
+        """Zwraca zebrane sumy i zeruje licznik (wynik jest picklowalny)."""
+        out = dict(self.acc)
+        self.acc.clear()
+        return out
+
+# ------------------------------ PROFILER FUNKCJI ------------------------------
+class _CProfiler:
+    mode = "cprofile"
+
+    def __init__(self):
+        import cProfile
+        self._prof = cProfile.Profile()
+        self.stats: Dict[Any, Any] = {}
+
+    def start(self) -> None:
+        self._prof.enable()
+
+    def stop(self) -> None:
+        self._prof.disable()
+
+    def export(self) -> Dict[Any, Any]:
+        """Statystyki cProfile w postaci picklowalnej (do przesłania z workera)."""
+        self._prof.create_stats()
+        self.merge(self._prof.stats)
+        import cProfile
+        self._prof = cProfile.Profile()
+        out, self.stats = self.stats, {}
+        return out
+
+    def merge(self, stats: Dict[Any, Any]) -> None:
+        import pstats
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            if func in self.stats:
+                cc0, nc0, tt0, ct0, callers0 = self.stats[func]
+                self.stats[func] = (cc0 + cc, nc0 + nc, tt0 + tt, ct0 + ct, pstats.add_callers(callers0, callers))
+            else:
+                self.stats[func] = (cc, nc, tt, ct, dict(callers))
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+        return [{
+            "func": _func_label(func),
+            "calls": nc,
+            "tottime_s": round(tt, 4),
+            "cumtime_s": round(ct, 4),
+        } for func, (cc, nc, tt, ct, _) in rows]
+
+class _Sampler:
+    """Próbkujący profiler na SIGPROF (Unix): liczy funkcje na stosie co SAMPLE_INTERVAL CPU."""
+    mode = "sample"
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.self_hits: Counter = Counter()
+        self.total_hits: Counter = Counter()
+        self.samples = 0
+
+    def _on_signal(self, signum, frame) -> None:
+        self.samples += 1
+        seen = set()
+        f = frame
+        if f is not None:
+            self.self_hits[_frame_key(f)] += 1
+        while f is not None:
+            key = _frame_key(f)
+            if key not in seen:
+                seen.add(key)
+                self.total_hits[key] += 1
+            f = f.f_back
+
+    def start(self) -> None:
+        import signal
+        signal.signal(signal.SIGPROF, self._on_signal)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        import signal
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+
+    def export(self) -> Dict[str, Any]:
+        out = {"samples": self.samples, "self": dict(self.self_hits), "total": dict(self.total_hits)}
+        self.self_hits, self.total_hits, self.samples = Counter(), Counter(), 0
+        return out
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        self.samples += data.get("samples", 0)
+        self.self_hits.update(data.get("self", {}))
+        self.total_hits.update(data.get("total", {}))
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        total = self.samples or 1
+        return [{
+            "func": _func_label(key),
+            "self_samples": hits,
+            "self_pct": round(100 * hits / total, 1),
+            "total_pct": round(100 * self.total_hits.get(key, 0) / total, 1),
+        } for key, hits in self.self_hits.most_common(n)]
+
+def _frame_key(f) -> tuple:
+    co = f.f_code
+    return (co.co_filename, co.co_firstlineno, co.co_name)
+
+def _func_label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":  # wbudowane (cProfile)
+        return name
+    return f"{Path(filename).name}:{line}({name})"
+
+def profiler_mode() -> Optional[str]:
+    mode = (os.getenv(PROFILE_ENV) or "").strip().lower()
+    if mode in ("1", "true", "on", "cprofile"):
+        return "cprofile"
+    if mode == "sample" and hasattr(__import__("signal"), "setitimer"):
+        return "sample"
+    return None
+
+def make_profiler(mode: Optional[str] = None):
+    """Profiler funkcji dla trybu z BUILD_PROFILE (albo None, gdy wyłączony)."""
+    mode = mode or profiler_mode()
+    if mode == "cprofile":
+        return _CProfiler()
+    if mode == "sample":
+        return _Sampler()
+    return None
+
+def top_n() -> int:
+    try:
+        return max(1, int(os.getenv(PROFILE_TOP_ENV, "30")))
+    except ValueError:
+        return 30
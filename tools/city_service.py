@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Strony miasto × usługa (collections.city_service w pages.yml) dla tools/build.py.
+- compile_pattern(): wzorzec pola, np. "{service.h1} — {city.name}" albo
+  "{service.title or service.h1}", kompilowany raz do funkcji.
+- CityServicePages: generator zwartych rekordów CityServicePage. Widoki usług
+  i miejsc są współdzielone, rekord niesie tylko slug i pola z wzorców, a builder
+  zamienia go w zadanie renderu dopiero przy konsumpcji — pamięć nie rośnie
+  z limits.perLang/maxPages.
+"""
+from __future__ import annotations
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+Scope = Mapping[str, Mapping[str, Any]]
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+_PATH = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?$")
+
+# Dotychczasowe (zaszyte w builderze) teksty — gdy pages.yml nie podaje fields
+DEFAULT_FIELDS: Dict[str, Any] = {
+    "type": "city_service",
+    "publish": True,
+    "h1": "{service.h1} — {city.name}",
+    "title": "{service.h1} — {city.name}",
+    "seo_title": "{service.h1} — {city.name} | Kras-Trans",
+    "meta_desc": "Transport i spedycja — {service.h1} w {city.name}. Wycena w 15 min, kontakt 24/7.",
+    "hero_alt": "{service.h1} — {city.name}",
+    "lead": "{service.lead or service.title}",
+}
+DEFAULT_SLUG = "{service.slug}-{city.slug}"
+
+# ------------------------------ WZORCE ------------------------------
+def compile_pattern(pattern: str) -> Callable[[Scope], str]:
+    """Kompiluje wzorzec z polami ``{obj.attr}`` / ``{a.b or c.d}`` (pierwsza niepusta wartość).
+
+    Zwraca funkcję ``scope -> str``; ``scope`` to np. {"service": {...}, "city": {...}}.
+    Brakujące wartości dają pusty tekst.
+    """
+    parts: List[Any] = []
+    pos = 0
+    for m in _PLACEHOLDER.finditer(pattern):
+        if m.start() > pos:
+            parts.append(pattern[pos:m.start()])
+        alts = []
+        for expr in m.group(1).split(" or "):
+            expr = expr.strip()
+            if not _PATH.match(expr):
+                raise ValueError(f"city_service: niepoprawne pole {expr!r} we wzorcu {pattern!r}")
+            obj, _, attr = expr.partition(".")
+            alts.append((obj, attr))
+        parts.append(tuple(alts))
+        pos = m.end()
+    if pos < len(pattern):
+        parts.append(pattern[pos:])
+
+    if all(isinstance(p, str) for p in parts):
+        const = "".join(parts)
+        return lambda scope: const
+
+    def render(scope: Scope) -> str:
+        out = []
+        for p in parts:
+            if isinstance(p, str):
+                out.append(p)
+                continue
+            v: Any = ""
+            for obj, attr in p:
+                v = scope.get(obj) if not attr else (scope.get(obj) or {}).get(attr)
+                if v:
+                    break
+            out.append(str(v) if v else "")
+        return "".join(out)
+    return render
+
+def compile_fields(fields: Mapping[str, Any]) -> List[Tuple[str, Callable[[Scope], Any]]]:
+    """Pola tekstowe → skompilowane wzorce; pozostałe (publish: true) jako stałe."""
+    out: List[Tuple[str, Callable[[Scope], Any]]] = []
+    for name, value in fields.items():
+        if isinstance(value, str):
+            out.append((name, compile_pattern(value)))
+        else:
+            out.append((name, lambda scope, _v=value: _v))
+    return out
+
+# ------------------------------ REKORDY ------------------------------
+class CityServicePage:
+    """Jedna strona miasto × usługa: widoki usługi/miasta są współdzielone między rekordami."""
+    __slots__ = ("lang", "slug", "slug_key", "service", "city", "fields")
+
+    def __init__(self, lang: str, slug: str, slug_key: str, service: Dict[str, Any],
+                 city: Dict[str, Any], fields: Dict[str, Any]):
+        self.lang = lang
+        self.slug = slug
+        self.slug_key = slug_key
+        self.service = service
+        self.city = city
+        self.fields = fields
+
+    def page(self) -> Dict[str, Any]:
+        """Pełny rekord strony (jak wiersz CMS) — budowany dopiero dla zadania renderu."""
+        svc, city = self.service, self.city
+        return {
+            "lang": self.lang,
+            "slugKey": self.slug_key,
+            "slug": self.slug,
+            **self.fields,
+            "og_image": svc.get("og_image"),
+            "canonical_path": f"/{self.lang}/{self.slug}/",
+            "city": city["name"],
+            "voivodeship": city["voivodeship"],
+            "service_slug": svc["slug"],
+            "service_h1": svc["h1"],
+            "__from": "city_service",
+            "body_html": "",
+        }
+
+class CityServicePages:
+    """Iterowalny zbiór stron miasto × usługa wg collections.city_service.
+
+    ``services`` to strony CMS typu service, ``places`` — scalone miejsca
+    (lang, city, voivodeship, slug); ``norm_slug`` pochodzi z buildera.
+    Każda iteracja generuje rekordy od nowa, bez trzymania listy.
+    """
+
+    def __init__(self, cfg: Mapping[str, Any], services: Iterable[Mapping[str, Any]],
+                 places: Iterable[Mapping[str, Any]], norm_slug: Callable[[str], str],
+                 langs: Iterable[str], og_image: Optional[str] = None):
+        limits = cfg.get("limits") or {}
+        self.per_lang = int(limits.get("perLang") or 0)
+        self.max_pages = int(limits.get("maxPages") or 0)
+        self.langs = [str(L).lower() for L in (cfg.get("langs") or langs)]
+        self.norm_slug = norm_slug
+        self.fields = compile_fields({**DEFAULT_FIELDS, **(cfg.get("fields") or {})})
+        policy = cfg.get("slugPolicy") or {}
+        self.slug_pattern = compile_pattern(policy.get("pattern") or DEFAULT_SLUG)
+        self.slug_norm = policy.get("transliterate", True) or policy.get("lowercase", True)
+
+        self.services: List[Dict[str, Any]] = []
+        for s in services:
+            slug = s.get("slug") or norm_slug(s.get("slugKey") or s.get("h1") or "service")
+            h1 = s.get("h1") or s.get("title") or slug
+            self.services.append({
+                "lang": (s.get("lang") or "").lower(),
+                "slug": slug,
+                "slugKey": s.get("slugKey") or "service",
+                "h1": h1,
+                "title": s.get("title") or "",
+                "lead": s.get("lead") or "",
+                "og_image": s.get("og_image") or og_image,
+            })
+        self.places_by_lang: Dict[str, List[Dict[str, Any]]] = {}
+        for p in places:
+            slug = p.get("slug") or norm_slug(p.get("city") or "")
+            if not slug:
+                continue
+            lang = (p.get("lang") or "pl").lower()
+            self.places_by_lang.setdefault(lang, []).append({
+                "name": p.get("city") or "",
+                "slug": slug,
+                "voivodeship": p.get("voivodeship") or p.get("region") or "",
+            })
+
+    def __iter__(self) -> Iterator[CityServicePage]:
+        return self.records()
+
+    def records(self, only: Optional[Iterable[str]] = None) -> Iterator[CityServicePage]:
+        """Rekordy w kolejności builda; ``only`` ogranicza liczone pola (np. dla grafu linków)."""
+        fns = self.fields if only is None else [(n, fn) for n, fn in self.fields if n in set(only)]
+        total = 0
+        for L in self.langs:
+            used = 0
+            places = self.places_by_lang.get(L, [])
+            for svc in self.services:
+                if (svc["lang"] or L) != L:
+                    continue
+                for city in places:
+                    if self.per_lang and used >= self.per_lang:
+                        break
+                    if self.max_pages and total >= self.max_pages:
+                        return
+                    scope = {"service": svc, "city": city, "lang": L}
+                    slug = self.slug_pattern(scope)
+                    if self.slug_norm:
+                        slug = self.norm_slug(slug)
+                    fields = {name: fn(scope) for name, fn in fns}
+                    yield CityServicePage(L, slug, f"{svc['slugKey']}__{city['slug']}", svc, city, fields)
+                    used += 1
+                    total += 1
@@ -16,11 +16,12 @@ def truthy(val) -> bool:
 
 
 def validate(schema_path: Path, xlsx_path: Path) -> None:
-    import json, openpyxl, yaml
+    import json, yaml
+    import cms_ingest, cms_schema
 
     _ = yaml.safe_load(schema_path.read_text(encoding="utf-8")) if schema_path.exists() else None
     try:
-        wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+        sheets = cms_ingest.load_sheets(xlsx_path)
     except FileNotFoundError:
         print(f"[cms_guard] ⚠️ XLSX not found: {xlsx_path}")
         Path("sheet_report.json").write_text("{}", encoding="utf-8")
@@ -37,66 +38,30 @@ def validate(schema_path: Path, xlsx_path: Path) -> None:
     errors = 0
     content_like: List[Dict[str, str]] = []
 
-    for ws in wb.worksheets:
-        first_row = next(ws.iter_rows(values_only=True))
-        hdr = [str(c or "").strip() for c in first_row]
-        hdr_lc = [norm(h) for h in hdr]
-        report["sheets"].append({"name": ws.title, "headers": hdr})
+    for sh, data_rows in cms_schema.sheets(sheets):
+        hdr = sh.headers
+        report["sheets"].append({"name": sh.title, "headers": hdr})
 
-        header_index = {h: i for i, h in enumerate(hdr_lc)}
+        # klasyfikacja wspólna z cms_ingest (aliasy SYN, te same reguły)
+        klass = sh.klass
 
-        is_pages = (
-            "lang" in hdr_lc
-            and "publish" in hdr_lc
-            and "template" in hdr_lc
-            and (("slug" in hdr_lc) or ("slugkey" in hdr_lc))
-        )
-        is_menu = (
-            "lang" in hdr_lc
-            and "enabled" in hdr_lc
-            and "label" in hdr_lc
-            and "href" in hdr_lc
-        )
-        is_meta = "lang" in hdr_lc and "key" in hdr_lc
-        is_blocks = ("lang" in hdr_lc) and (("html" in hdr_lc) or ("body" in hdr_lc))
-        # NOWE:
-        is_collection = (
-            "lang" in hdr_lc
-            and "publish" in hdr_lc
-            and not (is_pages or is_menu or is_meta or is_blocks)
-        )
-
-        klass = (
-            "pages"
-            if is_pages
-            else "menu"
-            if is_menu
-            else "meta"
-            if is_meta
-            else "blocks"
-            if is_blocks
-            else "collection"
-            if is_collection
-            else "other"
-        )
-
-        if "lang" in hdr_lc and "publish" in hdr_lc:
-            content_like.append({"name": ws.title, "class": klass})
+        if sh.has("pages", "lang", "publish"):
+            content_like.append({"name": sh.title, "class": klass})
 
-        lang_idx = header_index.get("lang")
-        publish_idx = header_index.get("publish")
-        enabled_idx = header_index.get("enabled")
-        slug_idx = header_index.get("slug")
-        slugkey_idx = header_index.get("slugkey")
-        template_idx = header_index.get("template")
-        label_idx = header_index.get("label")
-        href_idx = header_index.get("href")
+        lang_idx = sh.field_col("pages", "lang")
+        publish_idx = sh.field_col("pages", "publish")
+        enabled_idx = sh.field_col("menu", "enabled")
+        slug_idx = sh.field_col("pages", "slug")
+        slugkey_idx = sh.field_col("pages", "key")
+        template_idx = sh.field_col("pages", "template")
+        label_idx = sh.field_col("menu", "label")
+        href_idx = sh.field_col("menu", "href")
 
         rows_per_lang: Dict[str, int] = {}
         published_per_lang: Dict[str, int] = {}
         pub_col = enabled_idx if klass == "menu" else publish_idx
 
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(data_rows, start=2):
             vals = list(row)
             lang_val = norm(vals[lang_idx]) if lang_idx is not None and lang_idx < len(vals) else ""
             if lang_val:
@@ -135,7 +100,7 @@ def validate(schema_path: Path, xlsx_path: Path) -> None:
                     print(f"[cms_guard] ❌ menu row {row_idx}: missing {', '.join(missing)}")
                     errors += 1
 
-        print(f"[cms_guard] sheet '{ws.title}' class={klass} rows_per_lang={rows_per_lang} published_per_lang={published_per_lang}")
+        print(f"[cms_guard] sheet '{sh.title}' class={klass} rows_per_lang={rows_per_lang} published_per_lang={published_per_lang}")
 
     Path("sheet_report.json").write_text(
         json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
@@ -144,7 +109,7 @@ def validate(schema_path: Path, xlsx_path: Path) -> None:
     unrecognized = [
         s
         for s in content_like
-        if s["class"] not in ("pages", "menu", "meta", "blocks", "collection")
+        if s["class"] not in cms_schema.CLASSES
     ]
     if unrecognized:
         print(
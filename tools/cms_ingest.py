@@ -1,11 +1,18 @@
 # tools/cms_ingest.py
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, time
+import gzip
+import hashlib
+import json
 import os
 import re
 import shutil
 
+import cms_schema  # tools/cms_schema.py (SYN + skompilowane ekstraktory)
+from cms_schema import LOCALES, TRUE_VALUES, Sheet, row_empty
+
 try:
     import requests
 except Exception:  # pragma: no cover - requests may be missing in minimal envs
@@ -27,103 +34,6 @@ def split_slug(slug: str):
     rel = (m.group(2) or "").strip("/")
     return lang, rel
 
-SYN = {
-  # kolumny dla arkuszy z definicjami stron
-  "pages": {
-    "lang": ["lang", "język", "jezyk"],
-    "publish": ["publish", "enabled", "widoczne", "visible", "aktywny", "active"],
-    "slug": ["slug", "url", "path"],
-    "key": ["slugkey", "slug_key", "key", "page", "route"],
-    "parent": ["parent", "parent_key", "parentslug", "parent_slug", "parentkey"],
-    "template": ["template", "tpl", "szablon"],
-    "order": ["order", "kolej", "sort", "kolejność", "kolejnosc", "poz"],
-    "title": ["title", "meta_title", "tytuł", "tytul"],
-    "seo_title": ["seo_title", "title", "meta_title"],
-    "description": ["description", "meta_desc", "opis", "desc"],
-    "og_image": ["og_image", "og", "image", "obraz", "grafika"],
-    "canonical": ["canonical", "kanoniczny", "canonical_url"],
-  },
-  # menu nawigacyjne
-  "menu": {
-    "lang":["lang","język","jezyk"],
-    "label":["label","nazwa","etykieta","tekst"],
-    "href":["href","url","link"],
-    "parent":["parent","rodzic","grupa"],
-    "order":["order","kolej","sort","kolejność","kolejnosc","poz"],
-    "col":["col","kol","kolumna","column"],
-    "enabled":["enabled","visible","widoczne","on","aktywny","active"]
-  },
-  "meta": {
-    "lang":["lang","język","jezyk"],
-    "key":["key","slugkey","page","slug","strona","zakladka","route"],
-    "title":["title","meta_title","tytuł","tytul"],
-    "description":["description","meta_desc","opis","desc"],
-    "og_image":["og_image","og","image","obraz","grafika"]
-  },
-  "blocks": {
-    "lang":["lang","język","jezyk"],
-    "key":["key","slugkey","page","slug","strona","zakladka","route"],
-    "section":["section","sekcja","blok","area","part"],
-    "path":["path","ścieżka","sciezka"],
-    "html":["html","content_html"],
-    "title":["title","naglowek","header","h1","h2","h3"],
-    "body":["body","tekst","content","markdown","md","body_md","body_html"],
-    "cta_label":["cta_label","cta","button","przycisk","label"],
-    "cta_href":["cta_href","cta_link","button_link","href","link"]
-  },
-  "faq": {
-    "lang":["lang","język","jezyk"],
-    "q":["q","question","pytanie"],
-    "a":["a","answer","odp","odpowiedz","odpowiedź"],
-    "page_slug":["page_slug","slugkey","slug","page","strona"],
-    "order":["order","kolej","sort"],
-    "enabled":["enabled","visible","widoczne","on","active","aktywny"]
-  },
-  "props": {
-    "key":["key","prop","nazwa"],
-    "lang":["lang","język","jezyk"],
-    "value":["value","wartosc","wartość","val","content"]
-  },
-  "blog": {
-    "lang": ["lang", "język", "jezyk"],
-    "publish": ["publish", "enabled", "widoczne", "visible", "aktywny", "active"],
-    "slug": ["slug", "url", "path"],
-    "title": ["title", "tytuł", "tytul"],
-    "h1": ["h1", "header", "naglowek"],
-    "lead": ["lead", "intro", "opis", "description", "meta_desc"],
-    "body": ["body", "html", "content", "markdown", "md"],
-    "hero_image": ["hero_image", "image", "img"],
-    "published_at": ["published_at", "date", "published", "data"],
-    "tags": ["tags", "tagi"],
-    "categories": ["categories", "kategorie"]
-  },
-  "routes": {
-    "slugkey": ["slugkey", "slug_key", "key", "route", "slug"],
-  },
-  "strings": {
-    "key": ["key", "nazwa"],
-  },
-  "media": {
-    "src": ["src", "path", "url"],
-    "alt": ["alt", "opis", "description"],
-    "title": ["title", "tytuł", "tytul"],
-  },
-  "company": {
-    "name": ["name", "nazwa"],
-    "street_address": ["street_address", "address", "street", "adres"],
-    "postal_code": ["postal_code", "post_code", "zip", "kod"],
-    "city": ["city", "miasto"],
-    "telephone": ["telephone", "phone", "tel"],
-    "email": ["email", "mail"],
-    "same_as": ["same_as", "social", "socials", "links"],
-  },
-  "redirects": {
-    "from": ["from", "src", "source"],
-    "to": ["to", "dst", "dest", "target"],
-  }
-}
-
-LOCALES = {"pl", "en", "de", "fr", "it", "ru", "ua"}
 
 def _lower(s:str) -> str: return (s or "").strip().lower()
 
@@ -138,17 +48,6 @@ def _norm_slug(lang: str, raw: str) -> str:
         s = s[len(f"/{lang}/"):]
     s = "/".join([p.strip() for p in s.split("/") if p.strip()])
     return s + ("" if s.endswith("/") or s == "" else "/")
-def _map_headers(headers: List[str], syn: Dict[str,List[str]]) -> Dict[str,int]:
-    hl=[_lower(h) for h in headers]; out={}
-    for want, aliases in syn.items():
-        for a in aliases:
-            if _lower(a) in hl: out[want]=hl.index(_lower(a)); break
-    return out
-
-def _read_xlsx(path: Path):
-    import openpyxl
-    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    return {ws.title: ws for ws in wb.worksheets}
 
 def _log_path(path: Path) -> Path:
     """Ensure ``path`` is :class:`Path` and log it."""
@@ -156,25 +55,227 @@ def _log_path(path: Path) -> Path:
     print(f"[cms_ingest] loading {p}")
     return p
 
-def _rows(ws):
-    it = ws.iter_rows(values_only=True)
-    headers = [str(x or "").strip() for x in next(it)]
-    for row in it:
-        yield headers, [("" if v is None else str(v).strip()) for v in row]
+# ------------------------------ SNAPSHOT -----------------------------------
+# Sparsowany workbook (surowe wiersze arkuszy + wynik normalize) zapisany jako
+# gzip JSON pod kluczem sha256 pliku. Wszystkie narzędzia (build, guard,
+# snapshot, diag_compare, menu_builder) czytają arkusze przez load_sheets(),
+# więc jeden przebieg CI parsuje XLSX co najwyżej raz.
+# Unieważnienie: zmiana bajtów workbooka (inny klucz), zmiana kodu tego modułu
+# (normalize liczone ponownie z surowych wierszy), ``cms_ingest.py clear``
+# albo CMS_SNAPSHOT=0 (pomija cache całkowicie).
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEEP = 4
+DEFAULT_XLSX = Path("data/cms/menu.xlsx")
+
+
+def snapshot_dir() -> Path:
+    return Path(os.getenv("CMS_SNAPSHOT_DIR") or "data/cms/.cache")
+
+
+def _snapshot_enabled() -> bool:
+    return _lower(os.getenv("CMS_SNAPSHOT", "1")) not in {"0", "false", "no", "off"}
+
+
+def workbook_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_CODE_DIGEST: Optional[str] = None
+
+
+def _code_digest() -> str:
+    global _CODE_DIGEST
+    if _CODE_DIGEST is None:
+        h = hashlib.sha256()
+        for mod in (__file__, cms_schema.__file__):  # normalize zależy od obu modułów
+            h.update(Path(mod).read_bytes())
+        _CODE_DIGEST = h.hexdigest()[:16]
+    return _CODE_DIGEST
+
+
+def snapshot_path(sha: str) -> Path:
+    return snapshot_dir() / f"{sha}.json.gz"
+
+
+def _enc(v: Any) -> Any:
+    # JSON nie zna dat; openpyxl (data_only) zwraca je dla komórek z datą
+    if isinstance(v, datetime):
+        return {"$dt": v.isoformat()}
+    if isinstance(v, date):
+        return {"$d": v.isoformat()}
+    if isinstance(v, time):
+        return {"$t": v.isoformat()}
+    return v
+
+
+def _dec(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "$dt" in v:
+            return datetime.fromisoformat(v["$dt"])
+        if "$d" in v:
+            return date.fromisoformat(v["$d"])
+        if "$t" in v:
+            return time.fromisoformat(v["$t"])
+    return v
+
+
+def _open_workbook(path: Path):
+    import openpyxl
+
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def _tee(rows: Iterable[tuple], keep: List[List[Any]]) -> Iterator[tuple]:
+    for row in rows:
+        keep.append([_enc(v) for v in row])
+        yield row
+
+
+def _stream_workbook(wb, keep: List[Dict[str, Any]]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    """Arkusze jako (tytuł, strumień wierszy z iter_rows); każdy wiersz po drodze trafia
+    (zakodowany) do ``keep`` — snapshot potrzebuje surowych wierszy, ale bez osobnej listy krotek."""
+    try:
+        for ws in wb.worksheets:
+            rows: List[List[Any]] = []
+            keep.append({"title": ws.title, "rows": rows})
+            it = _tee(ws.iter_rows(values_only=True), rows)
+            yield ws.title, it
+            for _ in it:  # arkusz bez ekstraktora: wiersze i tak idą do snapshotu
+                pass
+    finally:
+        wb.close()
+
+
+def _read_snapshot(sha: str) -> Optional[Dict[str, Any]]:
+    if not _snapshot_enabled():
+        return None
+    p = snapshot_path(sha)
+    try:
+        with gzip.open(p, "rt", encoding="utf-8") as f:
+            snap = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snap.get("version") != SNAPSHOT_VERSION or snap.get("sha256") != sha:
+        return None
+    return snap
+
+
+def _snapshot_sheets(snap: Dict[str, Any]) -> List[Tuple[str, List[tuple]]]:
+    return [
+        (sh["title"], [tuple(_dec(v) for v in row) for row in sh["rows"]])
+        for sh in snap["sheets"]
+    ]
+
+
+def _decoded(sheets: List[Dict[str, Any]]) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    for sh in sheets:
+        yield sh["title"], (tuple(_dec(v) for v in row) for row in sh["rows"])
+
+
+def _write_snapshot(sha: str, src: Path, sheets: List[Dict[str, Any]],
+                    normalized: Optional[Dict[str, Any]]) -> None:
+    """``sheets`` = [{"title", "rows"}] z wierszami już zakodowanymi przez _enc."""
+    if not _snapshot_enabled():
+        return
+    d = snapshot_dir()
+    try:
+        d.mkdir(parents=True, exist_ok=True)
+        snap = {
+            "version": SNAPSHOT_VERSION,
+            "sha256": sha,
+            "source": str(src),
+            "code": _code_digest(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "sheets": sheets,
+            # pages_by_key/page_routes to aliasy — odtwarzane przez _relink
+            "normalized": None if normalized is None else {
+                k: v for k, v in normalized.items() if k not in ("pages_by_key", "page_routes")
+            },
+        }
+        tmp = snapshot_path(sha).with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False, separators=(",", ":"))
+        tmp.replace(snapshot_path(sha))
+        old = sorted(d.glob("*.json.gz"), key=lambda q: q.stat().st_mtime, reverse=True)
+        for q in old[SNAPSHOT_KEEP:]:
+            q.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"[cms_ingest] warn: snapshot not written: {e}")
+
+
+def _relink(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Przywraca współdzielone obiekty zgubione przy serializacji JSON."""
+    data["page_routes"] = data["routes"]
+    pages_by_key: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for r in data.get("pages_rows", []):
+        pages_by_key.setdefault(r["key"], {})[r["lang"]] = r
+    data["pages_by_key"] = pages_by_key
+    return data
+
 
-def _find_sheet(sheets, group):
-    best = None; best_score=-1
-    for name, ws in sheets.items():
+def load_sheets(path: Path) -> List[Tuple[str, List[tuple]]]:
+    """Arkusze workbooka jako [(tytuł, [wiersz, ...])], wiersze jak ``iter_rows(values_only=True)``.
+
+    Korzysta ze snapshotu, gdy pasuje sha256 pliku; inaczej parsuje XLSX
+    i zapisuje snapshot (normalize liczone leniwie przez ``load_all``).
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(path)
+    sha = workbook_sha256(path)
+    snap = _read_snapshot(sha)
+    if snap is not None:
+        return _snapshot_sheets(snap)
+    encoded: List[Dict[str, Any]] = []
+    sheets = [(title, list(rows)) for title, rows in _stream_workbook(_open_workbook(path), encoded)]
+    _write_snapshot(sha, path, encoded, None)
+    return sheets
+
+
+def _load_normalized(src: Path, report: List[str]) -> Dict[str, Any]:
+    sha = workbook_sha256(src)
+    snap = _read_snapshot(sha)
+    if snap is not None and snap.get("normalized") and snap.get("code") == _code_digest():
+        report.append(f"[cms_ingest] snapshot: {snapshot_path(sha)}")
+        data = _relink(snap["normalized"])
+        data["report"] = "\n".join(report + [data.get("report", "")])
+        return data
+    if snap is not None:
+        encoded = snap["sheets"]
+        data = normalize(_decoded(encoded))
+    else:
         try:
-            it = ws.iter_rows(values_only=True)
-            headers = [str(x or "").strip() for x in next(it)]
-            m = _map_headers(headers, SYN[group])
-            score = len(m)
-            if score > best_score:
-                best = name; best_score = score
-        except Exception: 
-            pass
-    return best if best_score >= 3 else None
+            wb = _open_workbook(src)
+        except Exception as e:
+            report.append(f"[cms_ingest] warn: {e}")
+            return _empty_result("\n".join(report))
+        # wiersze płyną z iter_rows prosto do ekstraktorów normalize (jeden przebieg)
+        encoded = []
+        data = normalize(_stream_workbook(wb, encoded))
+    _write_snapshot(sha, src, encoded, data)
+    data = dict(data)
+    data["report"] = "\n".join(report + [data["report"]])
+    return data
+
+
+def invalidate(path: Optional[Path] = None) -> int:
+    """Usuwa snapshot danego workbooka (albo wszystkie); zwraca liczbę plików."""
+    d = snapshot_dir()
+    if path is not None:
+        targets = [snapshot_path(workbook_sha256(Path(path)))] if Path(path).exists() else []
+    else:
+        targets = list(d.glob("*.json.gz")) + list(d.glob("*.tmp"))
+    n = 0
+    for p in targets:
+        if p.exists():
+            p.unlink()
+            n += 1
+    return n
+
 
 def load_all(cms_root: Path, explicit_src: Optional[Path] = None) -> Dict[str, Any]:
     """Wczytuje wszystkie arkusze XLSX i klasyfikuje je podobnie jak ``cms_guard``.
@@ -215,67 +316,40 @@ def load_all(cms_root: Path, explicit_src: Optional[Path] = None) -> Dict[str, A
             except Exception as e:
                 report.append(f"[cms_ingest] warn: fetch failed: {e}")
     if not src:
-        return {
-            "pages_rows": [],
-            "page_routes": {},
-            "routes": {},
-            "menu_rows": [],
-            "page_meta": {},
-            "blocks": {},
-            "blog_rows": [],
-            "strings": [],
-            "media": [],
-            "company": [],
-            "redirects": [],
-            "collections": {},
-            "report": "[cms] no source",
-        }
+        return _empty_result("[cms] no source")
 
     report.append(f"[cms_ingest] source: {src}")
 
-    import openpyxl
-
-    try:
-        wb = openpyxl.load_workbook(src, read_only=True, data_only=True)
-    except Exception as e:
-        report.append(f"[cms_ingest] warn: {e}")
-        return {
-            "pages_rows": [],
-            "page_routes": {},
-            "routes": {},
-            "menu_rows": [],
-            "page_meta": {},
-            "blocks": {},
-            "blog_rows": [],
-            "strings": [],
-            "media": [],
-            "company": [],
-            "redirects": [],
-            "collections": {},
-            "report": "\n".join(report),
-        }
+    return _load_normalized(Path(src), report)
 
-    def _norm(s):
-        return (str(s or "")).strip().lower()
 
-    def _row_empty(row):
-        return row is None or all((c is None or str(c).strip() == "") for c in row)
+def _empty_result(report: str) -> Dict[str, Any]:
+    return {
+        "pages_rows": [],
+        "page_routes": {},
+        "routes": {},
+        "menu_rows": [],
+        "page_meta": {},
+        "blocks": {},
+        "blog_rows": [],
+        "strings": [],
+        "media": [],
+        "company": [],
+        "redirects": [],
+        "collections": {},
+        "report": report,
+    }
 
-    def _idx(headers_lc, name):
-        try:
-            return headers_lc.index(name)
-        except ValueError:
-            return -1
 
-    def _cell(row, headers_lc, name):
-        i = _idx(headers_lc, name)
-        if i < 0:
-            return ""
-        v = row[i] if i < len(row) else ""
-        return "" if v is None else str(v).strip()
+def normalize(sheets: Iterable[Tuple[str, Iterable[tuple]]]) -> Dict[str, Any]:
+    """Klasyfikuje arkusze (tytuł, wiersze) i buduje wynik ``load_all``.
 
-    def truthy(v: str) -> bool:
-        return _norm(v) in {"1", "true", "tak", "yes", "on", "prawda"}
+    Każdy arkusz czytany jest jednym przebiegiem: ``cms_schema.Sheet`` ustala
+    klasy z nagłówka, a dla każdej pasującej klasy powstaje ekstraktor ze
+    stałym wektorem kolumn; wiersz (surowy ``r`` i tekstowy ``t``, liczony raz)
+    trafia kolejno do wszystkich ekstraktorów.
+    """
+    report: List[str] = []
 
     # akumulatory
     menu_rows: List[Dict[str, Any]] = []
@@ -290,355 +364,268 @@ def load_all(cms_root: Path, explicit_src: Optional[Path] = None) -> Dict[str, A
     company_rows: List[Dict[str, Any]] = []
     redirect_rows: List[Dict[str, Any]] = []
 
-    for ws in wb.worksheets:
-        rows = list(ws.iter_rows(values_only=True))
-        if not rows:
-            continue
-        hdr = [str(x or "").strip() for x in rows[0]]
-        hdr_lc = [_norm(h) for h in hdr]
-        report.append(f"[sheet] {ws.title}: {hdr}")
-
-        m_pages = _map_headers(hdr, SYN.get("pages", {}))
-        m_menu = _map_headers(hdr, SYN["menu"])
-        m_meta = _map_headers(hdr, SYN["meta"])
-        m_blocks = _map_headers(hdr, SYN["blocks"])
-        m_blog = _map_headers(hdr, SYN.get("blog", {}))
-        m_routes_sheet = _map_headers(hdr, SYN.get("routes", {}))
-        m_strings = _map_headers(hdr, SYN.get("strings", {}))
-        m_media = _map_headers(hdr, SYN.get("media", {}))
-        m_company = _map_headers(hdr, SYN.get("company", {}))
-        m_redirects = _map_headers(hdr, SYN.get("redirects", {}))
-
-        data_rows = rows[1:]
-
-        is_pages = (
-            "lang" in m_pages
-            and "publish" in m_pages
-            and "template" in m_pages
-            and ("slug" in m_pages or "key" in m_pages)
-        )
-        is_menu = all(k in m_menu for k in ("lang", "label", "href", "enabled"))
-        is_meta = all(k in m_meta for k in ("lang", "key"))
-        is_blocks = ("lang" in m_blocks) and ("html" in m_blocks or "body" in m_blocks)
-        is_blog = ("lang" in m_blog) and ("slug" in m_blog or "title" in m_blog)
-        is_routes_sheet = "slugkey" in m_routes_sheet
-        is_strings = "key" in m_strings and any(h in LOCALES for h in hdr_lc)
-        is_media = bool(m_media)
-        is_company = bool(m_company)
-        is_redirects = all(k in m_redirects for k in ("from", "to"))
-        klass = (
-            "pages"
-            if is_pages
-            else "menu"
-            if is_menu
-            else "meta"
-            if is_meta
-            else "blocks"
-            if is_blocks
-            else "blog"
-            if is_blog
-            else "routes"
-            if is_routes_sheet
-            else "strings"
-            if is_strings
-            else "media"
-            if is_media
-            else "company"
-            if is_company
-            else "redirects"
-            if is_redirects
-            else "collection"
-        )
-
-        if is_pages:
-            report.append(f"[detect] pages-like: {ws.title}")
-            for row in data_rows:
-                try:
-                    if _row_empty(row):
-                        continue
-                    L = _norm(_cell(row, hdr_lc, "lang") or "pl")
-                    pub = _norm(_cell(row, hdr_lc, "publish") or "true") in {"1","true","tak","yes","on","prawda"}
-                    if not pub:
-                        continue
-                    raw_slug = _cell(row, hdr_lc, "slug")
-                    key = _norm(_cell(row, hdr_lc, "slugkey") or "")
-                    tpl = _cell(row, hdr_lc, "template") or "page.html"
-                    parent = _cell(row, hdr_lc, "parentslug") or _cell(row, hdr_lc, "parent") or ""
-                    order_v = _cell(row, hdr_lc, "order") or "999"
-
-                    orig_L = L
-                    slug_lang, rel = split_slug(raw_slug)
-                    if slug_lang and slug_lang != orig_L:
-                        report.append(
-                            f"[warn] slug/lang mismatch: slug={raw_slug!r} col={orig_L} -> {slug_lang}"
-                        )
-                    L = slug_lang or orig_L
-                    if slug_lang:
-                        rel = rel
-                    else:
-                        rel = (raw_slug or "").strip("/")
-                    canon_slug = f"/{L}/{rel}/"
-                    chk_L, chk_rel = split_slug(canon_slug)
-                    if chk_L != L or chk_rel != rel:
-                        report.append(
-                            f"[warn] bad slug {raw_slug!r} -> {canon_slug!r}"
-                        )
-                    if raw_slug and raw_slug != canon_slug:
-                        report.append(
-                            f"[warn] slug normalized: {raw_slug!r} -> {canon_slug!r}"
-                        )
-                    if not key:
-                        key = (rel or "home") if rel else "home"
-                    if rel == "home":
-                        rel = ""
-                    if not rel and key != "home":
-                        rel = key
-
-                    parent_key = (parent or "").strip()
-                    if parent_key.startswith(f"/{L}/"):
-                        parent_key = parent_key[len(f"/{L}/"):]
-                    parent_key = parent_key.strip("/")
-
-                    meta = {
-                        "h1": _cell(row, hdr_lc, "h1"),
-                        "title": _cell(row, hdr_lc, "title"),
-                        "seo_title": _cell(row, hdr_lc, "seo_title"),
-                        "meta_desc": _cell(row, hdr_lc, "meta_desc"),
-                        "hero_alt": _cell(row, hdr_lc, "hero_alt"),
-                        "hero_image": _cell(row, hdr_lc, "hero_image"),
-                        "og_image": _cell(row, hdr_lc, "og_image"),
-                        "canonical": _cell(row, hdr_lc, "canonical"),
-                        "cta_label": _cell(row, hdr_lc, "cta_label"),
-                        "cta_href": _cell(row, hdr_lc, "cta_href"),
-                        "cta_phone": _cell(row, hdr_lc, "cta_phone"),
-                        "whatsapp": _cell(row, hdr_lc, "whatsapp"),
-                    }
-                    meta_clean = {k: v for k, v in meta.items() if v}
-                    for fld in ("h1", "title", "seo_title", "meta_desc"):
-                        if not meta_clean.get(fld):
-                            report.append(
-                                f"[warn] missing {fld} for {L}/{key}"
-                            )
-
-                    pages_rows.append(
-                        {
-                            "lang": L,
-                            "key": key,
-                            "slug": rel,
-                            "parent_key": parent_key,
-                            "template": tpl,
-                            "order": int(float(order_v or "999")),
-                            "meta": meta_clean,
-                        }
-                    )
-                    routes.setdefault(key, {})[L] = rel
-                    pm = page_meta.setdefault(L, {}).setdefault(key, {})
-                    pm.update(meta_clean)
-                except IndexError:
-                    continue
-
-        if is_menu:
-            report.append(f"[detect] menu-like: {ws.title}")
-            for row in data_rows:
-                try:
-                    if _row_empty(row):
-                        continue
-                    L = _norm(_cell(row, hdr_lc, "lang") or "pl")
-                    if not _norm(_cell(row, hdr_lc, "enabled") or "true") in {"1","true","tak","yes","on","prawda"}:
-                        continue
-                    label = _cell(row, hdr_lc, "label")
-                    href = _cell(row, hdr_lc, "href")
-                    if not label or not href:
-                        continue
-                    parent = _cell(row, hdr_lc, "parent") or ""
-                    order_v = _cell(row, hdr_lc, "order") or "999"
-                    col_v = _cell(row, hdr_lc, "col") or "1"
-                    menu_rows.append(
-                        {
-                            "lang": L,
-                            "label": label,
-                            "href": href,
-                            "parent": parent,
-                            "order": int(float(order_v or "999")),
-                            "col": int(float(col_v or "1")),
-                            "enabled": True,
-                        }
-                    )
-                except IndexError:
-                    continue
-
-        if is_meta:
-            report.append(f"[detect] meta-like: {ws.title}")
-            for row in data_rows:
-                try:
-                    if _row_empty(row):
-                        continue
-                    L = _norm(_cell(row, hdr_lc, "lang") or "pl")
-                    key = _norm(_cell(row, hdr_lc, "key") or "")
-                    if not key:
-                        continue
-                    pm = page_meta.setdefault(L, {}).setdefault(key, {})
-                    for fld in ("title", "seo_title", "description", "og_image", "canonical"):
-                        val = _cell(row, hdr_lc, fld)
-                        if val:
-                            pm[fld] = val
-                    known = {"lang", "key", "title", "seo_title", "description", "og_image", "canonical"}
-                    for h in hdr_lc:
-                        if h in known:
-                            continue
-                        val = _cell(row, hdr_lc, h)
-                        if val:
-                            pm[h] = val
-                except IndexError:
-                    continue
-
-        if is_blocks:
-            report.append(f"[detect] blocks-like: {ws.title}")
-            for row in data_rows:
-                try:
-                    if _row_empty(row):
-                        continue
-                    L = _norm(_cell(row, hdr_lc, "lang") or "pl")
-                    path = _cell(row, hdr_lc, "path")
-                    if not path:
-                        key = _norm(_cell(row, hdr_lc, "key") or "")
-                        section = _norm(_cell(row, hdr_lc, "section") or "")
-                        if key and section:
-                            path = f"pages/{key}/{section}"
-                    if not path:
-                        continue
-                    b = blocks.setdefault(L, {}).setdefault(path.lstrip("/"), {})
-                    html_val = _cell(row, hdr_lc, "html")
-                    if html_val:
-                        b["html"] = html_val
-                    body_val = _cell(row, hdr_lc, "body")
-                    if body_val and "html" not in b:
-                        b["body"] = body_val
-                    for fld in ("title", "cta_label", "cta_href"):
-                        val = _cell(row, hdr_lc, fld)
-                        if val:
-                            b[fld] = val
-                except IndexError:
-                    continue
-
-        if is_blog:
-            report.append(f"[detect] blog-like: {ws.title}")
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                rec: Dict[str, Any] = {}
-                for idx, col_name in enumerate(hdr_lc):
-                    v = row[idx] if idx < len(row) else ""
-                    rec[col_name] = "" if v is None else str(v).strip()
-                raw_slug = rec.get("slug") or ""
-                L_blog = _norm(rec.get("lang") or "pl")
-                slug_lang, rel = split_slug(raw_slug)
-                if slug_lang and slug_lang != L_blog:
-                    report.append(
-                        f"[warn] blog slug/lang mismatch: slug={raw_slug!r} col={L_blog} -> {slug_lang}"
-                    )
-                canon_rel = rel if slug_lang else raw_slug.strip("/")
-                canon_slug = f"/{L_blog}/{canon_rel}/"
-                chk_L, chk_rel = split_slug(canon_slug)
-                if chk_L != L_blog or chk_rel != canon_rel:
-                    report.append(
-                        f"[warn] bad blog slug {raw_slug!r} -> {canon_slug!r}"
-                    )
-                if raw_slug and raw_slug != canon_slug:
+    PAGE_META = ("h1", "title", "seo_title", "meta_desc", "hero_alt", "hero_image", "og_image",
+                 "canonical", "cta_label", "cta_href", "cta_phone", "whatsapp")
+
+    def pages_extractor(sh: Sheet):
+        cols = sh.columns("lang", "type", "publish", "slug", "slugkey", "template", "parentslug", "parent", "order",
+                          *PAGE_META)
+
+        def run(r, t):
+            lang, typ, publish, raw_slug, key, tpl, parentslug, parent, order_v, *meta_vals = cols.get(t)
+            L = (lang or "pl").lower()
+            if (publish or "true").lower() not in TRUE_VALUES:
+                return
+            key = key.lower()
+            tpl = tpl or "page.html"
+            parent = parentslug or parent or ""
+            order_v = order_v or "999"
+
+            orig_L = L
+            slug_lang, rel = split_slug(raw_slug)
+            if slug_lang and slug_lang != orig_L:
+                report.append(
+                    f"[warn] slug/lang mismatch: slug={raw_slug!r} col={orig_L} -> {slug_lang}"
+                )
+            L = slug_lang or orig_L
+            if not slug_lang:
+                rel = (raw_slug or "").strip("/")
+            canon_slug = f"/{L}/{rel}/"
+            chk_L, chk_rel = split_slug(canon_slug)
+            if chk_L != L or chk_rel != rel:
+                report.append(
+                    f"[warn] bad slug {raw_slug!r} -> {canon_slug!r}"
+                )
+            if raw_slug and raw_slug != canon_slug:
+                report.append(
+                    f"[warn] slug normalized: {raw_slug!r} -> {canon_slug!r}"
+                )
+            if not key:
+                key = (rel or "home") if rel else "home"
+            if rel == "home":
+                rel = ""
+            if not rel and key != "home":
+                rel = key
+
+            parent_key = (parent or "").strip()
+            if parent_key.startswith(f"/{L}/"):
+                parent_key = parent_key[len(f"/{L}/"):]
+            parent_key = parent_key.strip("/")
+
+            meta_clean = {k: v for k, v in zip(PAGE_META, meta_vals) if v}
+            for fld in ("h1", "title", "seo_title", "meta_desc"):
+                if not meta_clean.get(fld):
                     report.append(
-                        f"[warn] blog slug normalized: {raw_slug!r} -> {canon_slug!r}"
+                        f"[warn] missing {fld} for {L}/{key}"
                     )
-                blog_rows.append(rec)
-
-        if is_routes_sheet:
-            report.append(f"[detect] routes-like: {ws.title}")
-            langs = [h for h in hdr_lc if h in LOCALES]
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                slug_key = _cell(row, hdr_lc, "slugkey")
-                if not slug_key:
-                    continue
-                for L in langs:
-                    idx = hdr_lc.index(L)
-                    v = row[idx] if idx < len(row) else ""
-                    if v:
-                        routes.setdefault(slug_key, {})[L] = str(v).strip().lstrip("/").rstrip("/")
-
-        if is_strings:
-            report.append(f"[detect] strings-like: {ws.title}")
-            langs = [h for h in hdr_lc if h in LOCALES]
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                key = _cell(row, hdr_lc, "key")
-                if not key:
-                    continue
-                rec = {"key": key}
-                for L in langs:
-                    idx = hdr_lc.index(L)
-                    v = row[idx] if idx < len(row) else ""
-                    if v:
-                        rec[L] = str(v).strip()
-                strings_rows.append(rec)
-
-        if is_media:
-            report.append(f"[detect] media-like: {ws.title}")
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                rec = {}
-                for idx, col_name in enumerate(hdr):
-                    v = row[idx] if idx < len(row) else ""
-                    rec[str(col_name).strip()] = "" if v is None else str(v).strip()
-                media_rows.append(rec)
-
-        if is_company:
-            report.append(f"[detect] company-like: {ws.title}")
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                rec = {}
-                for idx, col_name in enumerate(hdr):
-                    v = row[idx] if idx < len(row) else ""
-                    rec[str(col_name).strip()] = "" if v is None else str(v).strip()
-                company_rows.append(rec)
-
-        if is_redirects:
-            report.append(f"[detect] redirects-like: {ws.title}")
-            for row in data_rows:
-                if _row_empty(row):
-                    continue
-                src = _cell(row, hdr_lc, "from")
-                dst = _cell(row, hdr_lc, "to")
-                if src and dst:
-                    redirect_rows.append({"from": src, "to": dst})
-
-        if klass == "collection":
-            it2 = ws.iter_rows(values_only=True)
-            next(it2, None)
-            for row in it2:
-                if _row_empty(row):
-                    continue
-                vals = list(row or [])
-                rec: Dict[str, str] = {}
-                for idx, col_name in enumerate(hdr):
-                    v = vals[idx] if idx < len(vals) else ""
-                    rec[str(col_name).strip()] = "" if v is None else str(v).strip()
-
-                lang = _norm(rec.get("lang") or "pl")
-                collections.setdefault(ws.title, {}).setdefault(lang, []).append(rec)
-                slug_lang, rel = split_slug(rec.get("slug") or "")
-                if not slug_lang:
-                    slug_lang = lang
-                    rel = (rec.get("slug") or "").strip("/")
-                key = _norm(rec.get("slugKey") or rec.get("slug") or "")
-                if rel == "home":
-                    rel = ""
-                if not rel and key:
-                    rel = key
-                if key:
-                    routes.setdefault(key, {})[slug_lang] = rel
+
+            pages_rows.append(
+                {
+                    "lang": L,
+                    "key": key,
+                    "type": (typ or "page").lower(),
+                    "slug": rel,
+                    "parent_key": parent_key,
+                    "template": tpl,
+                    "order": int(float(order_v or "999")),
+                    "meta": meta_clean,
+                }
+            )
+            routes.setdefault(key, {})[L] = rel
+            pm = page_meta.setdefault(L, {}).setdefault(key, {})
+            pm.update(meta_clean)
+
+        return run
+
+    def menu_extractor(sh: Sheet):
+        cols = sh.columns("lang", "enabled", "label", "href", "parent", "order", "col")
+
+        def run(r, t):
+            lang, enabled, label, href, parent, order_v, col_v = cols.get(t)
+            if (enabled or "true").lower() not in TRUE_VALUES:
+                return
+            if not label or not href:
+                return
+            menu_rows.append(
+                {
+                    "lang": (lang or "pl").lower(),
+                    "label": label,
+                    "href": href,
+                    "parent": parent or "",
+                    "order": int(float(order_v or "999")),
+                    "col": int(float(col_v or "1")),
+                    "enabled": True,
+                }
+            )
+
+        return run
+
+    def meta_extractor(sh: Sheet):
+        known = ("lang", "key", "title", "seo_title", "description", "og_image", "canonical")
+        cols = sh.columns(*known)
+        extra = [h for h in sh.lc if h not in known]
+        extra_cols = sh.columns(*extra) if extra else None
+
+        def run(r, t):
+            lang, key, *vals = cols.get(t)
+            key = key.lower()
+            if not key:
+                return
+            pm = page_meta.setdefault((lang or "pl").lower(), {}).setdefault(key, {})
+            for fld, val in zip(known[2:], vals):
+                if val:
+                    pm[fld] = val
+            if extra_cols:
+                for h, val in zip(extra, extra_cols.get(t)):
+                    if val:
+                        pm[h] = val
+
+        return run
+
+    def blocks_extractor(sh: Sheet):
+        cols = sh.columns("lang", "path", "key", "section", "html", "body", "title", "cta_label", "cta_href")
+
+        def run(r, t):
+            lang, path, key, section, html_val, body_val, *rest = cols.get(t)
+            if not path:
+                key, section = key.lower(), section.lower()
+                if key and section:
+                    path = f"pages/{key}/{section}"
+            if not path:
+                return
+            b = blocks.setdefault((lang or "pl").lower(), {}).setdefault(path.lstrip("/"), {})
+            if html_val:
+                b["html"] = html_val
+            if body_val and "html" not in b:
+                b["body"] = body_val
+            for fld, val in zip(("title", "cta_label", "cta_href"), rest):
+                if val:
+                    b[fld] = val
+
+        return run
+
+    def blog_extractor(sh: Sheet):
+        def run(r, t):
+            rec: Dict[str, Any] = dict(zip(sh.lc, t))
+            raw_slug = rec.get("slug") or ""
+            L_blog = (rec.get("lang") or "pl").lower()
+            slug_lang, rel = split_slug(raw_slug)
+            if slug_lang and slug_lang != L_blog:
+                report.append(
+                    f"[warn] blog slug/lang mismatch: slug={raw_slug!r} col={L_blog} -> {slug_lang}"
+                )
+            canon_rel = rel if slug_lang else raw_slug.strip("/")
+            canon_slug = f"/{L_blog}/{canon_rel}/"
+            chk_L, chk_rel = split_slug(canon_slug)
+            if chk_L != L_blog or chk_rel != canon_rel:
+                report.append(
+                    f"[warn] bad blog slug {raw_slug!r} -> {canon_slug!r}"
+                )
+            if raw_slug and raw_slug != canon_slug:
+                report.append(
+                    f"[warn] blog slug normalized: {raw_slug!r} -> {canon_slug!r}"
+                )
+            blog_rows.append(rec)
+
+        return run
+
+    def routes_extractor(sh: Sheet):
+        langs = [h for h in sh.lc if h in LOCALES]
+        key_col = sh.columns("slugkey")
+        lang_cols = sh.columns(*langs) if langs else None
+
+        def run(r, t):
+            (slug_key,) = key_col.get(t)
+            if not slug_key or not lang_cols:
+                return
+            for L, v in zip(langs, lang_cols.get(r)):
+                if v:
+                    routes.setdefault(slug_key, {})[L] = str(v).strip().lstrip("/").rstrip("/")
+
+        return run
+
+    def strings_extractor(sh: Sheet):
+        langs = [h for h in sh.lc if h in LOCALES]
+        key_col = sh.columns("key")
+        lang_cols = sh.columns(*langs)
+
+        def run(r, t):
+            (key,) = key_col.get(t)
+            if not key:
+                return
+            rec = {"key": key}
+            for L, v in zip(langs, lang_cols.get(r)):
+                if v:
+                    rec[L] = str(v).strip()
+            strings_rows.append(rec)
+
+        return run
+
+    def record_extractor(sh: Sheet, out: List[Dict[str, Any]]):
+        def run(r, t):
+            out.append(dict(zip(sh.headers, t)))
+
+        return run
+
+    def redirects_extractor(sh: Sheet):
+        cols = sh.columns("from", "to")
+
+        def run(r, t):
+            src, dst = cols.get(t)
+            if src and dst:
+                redirect_rows.append({"from": src, "to": dst})
+
+        return run
+
+    def collection_extractor(sh: Sheet):
+        def run(r, t):
+            rec: Dict[str, str] = dict(zip(sh.headers, t))
+            lang = (rec.get("lang") or "pl").lower()
+            collections.setdefault(sh.title, {}).setdefault(lang, []).append(rec)
+            slug_lang, rel = split_slug(rec.get("slug") or "")
+            if not slug_lang:
+                slug_lang = lang
+                rel = (rec.get("slug") or "").strip("/")
+            key = (rec.get("slugKey") or rec.get("slug") or "").strip().lower()
+            if rel == "home":
+                rel = ""
+            if not rel and key:
+                rel = key
+            if key:
+                routes.setdefault(key, {})[slug_lang] = rel
+
+        return run
+
+    EXTRACTORS = {
+        "pages": pages_extractor,
+        "menu": menu_extractor,
+        "meta": meta_extractor,
+        "blocks": blocks_extractor,
+        "blog": blog_extractor,
+        "routes": routes_extractor,
+        "strings": strings_extractor,
+        "media": lambda sh: record_extractor(sh, media_rows),
+        "company": lambda sh: record_extractor(sh, company_rows),
+        "redirects": redirects_extractor,
+    }
+
+    for sh, data_rows in cms_schema.sheets(sheets):
+        report.append(f"[sheet] {sh.title}: {sh.headers}")
+        runs = []
+        for klass in sh.classes:
+            report.append(f"[detect] {klass}-like: {sh.title}")
+            runs.append(EXTRACTORS[klass](sh))
+        if sh.klass == "collection":
+            runs.append(collection_extractor(sh))
+        if not runs:
+            continue
+        for row in data_rows:
+            if row_empty(row):
+                continue
+            r = sh.pad(row)
+            t = sh.text(r)
+            for run in runs:
+                run(r, t)
 
     report.append(f"[rows] pages_rows={len(pages_rows)}, menu_rows={len(menu_rows)}")
     report.append(
@@ -671,3 +658,56 @@ def load_all(cms_root: Path, explicit_src: Optional[Path] = None) -> Dict[str, A
         "report": "\n".join(report),
     }
 
+
+# ---------------------------------- CLI ------------------------------------
+def _info(path: Path) -> int:
+    if not path.exists():
+        print(f"[cms_ingest] brak workbooka: {path}")
+        return 1
+    sha = workbook_sha256(path)
+    snap_p = snapshot_path(sha)
+    snap = _read_snapshot(sha)
+    print(f"workbook: {path} ({path.stat().st_size} B)")
+    print(f"sha256:   {sha}")
+    if snap is None:
+        print(f"snapshot: brak ({snap_p})")
+        return 0
+    fresh = bool(snap.get("normalized")) and snap.get("code") == _code_digest()
+    print(f"snapshot: {snap_p} ({snap_p.stat().st_size} B, {snap.get('created')})")
+    print(f"state:    {'fresh' if fresh else 'raw-only (normalize do przeliczenia)'}")
+    for sh in snap["sheets"]:
+        print(f"  {sh['title']}: {max(len(sh['rows']) - 1, 0)} rows")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Snapshot sparsowanego CMS (data/cms/.cache)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_ in (("warm", "sparsuj workbook i zapisz snapshot"),
+                        ("info", "pokaż stan snapshotu dla workbooka")):
+        sp = sub.add_parser(name, help=help_)
+        sp.add_argument("xlsx", nargs="?", type=Path, default=DEFAULT_XLSX)
+    sp = sub.add_parser("clear", help="usuń snapshot(y)")
+    sp.add_argument("xlsx", nargs="?", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "warm":
+        if not args.xlsx.exists():
+            print(f"[cms_ingest] brak workbooka: {args.xlsx}")
+            return 1
+        invalidate(args.xlsx)
+        data = load_all(args.xlsx.parent, explicit_src=args.xlsx)
+        print(f"[cms_ingest] snapshot: {snapshot_path(workbook_sha256(args.xlsx))} "
+              f"pages_rows={len(data.get('pages_rows', []))} menu_rows={len(data.get('menu_rows', []))}")
+        return 0
+    if args.cmd == "info":
+        return _info(args.xlsx)
+    n = invalidate(args.xlsx)
+    print(f"[cms_ingest] removed {n} snapshot(s) from {snapshot_dir()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+# tools/cms_schema.py
+"""
+Skompilowany schemat arkuszy CMS — wspólny dla cms_ingest, cms_guard i cms_snapshot.
+
+Tabele aliasów ``SYN`` kompilowane są raz do indeksu alias → [(klasa, pole)].
+Dla arkusza wystarcza jeden przebieg po nagłówku, żeby wiedzieć, które pola
+każdej klasy są obecne (klasyfikacja). Wiersze czyta się przez stałe wektory
+indeksów (``Columns``) zamiast szukać kolumny po nazwie przy każdej komórce,
+więc koszt ekstrakcji jest liniowy względem liczby wierszy.
+"""
+from __future__ import annotations
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+SYN = {
+  # kolumny dla arkuszy z definicjami stron
+  "pages": {
+    "lang": ["lang", "język", "jezyk"],
+    "publish": ["publish", "enabled", "widoczne", "visible", "aktywny", "active"],
+    "slug": ["slug", "url", "path"],
+    "key": ["slugkey", "slug_key", "key", "page", "route"],
+    "parent": ["parent", "parent_key", "parentslug", "parent_slug", "parentkey"],
+    "template": ["template", "tpl", "szablon"],
+    "order": ["order", "kolej", "sort", "kolejność", "kolejnosc", "poz"],
+    "title": ["title", "meta_title", "tytuł", "tytul"],
+    "seo_title": ["seo_title", "title", "meta_title"],
+    "description": ["description", "meta_desc", "opis", "desc"],
+    "og_image": ["og_image", "og", "image", "obraz", "grafika"],
+    "canonical": ["canonical", "kanoniczny", "canonical_url"],
+  },
+  # menu nawigacyjne
+  "menu": {
+    "lang":["lang","język","jezyk"],
+    "label":["label","nazwa","etykieta","tekst"],
+    "href":["href","url","link"],
+    "parent":["parent","rodzic","grupa"],
+    "order":["order","kolej","sort","kolejność","kolejnosc","poz"],
+    "col":["col","kol","kolumna","column"],
+    "enabled":["enabled","visible","widoczne","on","aktywny","active"]
+  },
+  "meta": {
+    "lang":["lang","język","jezyk"],
+    "key":["key","slugkey","page","slug","strona","zakladka","route"],
+    "title":["title","meta_title","tytuł","tytul"],
+    "description":["description","meta_desc","opis","desc"],
+    "og_image":["og_image","og","image","obraz","grafika"]
+  },
+  "blocks": {
+    "lang":["lang","język","jezyk"],
+    "key":["key","slugkey","page","slug","strona","zakladka","route"],
+    "section":["section","sekcja","blok","area","part"],
+    "path":["path","ścieżka","sciezka"],
+    "html":["html","content_html"],
+    "title":["title","naglowek","header","h1","h2","h3"],
+    "body":["body","tekst","content","markdown","md","body_md","body_html"],
+    "cta_label":["cta_label","cta","button","przycisk","label"],
+    "cta_href":["cta_href","cta_link","button_link","href","link"]
+  },
+  "faq": {
+    "lang":["lang","język","jezyk"],
+    "q":["q","question","pytanie"],
+    "a":["a","answer","odp","odpowiedz","odpowiedź"],
+    "page_slug":["page_slug","slugkey","slug","page","strona"],
+    "order":["order","kolej","sort"],
+    "enabled":["enabled","visible","widoczne","on","active","aktywny"]
+  },
+  "props": {
+    "key":["key","prop","nazwa"],
+    "lang":["lang","język","jezyk"],
+    "value":["value","wartosc","wartość","val","content"]
+  },
+  "blog": {
+    "lang": ["lang", "język", "jezyk"],
+    "publish": ["publish", "enabled", "widoczne", "visible", "aktywny", "active"],
+    "slug": ["slug", "url", "path"],
+    "title": ["title", "tytuł", "tytul"],
+    "h1": ["h1", "header", "naglowek"],
+    "lead": ["lead", "intro", "opis", "description", "meta_desc"],
+    "body": ["body", "html", "content", "markdown", "md"],
+    "hero_image": ["hero_image", "image", "img"],
+    "published_at": ["published_at", "date", "published", "data"],
+    "tags": ["tags", "tagi"],
+    "categories": ["categories", "kategorie"]
+  },
+  "routes": {
+    "slugkey": ["slugkey", "slug_key", "key", "route", "slug"],
+  },
+  "strings": {
+    "key": ["key", "nazwa"],
+  },
+  "media": {
+    "src": ["src", "path", "url"],
+    "alt": ["alt", "opis", "description"],
+    "title": ["title", "tytuł", "tytul"],
+  },
+  "company": {
+    "name": ["name", "nazwa"],
+    "street_address": ["street_address", "address", "street", "adres"],
+    "postal_code": ["postal_code", "post_code", "zip", "kod"],
+    "city": ["city", "miasto"],
+    "telephone": ["telephone", "phone", "tel"],
+    "email": ["email", "mail"],
+    "same_as": ["same_as", "social", "socials", "links"],
+  },
+  "redirects": {
+    "from": ["from", "src", "source"],
+    "to": ["to", "dst", "dest", "target"],
+  }
+}
+
+LOCALES = {"pl", "en", "de", "fr", "it", "ru", "ua"}
+TRUE_VALUES = {"1", "true", "tak", "yes", "on", "prawda"}
+
+
+def _lower(s: Any) -> str:
+    return (str(s or "")).strip().lower()
+
+
+def cell_str(v: Any) -> str:
+    """Wartość komórki jako tekst (None → "")."""
+    return "" if v is None else str(v).strip()
+
+
+def row_empty(row: Optional[Sequence[Any]]) -> bool:
+    return row is None or all((c is None or str(c).strip() == "") for c in row)
+
+
+# alias (lower) → [(klasa, pole)]; kompilowane raz przy imporcie
+_ALIASES: Dict[str, List[Tuple[str, str]]] = {}
+for _klass, _fields in SYN.items():
+    for _field, _aliases in _fields.items():
+        for _a in dict.fromkeys(_lower(a) for a in _aliases):
+            _ALIASES.setdefault(_a, []).append((_klass, _field))
+
+
+def _has(f: Dict[str, Set[str]], klass: str, *fields: str) -> bool:
+    got = f.get(klass, ())
+    return all(x in got for x in fields)
+
+
+# Reguły klasyfikacji (kolejność = priorytet ``Sheet.klass``); arkusz może
+# spełniać kilka reguł naraz — ingest przetwarza go wtedy dla każdej z nich.
+RULES: Tuple[Tuple[str, Callable[[Dict[str, Set[str]], List[str]], bool]], ...] = (
+    ("pages", lambda f, lc: _has(f, "pages", "lang", "publish", "template")
+                            and (_has(f, "pages", "slug") or _has(f, "pages", "key"))),
+    ("menu", lambda f, lc: _has(f, "menu", "lang", "label", "href", "enabled")),
+    ("meta", lambda f, lc: _has(f, "meta", "lang", "key")),
+    ("blocks", lambda f, lc: _has(f, "blocks", "lang") and (_has(f, "blocks", "html") or _has(f, "blocks", "body"))),
+    ("blog", lambda f, lc: _has(f, "blog", "lang") and (_has(f, "blog", "slug") or _has(f, "blog", "title"))),
+    ("routes", lambda f, lc: _has(f, "routes", "slugkey")),
+    ("strings", lambda f, lc: _has(f, "strings", "key") and any(h in LOCALES for h in lc)),
+    ("media", lambda f, lc: bool(f.get("media"))),
+    ("company", lambda f, lc: bool(f.get("company"))),
+    ("redirects", lambda f, lc: _has(f, "redirects", "from", "to")),
+)
+CLASSES = tuple(name for name, _ in RULES) + ("collection",)
+
+
+class Columns:
+    """Stały wektor indeksów dla listy nazw kolumn (pierwsze wystąpienie w nagłówku).
+
+    Brakująca kolumna wskazuje na komórkę-strażnika dopisywaną przez
+    ``Sheet.pad``, więc odczyt to jedno ``itemgetter`` na wiersz (surowy
+    albo po ``Sheet.text``).
+    """
+
+    __slots__ = ("names", "get")
+
+    def __init__(self, index: Dict[str, int], names: Sequence[str], missing: int):
+        self.names = tuple(names)
+        vec = tuple(index.get(n, missing) for n in self.names)
+        get = itemgetter(*vec)
+        self.get: Callable[[Sequence[Any]], Tuple[Any, ...]] = (
+            get if len(vec) > 1 else (lambda r, _g=get: (_g(r),))
+        )
+
+
+class Sheet:
+    """Nagłówek arkusza po jednym przebiegu: nazwy, indeksy, obecne pola i klasy."""
+
+    __slots__ = ("title", "headers", "lc", "index", "width", "fields", "classes", "klass")
+
+    def __init__(self, title: str, header_row: Iterable[Any]):
+        self.title = title
+        self.headers = [str(x or "").strip() for x in header_row]
+        self.lc = [h.lower() for h in self.headers]
+        self.width = len(self.lc)
+        self.index: Dict[str, int] = {}
+        self.fields: Dict[str, Set[str]] = {}
+        for i, h in enumerate(self.lc):
+            self.index.setdefault(h, i)
+            for klass, field in _ALIASES.get(h, ()):
+                self.fields.setdefault(klass, set()).add(field)
+        self.classes = tuple(name for name, rule in RULES if rule(self.fields, self.lc))
+        self.klass = self.classes[0] if self.classes else "collection"
+
+    def is_(self, klass: str) -> bool:
+        return klass in self.classes
+
+    def has(self, klass: str, *fields: str) -> bool:
+        return _has(self.fields, klass, *fields)
+
+    def col(self, name: str) -> Optional[int]:
+        """Indeks kolumny o dokładnej nazwie (lower) albo None."""
+        return self.index.get(name)
+
+    def field_col(self, klass: str, field: str) -> Optional[int]:
+        """Indeks kolumny pola wg aliasów ``SYN`` (pierwszy pasujący alias)."""
+        for a in SYN.get(klass, {}).get(field, ()):
+            i = self.index.get(_lower(a))
+            if i is not None:
+                return i
+        return None
+
+    def columns(self, *names: str) -> Columns:
+        return Columns(self.index, names, self.width)
+
+    def pad(self, row: Sequence[Any]) -> Tuple[Any, ...]:
+        """Wiersz przycięty/dopełniony do szerokości nagłówka + komórka-strażnik."""
+        r = tuple(row[: self.width])
+        if len(r) < self.width:
+            r += (None,) * (self.width - len(r))
+        return r + (None,)
+
+    @staticmethod
+    def text(padded: Sequence[Any]) -> Tuple[str, ...]:
+        """Wiersz po ``pad`` jako teksty (jak ``cell_str``) — liczony raz na wiersz."""
+        return tuple(["" if v is None else str(v).strip() for v in padded])
+
+
+def sheets(workbook: Iterable[Tuple[str, Iterable[Sequence[Any]]]]) -> Iterable[Tuple[Sheet, Iterable[Sequence[Any]]]]:
+    """(Sheet, wiersze danych) dla każdego niepustego arkusza; wiersze mogą być strumieniem (iter_rows)."""
+    for title, rows in workbook:
+        it = iter(rows)
+        header = next(it, None)
+        if header is None:
+            continue
+        yield Sheet(title, header), it
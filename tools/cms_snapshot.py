@@ -6,9 +6,9 @@ import sys
 from collections import Counter
 from typing import Any, Dict, List, Optional
 
-from openpyxl import load_workbook
+import cms_ingest
+import cms_schema
 
-LANG_HEADERS = {"lang", "język", "jezyk"}
 TRUE_VALUES = {"true", "1", "yes", "tak", "on"}
 
 def _truthy(value: Any) -> bool:
@@ -28,35 +28,26 @@ def main(path: Optional[str] = None) -> None:
         print("Usage: python tools/cms_snapshot.py <xlsx_path>", file=sys.stderr)
         sys.exit(1)
 
-    wb = load_workbook(path, read_only=True, data_only=True)
+    workbook = cms_ingest.load_sheets(path)
 
     sheets: List[Dict[str, Any]] = []
     rows_per_lang: Counter[str] = Counter()
     published_per_lang: Counter[str] = Counter()
 
-    for ws in wb.worksheets:
-        headers = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-        sheets.append({"name": ws.title, "headers": headers})
-        print(f"{ws.title}: {headers}")
+    for title, rows in workbook:
+        headers = list(rows[0]) if rows else []
+        sheets.append({"name": title, "headers": headers})
+        print(f"{title}: {headers}")
 
-        header_map = {
-            (str(h).casefold() if isinstance(h, str) else None): idx
-            for idx, h in enumerate(headers)
-        }
-
-        # locate language and publish columns
-        lang_idx = None
-        for alias in LANG_HEADERS:
-            idx = header_map.get(alias.casefold())
-            if idx is not None:
-                lang_idx = idx
-                break
-        publish_idx = header_map.get("publish")
+        # kolumny wg wspólnego schematu (aliasy języka z cms_schema.SYN)
+        sh = cms_schema.Sheet(title, headers)
+        lang_idx = sh.field_col("pages", "lang")
+        publish_idx = sh.col("publish")
 
         if lang_idx is None:
             continue
 
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in rows[1:]:
             if lang_idx >= len(row):
                 continue
             lang_val = row[lang_idx]
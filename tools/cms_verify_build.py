@@ -17,7 +17,7 @@ def main():
             if out.suffix == ".html":
                 required.append(out)
     else:
-        # Fallback: tylko type in {page,home} publish=TRUE
+        # Fallback: tylko type in {page,home,service} publish=TRUE
         site = yaml.safe_load((Path("data")/"site.yml").read_text("utf-8"))
         dlang = site.get("default_lang", "pl")
         cms   = cms_ingest.load_all(Path("data")/"cms")
@@ -27,7 +27,7 @@ def main():
         for r in rows:
             typ = (r.get("type") or "page").strip().lower()
             pub = truthy((r.get("meta") or {}).get("publish", "true"))
-            if not pub or typ not in {"page", "home"}:
+            if not pub or typ not in {"page", "home", "service"}:
                 continue
             L   = r.get("lang") or dlang
             rel = r.get("slug") or ""
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifest wdrożenia dist/_manifest.json dla tools/build.py.
+- Każdy plik dist/ (poza _reports/ i samym manifestem) → sha256 i rozmiar.
+  sha256 pliku o niezmienionym rozmiarze i mtime bierzemy z cache
+  (.build-cache/deploy-hashes.json) — OutputSink nie rusza niezmienionych plików,
+  więc w buildzie przyrostowym haszowane są tylko pliki faktycznie zapisane.
+- Historia lastmod stron ({ścieżka: [skrót treści, lastmod]}) jedzie w tym samym
+  manifeście: przeżywa --force i brak .build-cache/, a w CI wraca razem z nim.
+- diff(): ścieżki dodane / zmienione / usunięte względem manifestu poprzedniego
+  builda, a z nich adresy URL stron — zapisywane do dist/_reports/changed-urls.json
+  dla tools/indexnow.py. Stroną jest tylko plik z kanonicznym adresem z builda
+  (strony indeksowane, jak w sitemapie); mapa ścieżka → adres zostaje w manifeście
+  ("urls"), żeby usunięte strony dało się zgłosić w następnym buildzie.
+Brak poprzedniego manifestu = build bazowy ("baseline": true): wszystko jest
+„dodane”, ale wysyłka IndexNow domyślnie go pomija. dist/ nie jest w repo, więc
+w CI manifest ostatniego wdrożenia jest przed buildem pobierany z żywej strony
+(/_manifest.json, krok w .github/workflows/pages.yml).
+"""
+from __future__ import annotations
+import hashlib, json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_NAME = "_manifest.json"
+CHANGES = Path("_reports") / "changed-urls.json"
+HASH_CACHE = Path(".build-cache") / "deploy-hashes.json"
+EXCLUDE = ("_reports/", MANIFEST_NAME)
+VERSION = 1
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def scan(root: Path, cache_path: Optional[Path] = HASH_CACHE, exclude: Iterable[str] = EXCLUDE) -> Dict[str, Dict[str, Any]]:
+    """{ścieżka względna: {"sha256", "size"}} dla plików pod ``root``, posortowane."""
+    root = Path(root)
+    exclude = tuple(exclude)
+    cache = _load(cache_path) if cache_path else {}
+    new_cache: Dict[str, List[Any]] = {}
+    files: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        rel = path.relative_to(root).as_posix()
+        if rel.startswith(exclude) or path.name.endswith(".tmp"):
+            continue
+        st = path.stat()
+        hit = cache.get(rel)
+        sha = hit[2] if isinstance(hit, list) and hit[:2] == [st.st_size, st.st_mtime_ns] else _sha256(path)
+        new_cache[rel] = [st.st_size, st.st_mtime_ns, sha]
+        files[rel] = {"sha256": sha, "size": st.st_size}
+    if cache_path:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(cache_path).write_text(json.dumps(new_cache, separators=(",", ":")), "utf-8")
+    return files
+
+def diff(prev: Dict[str, Dict[str, Any]], cur: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    return {
+        "added": sorted(set(cur) - set(prev)),
+        "changed": sorted(p for p in cur if p in prev and prev[p].get("sha256") != cur[p]["sha256"]),
+        "removed": sorted(set(prev) - set(cur)),
+    }
+
+def changed_urls(paths: Dict[str, List[str]], urls: Dict[str, str],
+                 prev_urls: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+    """Ścieżki z diff() → adresy stron: dodane/zmienione tylko z ``urls`` (kanoniczne adresy stron
+    indeksowanych w tym buildzie), usunięte z ``prev_urls`` (strony poprzedniego manifestu).
+    404.html, pliki weryfikacyjne, stuby przekierowań i strony noindex nie są stronami."""
+    prev_urls = prev_urls or {}
+    out: Dict[str, List[str]] = {}
+    for kind, rels in paths.items():
+        found = (prev_urls.get(rel) if kind == "removed" else urls.get(rel) for rel in rels)
+        out[kind] = [u for u in found if u]
+    return out
+
+def load_lastmod(root: Path) -> Optional[Dict[str, List[str]]]:
+    """Historia lastmod z poprzedniego _manifest.json; None, gdy jej nie ma (wtedy lastmod nieznany)."""
+    hist = _load(Path(root) / MANIFEST_NAME).get("lastmod")
+    return hist if isinstance(hist, dict) else None
+
+def update(root: Path, urls: Optional[Dict[str, str]] = None,
+           cache_path: Optional[Path] = HASH_CACHE,
+           lastmod: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """Skanuje ``root``, porównuje z poprzednim _manifest.json, zapisuje manifest i changed-urls.json."""
+    root = Path(root)
+    prev = _load(root / MANIFEST_NAME)
+    prev_files, prev_urls = prev.get("files"), prev.get("urls")
+    baseline = not isinstance(prev_files, dict)  # brak, uszkodzony albo nie-JSON (np. strona 404 z CDN)
+    files = scan(root, cache_path)
+    paths = diff({} if baseline else prev_files, files)
+    changes = {
+        "version": VERSION,
+        "baseline": baseline,
+        "files": {k: len(v) for k, v in paths.items()},
+        "paths": paths,
+        "urls": changed_urls(paths, urls or {}, prev_urls if isinstance(prev_urls, dict) else {}),
+    }
+    data: Dict[str, Any] = {"version": VERSION, "files": files, "urls": dict(sorted((urls or {}).items()))}
+    if lastmod is not None:
+        data["lastmod"] = dict(sorted(lastmod.items()))
+    _write_if_changed(root / MANIFEST_NAME, json.dumps(data, ensure_ascii=False, indent=1))
+    _write_if_changed(root / CHANGES, json.dumps(changes, ensure_ascii=False, indent=1))
+    return changes
+
+def _write_if_changed(path: Path, text: str) -> None:
+    if path.exists() and path.read_text("utf-8") == text:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, "utf-8")
@@ -1,18 +1,16 @@
 from pathlib import Path
 from bs4 import BeautifulSoup
 from build import DIST, _truthy as truthy
-import openpyxl
+import cms_ingest
 
 
 def load_sheet(name: str):
     path = Path('data/cms/menu.xlsx')
-    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    return wb[name]
+    return dict(cms_ingest.load_sheets(path))[name]
 
 
 def main() -> None:
-    ws = load_sheet('Pages')
-    rows = list(ws.iter_rows(values_only=True))
+    rows = load_sheet('Pages')
     header = [str(h or '').strip().lower() for h in rows[0]]
     idx = {h: i for i, h in enumerate(header)}
 
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache fragmentów szablonów (header/footer/nav) dla tools/build.py.
+
+Szablon włącza go jawnie:
+  {{ cached_include("_partials/footer.html") }}     zamiast {% include %}
+  {{ fragment_hole("_partials/lang_links.html") }}  część zależna od strony
+
+cached_include renderuje partial raz na klucz (partial, fragment_key), gdzie
+fragment_key podaje builder (język, wersja bundla menu, hash konfiguracji).
+Kolejne strony dostają gotowy HTML, a w miejsca fragment_hole wstawiany jest
+render „dziury” z kontekstem bieżącej strony (np. przełącznik języka zależny
+od slugKey). Bez fragment_key w kontekście albo przy BUILD_FRAGMENT_CACHE=0
+oba konstrukty działają jak zwykły include.
+"""
+from __future__ import annotations
+import os, re
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jinja2 import pass_context
+from markupsafe import Markup
+
+FRAGMENT_ENV = "BUILD_FRAGMENT_CACHE"
+_RECORDING = "_fragment_recording"
+_HOLE = "\x00fragment-hole:{}\x00"
+_HOLE_RE = re.compile("\x00fragment-hole:([^\x00]+)\x00")
+
+def enabled() -> bool:
+    return os.getenv(FRAGMENT_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+class FragmentCache:
+    """Fragmenty jednego procesu: (partial, klucz) -> [tekst, dziura, tekst, ...]."""
+
+    def __init__(self, timer: Optional[Callable[[str], Any]] = None):
+        self.store: Dict[Tuple[str, str], List[str]] = {}
+        self.timer = timer
+
+    def _time(self, name: str):
+        return self.timer(name) if self.timer else nullcontext()
+
+    def render(self, ctx, name: str) -> Markup:
+        key = ctx.get("fragment_key")
+        env = ctx.environment
+        if not key or not enabled() or ctx.get(_RECORDING):
+            return Markup(env.get_template(name).render(ctx.get_all()))
+        parts = self.store.get((name, key))
+        if parts is None:
+            with self._time("render/fragment_record"):
+                html = env.get_template(name).render({**ctx.get_all(), _RECORDING: True})
+                # split z grupą: parzyste indeksy to tekst, nieparzyste — nazwy dziur
+                parts = self.store[(name, key)] = _HOLE_RE.split(html)
+        with self._time("render/fragment_splice"):
+            if len(parts) == 1:
+                return Markup(parts[0])
+            vars_ = ctx.get_all()
+            out = []
+            for i, part in enumerate(parts):
+                out.append(env.get_template(part).render(vars_) if i % 2 else part)
+            return Markup("".join(out))
+
+    def hole(self, ctx, name: str) -> Markup:
+        if ctx.get(_RECORDING):
+            return Markup(_HOLE.format(name))
+        return Markup(ctx.environment.get_template(name).render(ctx.get_all()))
+
+def install(env, timer: Optional[Callable[[str], Any]] = None) -> FragmentCache:
+    """Rejestruje cached_include/fragment_hole w środowisku (cache żyje razem z nim)."""
+    cache = FragmentCache(timer)
+    env.globals["cached_include"] = pass_context(lambda ctx, name: cache.render(ctx, name))
+    env.globals["fragment_hole"] = pass_context(lambda ctx, name: cache.hole(ctx, name))
+    env.globals["_fragment_cache"] = cache
+    return cache
+
+REFERENCE_RE = re.compile(r"""\b(?:cached_include|fragment_hole)\(\s*["']([^"']+)["']""")
+
+def referenced_templates(source: str) -> List[str]:
+    """Partiale wołane przez cached_include/fragment_hole (dla analizy zależności)."""
+    return REFERENCE_RE.findall(source)
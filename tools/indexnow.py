@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wysyłka zmienionych adresów do IndexNow (indexing.bing.indexnow z pages.yml).
+- Wejście: dist/_reports/changed-urls.json z builda (deploy_manifest): adresy
+  dodane, zmienione i usunięte (usunięte też — wyszukiwarka sprawdzi 404).
+- Adresy idą paczkami po batch_size (maks. 10000 wg protokołu) jako POST JSON
+  {host, key, keyLocation, urlList}; między paczkami co najmniej
+  min_interval_seconds. 200/202 to sukces; 429/5xx albo błąd sieci (status 0)
+  przerywa wysyłkę; niewysłane adresy zostają w stanie i idą przy następnej.
+- ui_button.rate_limit_minutes: kolejna wysyłka nie wcześniej niż po tylu
+  minutach od poprzedniej udanej (stan w .build-cache/indexnow.json).
+Build bazowy (bez poprzedniego manifestu) jest pomijany, chyba że --all.
+Endpoint da się podmienić (--endpoint), np. na lokalny serwer w testach.
+"""
+from __future__ import annotations
+import argparse, json, sys, time, urllib.error, urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+CHANGES = Path("dist") / "_reports" / "changed-urls.json"
+STATE = Path(".build-cache") / "indexnow.json"
+MAX_BATCH = 10000
+DEFAULT_INTERVAL = 1.0
+
+def settings(cfg: Dict[str, Any], key: str = "") -> Dict[str, Any]:
+    """Ustawienia z indexing.bing.indexnow i indexing.ui_button (z kluczem z constants/ENV)."""
+    idx = (cfg.get("indexing", {}) or {})
+    inc = ((idx.get("bing", {}) or {}).get("indexnow", {}) or {})
+    ui = (idx.get("ui_button", {}) or {})
+    raw_key = str(inc.get("key") or "")
+    return {
+        "enabled": str(inc.get("enabled", False)).lower() in ("1", "true", "yes"),
+        "endpoint": inc.get("endpoint") or "https://api.indexnow.org/IndexNow",
+        "key": key or ("" if raw_key.startswith("${") else raw_key),
+        "batch_size": max(1, min(MAX_BATCH, int(inc.get("batch_size") or 1000))),
+        "min_interval_seconds": float(inc.get("min_interval_seconds", DEFAULT_INTERVAL)),
+        "rate_limit_minutes": float(ui.get("rate_limit_minutes") or 0),
+    }
+
+def collect(changes: Dict[str, Any], kinds: Sequence[str] = ("added", "changed", "removed")) -> List[str]:
+    urls: Dict[str, None] = {}
+    for kind in kinds:
+        for u in (changes.get("urls") or {}).get(kind, []):
+            urls.setdefault(u, None)
+    return list(urls)
+
+class Submitter:
+    """POST paczek adresów z odstępem między żądaniami; ``sleep``/``clock`` do podmiany w testach."""
+
+    def __init__(self, endpoint: str, key: str, site_url: str, batch_size: int = 1000,
+                 min_interval: float = DEFAULT_INTERVAL, timeout: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        self.endpoint = endpoint
+        self.key = key
+        self.site_url = site_url.rstrip("/")
+        self.host = urlsplit(self.site_url).hostname or ""
+        self.batch_size = max(1, min(MAX_BATCH, int(batch_size)))
+        self.min_interval = float(min_interval)
+        self.timeout = timeout
+        self._sleep = sleep
+        self._clock = clock
+        self._last: Optional[float] = None
+
+    def payload(self, urls: Sequence[str]) -> Dict[str, Any]:
+        return {"host": self.host, "key": self.key, "keyLocation": f"{self.site_url}/{self.key}.txt",
+                "urlList": list(urls)}
+
+    def _post(self, urls: Sequence[str]) -> int:
+        if self._last is not None:
+            wait = self.min_interval - (self._clock() - self._last)
+            if wait > 0:
+                self._sleep(wait)
+        body = json.dumps(self.payload(urls)).encode("utf-8")
+        req = urllib.request.Request(self.endpoint, data=body, method="POST",
+                                     headers={"Content-Type": "application/json; charset=utf-8"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0  # brak połączenia: jak błąd serwera, reszta zostaje
+        finally:
+            self._last = self._clock()
+        return status
+
+    def submit(self, urls: Sequence[str]) -> Dict[str, Any]:
+        """Wysyła adresy tego hosta; zwraca {"sent", "batches", "statuses", "remaining", "pending", …}."""
+        own = [u for u in urls if urlsplit(u).hostname == self.host]
+        sent = 0
+        statuses: List[int] = []
+        for i in range(0, len(own), self.batch_size):
+            batch = own[i:i + self.batch_size]
+            status = self._post(batch)
+            statuses.append(status)
+            if status not in (200, 202):
+                break
+            sent += len(batch)
+        return {"sent": sent, "batches": len(statuses), "statuses": statuses, "remaining": len(own) - sent,
+                "pending": own[sent:], "skipped_foreign": len(urls) - len(own)}
+
+# ------------------------------ CLI ------------------------------
+def _state(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text("utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="IndexNow: wysyłka adresów zmienionych w ostatnim buildzie")
+    ap.add_argument("--changes", type=Path, default=CHANGES, help="changed-urls.json z builda")
+    ap.add_argument("--endpoint", default=None, help="nadpisuje indexing.bing.indexnow.endpoint")
+    ap.add_argument("--all", action="store_true", help="wyślij także build bazowy (bez poprzedniego manifestu)")
+    ap.add_argument("--force", action="store_true", help="ignoruj ui_button.rate_limit_minutes")
+    ap.add_argument("--dry-run", action="store_true", help="tylko wypisz adresy")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import build
+    cfg = settings(build.CFG, build.INDEXNOW_KEY)
+    if not cfg["enabled"] or not cfg["key"] or cfg["key"].lower() == "change_me_indexnow_key":
+        print("[indexnow] wyłączone albo brak klucza — pomijam")
+        return 0
+    try:
+        changes = json.loads(args.changes.read_text("utf-8"))
+    except (OSError, ValueError):
+        print(f"[indexnow] brak {args.changes} — najpierw uruchom build")
+        return 1
+    if changes.get("baseline") and not args.all:
+        print("[indexnow] build bazowy (brak poprzedniego manifestu) — pomijam; --all wysyła wszystko")
+        return 0
+    state = _state(STATE)
+    urls = list(dict.fromkeys(list(state.get("pending") or []) + collect(changes)))
+    print(f"[indexnow] urls={len(urls)} (pending={len(state.get('pending') or [])})")
+    if args.dry_run or not urls:
+        print("\n".join(urls))
+        return 0
+    now = time.time()
+    if not args.force and now - float(state.get("last_submit") or 0) < cfg["rate_limit_minutes"] * 60:
+        print(f"[indexnow] ostatnia wysyłka < {cfg['rate_limit_minutes']:g} min temu — pomijam (--force)")
+        return 0
+    sub = Submitter(args.endpoint or cfg["endpoint"], cfg["key"], build.SITE_URL, cfg["batch_size"],
+                    cfg["min_interval_seconds"])
+    res = sub.submit(urls)
+    STATE.parent.mkdir(parents=True, exist_ok=True)
+    # nieudana wysyłka nie blokuje ponowienia; niewysłane adresy czekają na następny raz
+    state = {"last_submit": now if res["sent"] else state.get("last_submit", 0), "pending": res["pending"]}
+    STATE.write_text(json.dumps(state, ensure_ascii=False), "utf-8")
+    print(f"[indexnow] sent={res['sent']} batches={res['batches']} statuses={res['statuses']} remaining={res['remaining']}")
+    return 0 if not res["remaining"] else 2
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Automat Aho-Corasick fraz kluczowych (osobno dla każdego języka) dla tools/build.py.
+- Wzorce: słowa z sources.keywords_csv, keywords.dynamic_phrases rozwinięte po
+  miastach ({city}) oraz kotwice autolinków z CMS (z adresem docelowym).
+- Automat idzie po słowach, nie po znakach: tekst dzielony jest regexem \\w+
+  (te same granice słów dla łaciny i cyrylicy), słowo sprowadzane do postaci
+  porównawczej (NFC + casefold, ё→е, ß→ss) i zamieniane na id. Słowo spoza
+  słownika fraz od razu wraca automat do korzenia.
+- scan(text) zwraca wszystkie trafienia (id wzorca, początek, koniec) w jednym
+  liniowym przejściu; z nich liczone są pokrycie, gęstość i kandydaci autolinków.
+Indeks budowany jest raz na build i trafia do workerów renderu razem z danymi wspólnymi.
+"""
+from __future__ import annotations
+import hashlib, re, unicodedata
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_WORD_RE = re.compile(r"\w+", re.U)
+# języki z innym kodem w CSV/CMS niż w locales (ukraiński bywa jako "uk")
+LANG_ALIASES = {"uk": "ua"}
+
+@lru_cache(maxsize=1 << 16)
+def fold(word: str) -> str:
+    """Postać porównawcza słowa: wielkość liter, ё/е i zapis Unicode nie mają znaczenia."""
+    return unicodedata.normalize("NFC", word).casefold().replace("ё", "е")
+
+def words(text: str) -> List[str]:
+    return [fold(w) for w in _WORD_RE.findall(text or "")]
+
+# ------------------------------ AUTOMAT ------------------------------
+class Automaton:
+    """Trie słów z przejściami awaryjnymi; ``out[s]`` to wszystkie wzorce kończące się w stanie s."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.goto: List[Dict[int, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.own: List[int] = [-1]          # wzorzec kończący się dokładnie w stanie (-1: brak)
+        self.out: List[Tuple[int, ...]] = [()]
+        self.patterns: List[Dict[str, Any]] = []
+        self._by_key: Dict[Tuple[int, ...], int] = {}
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def add(self, phrase: str, source: str, **meta: Any) -> Optional[int]:
+        """Dodaje frazę (ta sama sekwencja słów = ten sam wzorzec, źródła się sumują)."""
+        ws = words(phrase)
+        if not ws:
+            return None
+        key = tuple(self.vocab.setdefault(w, len(self.vocab)) for w in ws)
+        pid = self._by_key.get(key)
+        if pid is None:
+            state = 0
+            for tid in key:
+                nxt = self.goto[state].get(tid)
+                if nxt is None:
+                    nxt = self.goto[state][tid] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.own.append(-1)
+                    self.out.append(())
+                state = nxt
+            pid = self._by_key[key] = len(self.patterns)
+            self.patterns.append({"phrase": phrase.strip(), "words": len(key), "sources": []})
+            self.own[state] = pid
+            self._built = False
+        rec = self.patterns[pid]
+        if source not in rec["sources"]:
+            rec["sources"].append(source)
+        for k, v in meta.items():
+            if v not in (None, ""):
+                rec.setdefault(k, v)
+        return pid
+
+    def lookup(self, phrase: str) -> Optional[int]:
+        key = []
+        for w in words(phrase):
+            tid = self.vocab.get(w)
+            if tid is None:
+                return None
+            key.append(tid)
+        return self._by_key.get(tuple(key))
+
+    def build(self) -> "Automaton":
+        """Przejścia awaryjne (BFS) i złączenie wyjść po łańcuchu fail."""
+        if self._built:
+            return self
+        queue = deque()
+        for nxt in self.goto[0].values():
+            self.fail[nxt] = 0
+            self.out[nxt] = (self.own[nxt],) if self.own[nxt] >= 0 else ()
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for tid, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and tid not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(tid, 0)
+                own = (self.own[nxt],) if self.own[nxt] >= 0 else ()
+                self.out[nxt] = own + self.out[self.fail[nxt]]
+                queue.append(nxt)
+        self._built = True
+        return self
+
+    def scan(self, text: str) -> List[Tuple[int, int, int]]:
+        """Trafienia (id wzorca, początek, koniec) w kolejności końca; nakładające się też."""
+        self.build()
+        vocab, goto, fail, out, patterns = self.vocab, self.goto, self.fail, self.out, self.patterns
+        state = 0
+        starts: List[int] = []
+        hits: List[Tuple[int, int, int]] = []
+        for m in _WORD_RE.finditer(text or ""):
+            starts.append(m.start())
+            tid = vocab.get(fold(m.group()))
+            if tid is None:
+                state = 0
+                continue
+            while state and tid not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tid, 0)
+            if out[state]:
+                i = len(starts)
+                for pid in out[state]:
+                    hits.append((pid, starts[i - patterns[pid]["words"]], m.end()))
+        return hits
+
+    def digest(self) -> str:
+        h = hashlib.sha256()
+        for p in self.patterns:
+            h.update(repr(sorted(p.items())).encode("utf-8"))
+        return h.hexdigest()
+
+# ------------------------------ INDEKS ------------------------------
+class KeywordIndex:
+    """Automaty per język + podsumowanie trafień strony (pokrycie, gęstość, autolinki)."""
+
+    def __init__(self):
+        self.langs: Dict[str, Automaton] = {}
+
+    def automaton(self, lang: str) -> Automaton:
+        lang = LANG_ALIASES.get(lang, lang)
+        a = self.langs.get(lang)
+        if a is None:
+            a = self.langs[lang] = Automaton()
+        return a
+
+    @classmethod
+    def from_sources(cls, kw_rows: Iterable[Dict[str, str]], dynamic: Dict[str, Sequence[str]],
+                     cities: Iterable[Tuple[str, str]], autolinks: Iterable[Dict[str, str]] = (),
+                     langs: Sequence[str] = ()) -> "KeywordIndex":
+        """``cities``: (język albo "" dla wszystkich, nazwa); ``autolinks``: {lang, anchor, href}."""
+        idx = cls()
+        for r in kw_rows:
+            L = (r.get("lang") or "").strip().lower()
+            if L and r.get("term"):
+                idx.automaton(L).add(r["term"], "csv", cluster=r.get("cluster"), intent=r.get("intent"))
+        by_lang: Dict[str, List[str]] = {}
+        shared: List[str] = []
+        for L, name in cities:
+            if name:
+                (by_lang.setdefault(LANG_ALIASES.get(L, L), []) if L else shared).append(name)
+        for L, templates in (dynamic or {}).items():
+            a = idx.automaton(L.lower())
+            names = shared + by_lang.get(LANG_ALIASES.get(L, L), [])
+            for tpl in templates or []:
+                if "{city}" not in tpl:
+                    a.add(tpl, "dynamic")
+                    continue
+                for name in names:
+                    a.add(tpl.replace("{city}", name), "dynamic", city=name)
+        for r in autolinks:
+            L = (r.get("lang") or "").strip().lower()
+            for lang in ([L] if L else list(langs)):
+                idx.automaton(lang).add(r["anchor"], "autolink", href=r.get("href"))
+        for a in idx.langs.values():
+            a.build()
+        return idx
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {L: {"patterns": len(a), "states": len(a.goto)} for L, a in sorted(self.langs.items())}
+
+    def digest(self) -> str:
+        return hashlib.sha256("".join(f"{L}:{a.digest()}" for L, a in sorted(self.langs.items())).encode()).hexdigest()
+
+    def analyze(self, lang: str, text: str) -> "PageKeywords":
+        a = self.langs.get(LANG_ALIASES.get(lang, lang))
+        return PageKeywords(a, a.scan(text) if a else [])
+
+class PageKeywords:
+    """Trafienia jednej strony: liczniki per wzorzec i kandydaci autolinków (bez nakładania się)."""
+    __slots__ = ("automaton", "hits", "counts")
+
+    def __init__(self, automaton: Optional[Automaton], hits: List[Tuple[int, int, int]]):
+        self.automaton = automaton
+        self.hits = hits
+        self.counts: Counter = Counter(pid for pid, _, _ in hits)
+
+    def count(self, phrase: str) -> Optional[int]:
+        """Liczba wystąpień frazy; None, gdy fraza nie jest wzorcem automatu."""
+        pid = self.automaton.lookup(phrase) if self.automaton else None
+        return None if pid is None else self.counts[pid]
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        pats = self.automaton.patterns if self.automaton else []
+        best = sorted(self.counts.items(), key=lambda kv: (-kv[1], pats[kv[0]]["phrase"]))[:top]
+        return {
+            "matched": len(self.counts),
+            "hits": len(self.hits),
+            "words": sum(pats[pid]["words"] for pid, _, _ in self.hits),
+            "top": [[pats[pid]["phrase"], n] for pid, n in best],
+        }
+
+    def autolink_candidates(self) -> List[Dict[str, Any]]:
+        """Kotwice autolinków w kolejności tekstu, bez nakładania (przy tym samym początku dłuższa)."""
+        if not self.automaton:
+            return []
+        pats = self.automaton.patterns
+        cand = sorted(((s, -(e - s), pid, e) for pid, s, e in self.hits if pats[pid].get("href")))
+        out: List[Dict[str, Any]] = []
+        end = -1
+        for s, _, pid, e in cand:
+            if s >= end:
+                out.append({"start": s, "end": e, "anchor": pats[pid]["phrase"], "href": pats[pid]["href"]})
+                end = e
+        return out
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Link-checker dist/ dla tools/build.py — bez ponownego czytania stron.
+- Wejście: analizy stron z renderu (page_analysis): linki <a href>, zasoby
+  (src, srcset, <link href>) i id kotwic. Ekstrakcja odbywa się w workerach
+  renderu przy jedynym skanie strony; tutaj zostają same sprawdzenia w pamięci.
+- Indeks wyjścia: zbiór ścieżek plików dist/ (strony, przekierowania, assets/).
+  Adres „…/” → „…/index.html”; adres bez ukośnika → plik albo katalog z index.html.
+  Adresy względne liczone od adresu strony; bezwzględne z SITE_URL są wewnętrzne;
+  inne hosty, mailto:, tel:, data: i javascript: są pomijane.
+- #fragment: id (albo <a name>) na stronie docelowej; „#” i „#top” zawsze działają.
+  Fragmenty na innych stronach sprawdza finish() w drugim przejściu, trzymając
+  w pamięci tylko id stron, do których takie linki prowadzą.
+- Przekierowania (CMS.redirects): link do źródła przekierowania idzie do celu
+  (do MAX_HOPS skoków); brak celu albo pętla = zepsuty link, działający trafia
+  do „redirected” (warto linkować wprost).
+- Raport: broken (strona, odnośnik, powód), redirected, orphans (strony bez
+  linków <a> z innych stron) i inbound (liczba stron linkujących do strony).
+"""
+from __future__ import annotations
+import os, posixpath
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+MAX_HOPS = 5
+REPORT_LIMIT = 1000
+_SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "sms:")
+_ALWAYS_FRAGMENTS = {"", "top"}
+
+def output_index(root: Path, exclude: Iterable[str] = ()) -> Set[str]:
+    """Ścieżki plików pod ``root`` (względne, posix) — jeden przebieg os.walk."""
+    root = Path(root)
+    out: Set[str] = set()
+    for dirpath, _, names in os.walk(root):
+        rel = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel == "." else rel + "/"
+        out.update(prefix + n for n in names if not n.endswith(".tmp"))
+    return out - set(exclude)
+
+def file_url(rel: str) -> str:
+    """Plik w dist/ → adres („pl/a/index.html” → „/pl/a/”)."""
+    return "/" + (rel[:-len("index.html")] if rel == "index.html" or rel.endswith("/index.html") else rel)
+
+def page_file(url: str) -> str:
+    """Adres strony → plik w dist/ („/pl/a/” → „pl/a/index.html”, „/404.html” → „404.html”)."""
+    return url.lstrip("/") + "index.html" if url.endswith("/") else url.lstrip("/")
+
+class LinkChecker:
+    """Sprawdza odnośniki stron względem indeksu plików; ``add_page`` dla każdej strony, potem ``finish``."""
+
+    def __init__(self, files: Iterable[str], site_url: str = "", redirects: Optional[Dict[str, str]] = None,
+                 max_hops: int = MAX_HOPS):
+        self.files = set(files)
+        self.site = (site_url or "").rstrip("/")
+        self.redirects = {self._slash(src): dst for src, dst in (redirects or {}).items()}
+        self.max_hops = max_hops
+        self.broken: List[Tuple[str, str, str]] = []
+        self.redirected: List[Tuple[str, str, str]] = []
+        self.checked = 0
+        self.pages: Dict[str, str] = {}                     # plik strony → adres
+        self.orphan_candidates: List[str] = []
+        self.inbound: Dict[str, Set[str]] = defaultdict(set)  # plik strony → pliki stron linkujących
+        self._fragments: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+        self._targets: Dict[str, Tuple[Optional[str], str, Optional[str]]] = {}
+
+    @staticmethod
+    def _slash(path: str) -> str:
+        path = "/" + path.lstrip("/")
+        return path if path.endswith("/") else path + "/"
+
+    def split(self, base: str, href: str) -> Optional[Tuple[str, str]]:
+        """(ścieżka, fragment) odnośnika wewnętrznego z adresu strony ``base``; None dla zewnętrznych."""
+        href = href.strip()
+        if not href or href.lower().startswith(_SKIP_SCHEMES):
+            return None
+        if self.site and (href == self.site or href.startswith(self.site + "/") or href.startswith(self.site + "#")):
+            href = href[len(self.site):] or "/"
+        parts = urlsplit(href)
+        if parts.scheme or parts.netloc:
+            return None
+        path = parts.path
+        if not path:
+            path = base
+        elif not path.startswith("/"):
+            path = urljoin(base, path)
+        path = unquote(path)
+        norm = posixpath.normpath(path)
+        if norm.startswith("//"):
+            norm = norm[1:]
+        if path.endswith("/") and norm != "/":
+            norm += "/"
+        return norm, parts.fragment
+
+    def _file_for(self, path: str) -> Optional[str]:
+        rel = path.lstrip("/")
+        if rel and not rel.endswith("/") and rel in self.files:
+            return rel
+        cand = (rel if not rel or rel.endswith("/") else rel + "/") + "index.html"
+        return cand if cand in self.files else None
+
+    def target(self, path: str) -> Tuple[Optional[str], str, Optional[str]]:
+        """(plik, powód błędu albo "", adres po przekierowaniach albo None) dla ścieżki wewnętrznej."""
+        hit = self._targets.get(path)
+        if hit is not None:
+            return hit
+        cur, final, seen = path, None, set()
+        while self._slash(cur) in self.redirects:
+            key = self._slash(cur)
+            if key in seen or len(seen) >= self.max_hops:
+                res: Tuple[Optional[str], str, Optional[str]] = (None, "redirect_loop", None)
+                break
+            seen.add(key)
+            dst = self.split(key, self.redirects[key])
+            final = self.redirects[key]
+            if dst is None:  # przekierowanie poza serwis
+                res = (None, "", final)
+                break
+            cur = dst[0]
+        else:
+            found = self._file_for(cur)
+            res = (found, "" if found else ("redirect_target_missing" if seen else "missing"), final)
+        self._targets[path] = res
+        return res
+
+    def add_page(self, url: str, links: Iterable[str], refs: Iterable[str] = (), ids: Iterable[str] = (),
+                 orphan_check: bool = True) -> None:
+        """Sprawdza odnośniki jednej strony; fragmenty na innych stronach odkłada do finish()."""
+        src = page_file(url)
+        self.pages[src] = url
+        if orphan_check:
+            self.orphan_candidates.append(src)
+        own_ids: Optional[Set[str]] = None
+        for kind, hrefs in (("a", links), ("ref", refs)):
+            for href in hrefs:
+                resolved = self.split(url, href)
+                if resolved is None:
+                    continue
+                self.checked += 1
+                path, fragment = resolved
+                found, reason, final = self.target(path)
+                if reason:
+                    self.broken.append((url, href, reason))
+                    continue
+                if final is not None:
+                    self.redirected.append((url, href, final))
+                if found is None:
+                    continue
+                if kind == "a" and found != src:
+                    self.inbound[found].add(src)
+                if kind == "a" and fragment not in _ALWAYS_FRAGMENTS and found.endswith(".html"):
+                    if found == src:
+                        own_ids = own_ids if own_ids is not None else set(ids)
+                        if fragment not in own_ids and unquote(fragment) not in own_ids:
+                            self.broken.append((url, href, "fragment"))
+                    else:
+                        self._fragments[found].append((url, href, fragment))
+
+    def finish(self, pages: Iterable[Tuple[str, Iterable[str]]] = ()) -> Dict[str, Any]:
+        """Drugie przejście (adres strony, id) dla odłożonych fragmentów; zwraca raport."""
+        for url, ids in pages:
+            wanted = self._fragments.pop(page_file(url), None)
+            if not wanted:
+                continue
+            known = set(ids)
+            for src, href, fragment in wanted:
+                if fragment not in known and unquote(fragment) not in known:
+                    self.broken.append((src, href, "fragment"))
+        # strony spoza analiz (np. 404.html, przekierowania) — fragmentu nie da się potwierdzić
+        self._fragments.clear()
+        inbound = {self.pages.get(f) or file_url(f): len(srcs) for f, srcs in sorted(self.inbound.items())}
+        orphans = [self.pages[f] for f in self.orphan_candidates if not self.inbound.get(f)]
+        reasons: Dict[str, int] = defaultdict(int)
+        for _, _, reason in self.broken:
+            reasons[reason] += 1
+        return {
+            "pages": len(self.pages), "checked": self.checked, "broken_count": len(self.broken),
+            "broken_by_reason": dict(sorted(reasons.items())), "redirected_count": len(self.redirected),
+            "orphans_count": len(orphans),
+            "broken": [{"page": p, "href": h, "reason": r} for p, h, r in self.broken[:REPORT_LIMIT]],
+            "redirected": [{"page": p, "href": h, "to": t} for p, h, t in self.redirected[:REPORT_LIMIT]],
+            "orphans": orphans, "inbound": inbound,
+        }
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Graf linków między stronami miasto × usługa dla tools/build.py.
+Indeksy budowane raz (jedno przejście po stronach):
+  (lang, województwo, usługa) -> strony tej usługi w regionie
+  (lang, miasto)              -> usługi dostępne w mieście
+Sąsiedzi strony to byRegion stron tej samej usługi z innych miast regionu
+i altServices innych usług w tym samym mieście (collections.city_service.
+linkGraph.neighbors). Wybór zaczyna się od pozycji strony w grupie i idzie
+dalej cyklicznie — jest deterministyczny, a linki przychodzące rozkładają się
+równo zamiast trafiać zawsze do pierwszych stron grupy.
+Raport: dist/_reports/link-graph.json.
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+GRAPH_VERSION = 1
+
+def _norm(s: Any) -> str:
+    return str(s or "").strip().lower()
+
+class LinkGraph:
+    """Węzły (lang, key) z indeksami regionu i miasta; sąsiedzi liczeni w O(k) na stronę."""
+
+    def __init__(self, by_region: int = 3, alt_services: int = 3):
+        self.by_region = max(0, int(by_region))
+        self.alt_services = max(0, int(alt_services))
+        # węzeł: (lang, key, url, title, city, region, service, poz. w regionie, poz. w mieście)
+        self.nodes: List[Tuple[Any, ...]] = []
+        self.ids: Dict[Tuple[str, str], int] = {}
+        self.region_index: Dict[Tuple[str, str, str], List[int]] = {}
+        self.city_index: Dict[Tuple[str, str], List[int]] = {}
+
+    @classmethod
+    def from_config(cls, cfg: Mapping[str, Any]) -> "LinkGraph":
+        """``cfg`` to collections.city_service z pages.yml."""
+        nb = ((cfg or {}).get("linkGraph") or {}).get("neighbors") or {}
+        return cls(nb.get("byRegion", 3), nb.get("altServices", 3))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(self, lang: str, key: str, url: str, title: str,
+            city: str, region: str, service: str) -> int:
+        """Dodaje stronę; ponowne dodanie tego samego (lang, key) jest ignorowane."""
+        node_id = self.ids.get((lang, key))
+        if node_id is not None:
+            return node_id
+        node_id = len(self.nodes)
+        city_n, region_n, service_n = _norm(city), _norm(region), _norm(service)
+        pos_region = -1
+        if region_n:  # strony bez województwa nie tworzą wspólnego regionu
+            group = self.region_index.setdefault((lang, region_n, service_n), [])
+            pos_region = len(group)
+            group.append(node_id)
+        group = self.city_index.setdefault((lang, city_n), [])
+        pos_city = len(group)
+        group.append(node_id)
+        self.nodes.append((lang, key, url, title, city_n, region_n, service_n, pos_region, pos_city))
+        self.ids[(lang, key)] = node_id
+        return node_id
+
+    def _pick(self, group: List[int], pos: int, k: int, skip) -> List[int]:
+        out: List[int] = []
+        n = len(group)
+        for i in range(1, n):
+            if len(out) >= k:
+                break
+            other = group[(pos + i) % n]
+            if not skip(self.nodes[other]):
+                out.append(other)
+        return out
+
+    def neighbor_ids(self, node_id: int) -> List[Tuple[int, str]]:
+        lang, _, _, _, city, region, service, pos_region, pos_city = self.nodes[node_id]
+        out: List[Tuple[int, str]] = []
+        if pos_region >= 0 and self.by_region:
+            group = self.region_index[(lang, region, service)]
+            out += [(i, "region") for i in self._pick(group, pos_region, self.by_region,
+                                                      lambda n: n[4] == city)]
+        if self.alt_services:
+            group = self.city_index[(lang, city)]
+            seen = {service}
+            def skip(n):
+                if n[6] in seen:
+                    return True
+                seen.add(n[6])
+                return False
+            out += [(i, "service") for i in self._pick(group, pos_city, self.alt_services, skip)]
+        return out
+
+    def neighbors(self, lang: str, key: str) -> List[Dict[str, str]]:
+        """Sąsiedzi strony w postaci dla szablonu: url, title, rel (region|service)."""
+        node_id = self.ids.get((lang, key))
+        if node_id is None:
+            return []
+        return [{"url": self.nodes[i][2], "title": self.nodes[i][3], "rel": rel}
+                for i, rel in self.neighbor_ids(node_id)]
+
+    # ------------------------------ RAPORT ------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        inbound = [0] * len(self.nodes)
+        edges: Dict[str, Dict[str, Any]] = {}
+        for node_id, node in enumerate(self.nodes):
+            nb = self.neighbor_ids(node_id)
+            for i, _ in nb:
+                inbound[i] += 1
+            edges.setdefault(node[0], {})[node[1]] = {
+                "url": node[2],
+                "region": [self.nodes[i][1] for i, rel in nb if rel == "region"],
+                "services": [self.nodes[i][1] for i, rel in nb if rel == "service"],
+            }
+        langs: Dict[str, Dict[str, int]] = {}
+        for node_id, node in enumerate(self.nodes):
+            st = langs.setdefault(node[0], {"pages": 0, "links": 0, "no_inbound": 0})
+            st["pages"] += 1
+            st["links"] += len(edges[node[0]][node[1]]["region"]) + len(edges[node[0]][node[1]]["services"])
+            st["no_inbound"] += inbound[node_id] == 0
+        return {
+            "version": GRAPH_VERSION,
+            "neighbors": {"byRegion": self.by_region, "altServices": self.alt_services},
+            "pages": len(self.nodes),
+            "langs": langs,
+            "graph": edges,
+        }
+
+    def write(self, path: Path, write: Optional[Callable[[Path, str], Any]] = None) -> Dict[str, Any]:
+        """``write(path, text)`` pozwala zapisać przez OutputSink builda (zapis tylko przy zmianie)."""
+        data = self.to_dict()
+        path = Path(path)
+        text = json.dumps(data, ensure_ascii=False, indent=1)
+        if write is not None:
+            write(path, text)
+            return data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, "utf-8")
+        return data
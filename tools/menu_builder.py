@@ -67,19 +67,20 @@ def _load_csv(p: Path) -> List[Dict[str, Any]]:
 
 def _load_xlsx(p: Path) -> List[Dict[str, Any]]:
     try:
-        import openpyxl  # optional
+        import cms_ingest  # snapshot sparsowanego workbooka (tools/cms_ingest.py)
+        _, sheet_rows = cms_ingest.load_sheets(p)[0]
     except ImportError as e:
-        raise SystemExit("Do odczytu XLSX zainstaluj: pip install openpyxl  — lub zapisz CMS jako JSON/CSV.") from e
-    wb = openpyxl.load_workbook(p, read_only=True, data_only=True)
-    ws = wb.worksheets[0]
-    headers = [str(c.value).strip() if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))]
+        # brak tools/cms_ingest.py albo jego zależności (openpyxl) — nazwa modułu z wyjątku
+        hint = "pip install openpyxl" if e.name == "openpyxl" else "tools/cms_ingest.py musi być obok menu_builder.py"
+        raise SystemExit(f"Do odczytu XLSX brakuje modułu '{e.name or e}' ({hint}) — lub zapisz CMS jako JSON/CSV.") from e
+    headers = [str(v).strip() if v is not None else "" for v in sheet_rows[0]]
     idx = {h:i for i,h in enumerate(headers)}
     req = ["lang","label","href","parent","order","col","enabled"]
     for r in req:
         if r not in idx:
             raise SystemExit(f"Brak kolumny '{r}' w {p.name}")
     rows = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
+    for row in sheet_rows[1:]:
         d = {h: row[idx[h]] for h in req}
         rows.append(d)
     return rows
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wykrywanie prawie-duplikatów stron (SimHash + LSH) dla tools/build.py.
+- simhash_batch(texts): 64-bitowe odciski tekstów; shingle po 3 słowa haszowane
+  blake2b, bity sumowane wektorowo w NumPy (bez NumPy — w czystym Pythonie,
+  wynik identyczny).
+- LshIndex: odciski dzielone na max_distance+1 pasm; para w odległości
+  Hamminga <= max_distance zgadza się na co najmniej jednym paśmie (zasada
+  szufladkowa), więc porównywane są tylko kandydaci z tych samych kubełków.
+- find_duplicates(): pary ponad seo.scoring.near_duplicate.simhash_threshold,
+  klastry (pierwsza strona w kolejności builda zostaje kanoniczna) i raport
+  dist/_reports/near-duplicates.json.
+Odciski liczy worker renderu z treści <main>; strony z cache biorą je z manifestu.
+"""
+from __future__ import annotations
+import hashlib, html as _html, json, math, re, struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opcjonalne
+    np = None
+
+BITS = 64
+SHINGLE = 3
+REPORT_VERSION = 1
+MAX_REPORTED_PAIRS = 5000
+
+_MAIN_RE = re.compile(r"<main\b[^>]*>(.*?)</main\s*>", re.I | re.S)
+_BODY_RE = re.compile(r"<body\b[^>]*>(.*?)</body\s*>", re.I | re.S)
+_DROP_RE = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>", re.I | re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+", re.U)
+_U64 = struct.Struct("<Q")
+
+# ------------------------------ ODCISKI ------------------------------
+def page_text(html: str) -> str:
+    """Tekst treści strony: <main> (albo <body>) bez skryptów i znaczników."""
+    m = _MAIN_RE.search(html) or _BODY_RE.search(html)
+    part = m.group(1) if m else html
+    return _html.unescape(_TAG_RE.sub(" ", _DROP_RE.sub(" ", part)))
+
+def shingles(text: str, size: int = SHINGLE) -> List[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def _digests(items: Iterable[str]) -> bytes:
+    return b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in items)
+
+def _simhash_py(raw: bytes) -> int:
+    """Akumulacja bitów bez NumPy: każdy bit hasza dostaje pole k bitów w jednym
+    dużym incie, więc sumowanie idzie po bajtach (tablica 256 wpisów), nie po bitach."""
+    n = len(raw) // 8
+    if not n:
+        return 0
+    k = n.bit_length() + 1
+    table = [sum(((b >> j) & 1) << (j * k) for j in range(8)) for b in range(256)]
+    acc = 0
+    for j in range(8):  # bajt j (little-endian) niesie bity 8j..8j+7
+        acc += sum(table[x] for x in raw[j::8]) << (j * 8 * k)
+    field = (1 << k) - 1
+    out = 0
+    for i in range(BITS):
+        if 2 * ((acc >> (i * k)) & field) > n:
+            out |= 1 << i
+    return out
+
+def simhash_batch(texts: Sequence[str]) -> List[int]:
+    """Odciski wielu tekstów naraz (jedno haszowanie i jedna akumulacja bitów na paczkę)."""
+    docs = [shingles(t) for t in texts]
+    raw = _digests(s for d in docs for s in d)
+    if np is None:
+        out, pos = [], 0
+        for d in docs:
+            out.append(_simhash_py(raw[pos:pos + 8 * len(d)]))
+            pos += 8 * len(d)
+        return out
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    lens = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+    starts = np.concatenate(([0], np.cumsum(lens)[:-1]))
+    nonempty = lens > 0
+    counts = np.zeros((len(docs), BITS), dtype=np.int64)
+    if bits.shape[0]:
+        counts[nonempty] = np.add.reduceat(bits.astype(np.int64), starts[nonempty], axis=0)
+    mask = (2 * counts > lens[:, None]).astype(np.uint8)
+    packed = np.packbits(mask, axis=1, bitorder="little").view("<u8").ravel()
+    return [int(v) for v in packed]
+
+def simhash(text: str) -> int:
+    return simhash_batch([text])[0]
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def max_distance(threshold: float, bits: int = BITS) -> int:
+    """Podobieństwo (1 - d/bits) >= threshold  ⇔  d <= max_distance."""
+    return max(0, math.floor(bits * (1.0 - float(threshold)) + 1e-9))
+
+# ------------------------------ LSH ------------------------------
+class LshIndex:
+    """Pasmowy indeks odcisków; ``unique_pairs()`` zwraca każdą bliską parę dokładnie raz."""
+
+    def __init__(self, max_dist: int, bits: int = BITS):
+        self.max_dist = max_dist
+        self.bits = bits
+        n = min(bits, max_dist + 1)
+        edges = [round(i * bits / n) for i in range(n + 1)]
+        self.bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self.fps: List[int] = []            # unikalne odciski
+        self.members: List[List[int]] = []  # id stron o danym odcisku
+        self._by_fp: Dict[int, int] = {}
+
+    def add(self, item: int, fp: int) -> None:
+        u = self._by_fp.get(fp)
+        if u is None:
+            u = self._by_fp[fp] = len(self.fps)
+            self.fps.append(fp)
+            self.members.append([])
+        self.members[u].append(item)
+
+    def _band_keys(self, fp: int) -> List[int]:
+        return [(fp >> lo) & mask for lo, mask in self.bands]
+
+    def unique_pairs(self) -> Iterator[Tuple[int, int, int]]:
+        """(u, v, odległość) dla różnych odcisków; para zgłaszana z pierwszego wspólnego pasma."""
+        keys = [self._band_keys(fp) for fp in self.fps]
+        for b in range(len(self.bands)):
+            buckets: Dict[int, List[int]] = {}
+            for u, k in enumerate(keys):
+                buckets.setdefault(k[b], []).append(u)
+            for group in buckets.values():
+                for i, u in enumerate(group):
+                    ku = keys[u]
+                    for v in group[i + 1:]:
+                        kv = keys[v]
+                        if any(ku[e] == kv[e] for e in range(b)):
+                            continue  # już zgłoszona z wcześniejszego pasma
+                        d = hamming(self.fps[u], self.fps[v])
+                        if d <= self.max_dist:
+                            yield u, v, d
+
+# ------------------------------ RAPORT ------------------------------
+def find_duplicates(pages: Sequence[Dict[str, Any]], threshold: float,
+                    max_pairs: int = MAX_REPORTED_PAIRS) -> Dict[str, Any]:
+    """``pages``: [{"url", "simhash", "lang", ...}] w kolejności builda.
+
+    Strony porównywane są w obrębie języka (tłumaczenia mają osobne adresy
+    i hreflang). Zwraca raport z parami (do ``max_pairs``), klastrami i listą ``duplicates``
+    — stron do wyłączenia z indeksu (wszystkie poza pierwszą w klastrze).
+    """
+    dist = max_distance(threshold)
+    indexes: Dict[Any, LshIndex] = {}
+    for i, p in enumerate(pages):
+        if p.get("simhash") is not None:
+            index = indexes.get(p.get("lang"))
+            if index is None:
+                index = indexes[p.get("lang")] = LshIndex(dist)
+            index.add(i, int(p["simhash"]))
+
+    parent = list(range(len(pages)))
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a: int, b: int) -> None:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)  # korzeń = najwcześniejsza strona
+
+    pairs: List[Dict[str, Any]] = []
+    def emit(a_ids: List[int], b_ids: Optional[List[int]], d: int) -> None:
+        for i, a in enumerate(a_ids):
+            for b in (a_ids[i + 1:] if b_ids is None else b_ids):
+                if len(pairs) >= max_pairs:
+                    return
+                x, y = min(a, b), max(a, b)
+                pairs.append({"a": pages[x]["url"], "b": pages[y]["url"],
+                              "similarity": round(1 - d / BITS, 4), "distance": d})
+
+    total = 0
+    for index in indexes.values():
+        for ids in index.members:  # identyczne odciski: m(m-1)/2 par bez wyliczania
+            total += len(ids) * (len(ids) - 1) // 2
+            for other in ids[1:]:
+                union(ids[0], other)
+            emit(ids, None, 0)
+        for u, v, d in index.unique_pairs():
+            mu, mv = index.members[u], index.members[v]
+            total += len(mu) * len(mv)
+            union(mu[0], mv[0])
+            emit(mu, mv, d)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(pages)):
+        r = find(i)
+        if r != i:
+            clusters.setdefault(r, [r]).append(i)
+    groups = sorted(clusters.values(), key=lambda m: m[0])
+    pairs.sort(key=lambda p: (p["a"], p["b"]))
+    return {
+        "version": REPORT_VERSION,
+        "threshold": threshold,
+        "max_distance": dist,
+        "pages": sum(1 for p in pages if p.get("simhash") is not None),
+        "pairs_count": total,
+        "pairs_truncated": total > len(pairs),
+        "pairs": pairs,
+        "clusters": [{"canonical": pages[m[0]]["url"], "duplicates": [pages[i]["url"] for i in m[1:]]}
+                     for m in groups],
+        "duplicates": [pages[i]["url"] for m in groups for i in m[1:]],
+    }
+
+def write_report(path: Path, report: Dict[str, Any], write: Optional[Callable[[Path, str], Any]] = None) -> None:
+    """``write(path, text)`` pozwala zapisać przez OutputSink builda (zapis tylko przy zmianie)."""
+    path = Path(path)
+    text = json.dumps(report, ensure_ascii=False, indent=1)
+    if write is not None:
+        write(path, text)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, "utf-8")
+
+# ------------------------------ NOINDEX ------------------------------
+_ROBOTS_RE = re.compile(r'(<meta name="robots" content=")(?:no)?index(,follow" */?>)')
+
+def set_noindex(html: str, noindex: bool) -> str:
+    """Przełącza meta robots z base.html między index,follow i noindex,follow."""
+    return _ROBOTS_RE.sub(lambda m: m.group(1) + ("noindex" if noindex else "index") + m.group(2), html, count=1)
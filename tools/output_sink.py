@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zapis plików dist/ dla tools/build.py — tylko to, co się zmieniło.
+- write(path, data): skrót treści (blake2b) porównywany ze skrótem z poprzedniego
+  builda (.build-cache/outputs.json, razem z mtime pliku). Gdy skrótu nie ma albo
+  plik zmienił się od tamtej pory (inny mtime, np. nadpisany przez kopię
+  assets/), porównywana jest treść pliku tej samej długości. Plik bez zmian nie
+  jest dotykany (mtime zostaje), więc rsync/CDN wysyłają tylko zmienione pliki.
+- Zapis idzie do małej puli wątków (BUILD_IO_THREADS, domyślnie 4): plik
+  tymczasowy w tym samym katalogu + os.replace, więc czytelnik nigdy nie widzi
+  połowy pliku, a render nie czeka na dysk. flush() czeka na wszystkie zapisy.
+- adopt(tmp, path): to samo dla pliku zapisanego strumieniowo obok (np. mapy
+  witryny .xml.gz) — bez trzymania całej treści w pamięci.
+- Katalogi: prepare() tworzy je hurtem przed renderem (każdy raz); przy zapisie
+  katalog zakładany jest dopiero, gdy otwarcie pliku się nie uda.
+- Pliki zapisane w poprzednim buildzie, których ten build nie zapisał ani nie
+  zachował (keep(): strony z cache), są usuwane przez remove_stale().
+Workery renderu mają własny OutputSink; take()/merge() przenoszą ich rekordy
+(ścieżka → skrót i mtime) i liczniki do sinka procesu głównego.
+"""
+from __future__ import annotations
+import filecmp, hashlib, json, os, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+STATE = Path(".build-cache") / "outputs.json"
+DEFAULT_THREADS = 4
+Record = List[Any]  # [skrót treści, mtime_ns pliku po zapisie]
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def load_state(path: Path = STATE) -> Dict[str, Record]:
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+class OutputSink:
+    """Zapis-jeśli-zmienione z pulą wątków I/O; ścieżki w rekordach są względne do ``root``."""
+
+    def __init__(self, root: Path, previous: Optional[Dict[str, Record]] = None, threads: Optional[int] = None):
+        self.root = Path(root)
+        self.previous = previous or {}
+        self.records: Dict[str, Record] = {}
+        self.counts = {"written": 0, "unchanged": 0, "deleted": 0}
+        if threads is None:
+            threads = int(os.getenv("BUILD_IO_THREADS", str(DEFAULT_THREADS)))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="out") if threads > 0 else None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self._dirs: set = set()
+
+    def rel(self, path: Union[str, Path]) -> Optional[str]:
+        """Ścieżka względna do ``root``; None dla plików spoza niego."""
+        p = Path(path)
+        try:
+            return p.relative_to(self.root).as_posix()
+        except ValueError:
+            pass
+        try:
+            return p.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def prepare(self, paths: Iterable[Union[str, Path]]) -> int:
+        """Tworzy hurtem katalogi dla ``paths`` (każdy raz); zwraca liczbę nowych."""
+        made = 0
+        for d in sorted({Path(p).parent for p in paths} - self._dirs):
+            d.mkdir(parents=True, exist_ok=True)
+            self._dirs.update((d, *d.parents))
+            made += 1
+        return made
+
+    # ------------------------------ zapis ------------------------------
+    def write(self, path: Union[str, Path], data: Union[str, bytes], expected: Optional[Record] = None) -> None:
+        """Zleca zapis; ``expected`` to znany rekord obecnego pliku (gdy brak — z tego
+        albo poprzedniego builda). Pliki spoza ``root`` są zapisywane, ale nie śledzone."""
+        rel = self.rel(path)
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        if expected is None and rel is not None:
+            expected = self.records.get(rel, self.previous.get(rel))
+        if self._pool is None:
+            self._write(Path(path), rel, raw, expected)
+            return
+        self._pending.append(self._pool.submit(self._write, Path(path), rel, raw, expected))
+        if len(self._pending) > 256:
+            self._reap()
+
+    def adopt(self, tmp: Union[str, Path], path: Union[str, Path]) -> bool:
+        """Gotowy plik tymczasowy (np. strumień gzip) zastępuje ``path`` tylko, gdy treść
+        się różni — inaczej jest usuwany. Synchronicznie; zwraca True, gdy zapisano."""
+        tmp, path = Path(tmp), Path(path)
+        rel = self.rel(path)
+        h = hashlib.blake2b(digest_size=16)
+        with open(tmp, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        expected = self.records.get(rel, self.previous.get(rel)) if rel is not None else None
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        unchanged = False
+        if st is not None and st.st_size == tmp.stat().st_size:
+            if expected and expected[1] == st.st_mtime_ns and expected[0]:
+                unchanged = expected[0] == digest
+            else:
+                unchanged = filecmp.cmp(tmp, path, shallow=False)
+        if unchanged:
+            tmp.unlink()
+        else:
+            os.replace(tmp, path)
+            st = path.stat()
+        if rel is not None:
+            with self._lock:
+                self.records[rel] = [digest, st.st_mtime_ns]
+                self.counts["unchanged" if unchanged else "written"] += 1
+        return not unchanged
+
+    def digest(self, path: Union[str, Path]) -> str:
+        """Skrót treści pliku zapisanego (albo zachowanego) w tym buildzie; "" gdy nieznany."""
+        rel = self.rel(path)
+        with self._lock:
+            rec = self.records.get(rel) if rel is not None else None
+        return rec[0] if rec else ""
+
+    def keep(self, path: Union[str, Path]) -> None:
+        """Plik zostaje bez zmian (np. strona z cache) — nie jest nieaktualny."""
+        rel = self.rel(path)
+        if rel is None:
+            return
+        with self._lock:
+            self.records[rel] = self.previous.get(rel) or ["", 0]
+
+    def _write(self, path: Path, rel: Optional[str], raw: bytes, expected: Optional[Record]) -> None:
+        digest = content_digest(raw)
+        unchanged = False
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_size == len(raw):
+            if expected and expected[1] == st.st_mtime_ns and expected[0]:
+                unchanged = expected[0] == digest
+            else:
+                unchanged = path.read_bytes() == raw
+        if not unchanged:
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                f = open(tmp, "wb")
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                f = open(tmp, "wb")
+            with f:
+                f.write(raw)
+            os.replace(tmp, path)
+            st = path.stat()
+        if rel is None:
+            return
+        with self._lock:
+            self.records[rel] = [digest, st.st_mtime_ns]
+            self.counts["unchanged" if unchanged else "written"] += 1
+
+    def _reap(self) -> None:
+        done = [f for f in self._pending if f.done()]
+        self._pending = [f for f in self._pending if not f.done()]
+        for f in done:
+            f.result()
+
+    def flush(self) -> None:
+        """Czeka na wszystkie zlecone zapisy (błąd zapisu jest zgłaszany tutaj)."""
+        pending, self._pending = self._pending, []
+        for f in pending:
+            f.result()
+
+    # ------------------------------ workery ------------------------------
+    def take(self) -> Tuple[Dict[str, Record], Dict[str, int]]:
+        """Rekordy i liczniki od ostatniego take() (po flush) — do przekazania z workera."""
+        self.flush()
+        with self._lock:
+            records, counts = self.records, self.counts
+            self.records = {}
+            self.counts = {k: 0 for k in counts}
+        return records, counts
+
+    def merge(self, data: Optional[Tuple[Dict[str, Record], Dict[str, int]]]) -> None:
+        if not data:
+            return
+        records, counts = data
+        with self._lock:
+            self.records.update(records)
+            for k, v in counts.items():
+                self.counts[k] += v
+
+    # ------------------------------ koniec builda ------------------------------
+    def stale(self, keep: Iterable[Union[str, Path]] = ()) -> Set[str]:
+        """Pliki poprzedniego builda, których ten build (jeszcze) nie zapisał ani nie zachował."""
+        self.flush()
+        return set(self.previous) - set(self.records) - {self.rel(p) for p in keep}
+
+    def remove_stale(self, keep: Iterable[Union[str, Path]] = ()) -> int:
+        """Usuwa pliki poprzedniego builda, których ten build nie zapisał (``keep``: zapisywane później)."""
+        removed = 0
+        for rel in sorted(self.stale(keep)):
+            path = self.root / rel
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+            parent = path.parent
+            while parent != self.root and parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+            self.previous.pop(rel, None)
+        self.counts["deleted"] += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        self.flush()
+        return dict(self.counts)
+
+    def close(self, state: Optional[Path] = STATE) -> None:
+        """Kończy zapisy i zapamiętuje skróty plików dla następnego builda."""
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if state is not None:
+            state = Path(state)
+            state.parent.mkdir(parents=True, exist_ok=True)
+            state.write_text(json.dumps(dict(sorted(self.records.items())), separators=(",", ":")), "utf-8")
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analiza wyrenderowanej strony dla tools/build.py — raz na stronę na build.
+- analyze(html): <title>, meta description, pierwszy <h1>, tekst <main> (albo
+  <body>), wszystkie linki strony, zasoby (src/srcset/href <link>), id kotwic,
+  linki i obrazy w treści, liczba słów — jeden skan regexem po dokumencie, bez
+  budowania drzewa DOM.
+- PageAnalysis niesie też to, co worker liczy na jej podstawie (simhash, ocena
+  SEO, autolinki). Korzystają z niej near-duplikaty, ocena SEO, indeks
+  wyszukiwarki i link-checker; żaden etap nie czyta już dist/ ponownie.
+- AnalysisStore: analizy w pamięci (do BUILD_ANALYSIS_MEMORY stron) i zawsze w
+  zwartym pliku .build-cache/analysis.jsonl (linia JSON na stronę). Strona z
+  cache builda przyrostowego kopiuje swoją linię z pliku poprzedniego builda
+  (offset i długość w manifeście), więc nie jest ani renderowana, ani parsowana.
+"""
+from __future__ import annotations
+import html as _html, json, os, re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SPILL = Path(".build-cache") / "analysis.jsonl"
+MAX_IN_MEMORY = 20000
+
+_MAIN_RE = re.compile(r"<main\b[^>]*>(.*?)</main\s*>", re.I | re.S)
+_BODY_RE = re.compile(r"<body\b[^>]*>(.*?)</body\s*>", re.I | re.S)
+_TOKEN_RE = re.compile(
+    r"<!--.*?-->|<[!?][^>]*>"                                   # komentarze, doctype
+    r"|<(script|style|noscript|template)\b([^>]*)>.*?</\1\s*>"  # bloki bez treści
+    r"|<(/?)([a-zA-Z][\w:-]*)([^>]*)>"                          # znaczniki
+    r"|[^<]+|<",                                                # tekst, samotne „<”
+    re.I | re.S)
+_ATTR_RE = re.compile(r"""\b([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_WORD_RE = re.compile(r"[^\W\d_]+", re.U)
+_SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "data:")
+# atrybuty z adresami zasobów (dla link-checkera); <script src> ma osobną gałąź
+_REF_ATTRS = {"link": ("href",), "img": ("src", "srcset"), "source": ("src", "srcset"), "video": ("src", "poster"),
+              "audio": ("src",), "iframe": ("src",), "embed": ("src",), "track": ("src",)}
+_NO_REF_RELS = {"preconnect", "dns-prefetch"}
+
+def attrs_of(raw: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for m in _ATTR_RE.finditer(raw):
+        out.setdefault(m.group(1).lower(), _html.unescape(next(g for g in m.groups()[1:] if g is not None)))
+    return out
+
+def _clean(parts: List[str]) -> str:
+    return " ".join(_html.unescape("".join(parts)).split())
+
+class PageAnalysis:
+    __slots__ = ("url", "lang", "title", "description", "h1", "text", "words", "unique_words", "links",
+                 "refs", "ids", "internal_links", "external_links", "images", "images_without_alt", "simhash", "seo", "autolinks")
+
+    def __init__(self, **kw: Any):
+        for k in self.__slots__:
+            setattr(self, k, kw.get(k))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PageAnalysis":
+        return cls(**data)
+
+def analyze(html: str, site_url: str = "", url: str = "", lang: str = "") -> PageAnalysis:
+    """Jeden skan dokumentu. Tekst treści to ten sam obszar co near_duplicates.page_text
+    (od pierwszego <main> do pierwszego </main>, inaczej <body>, inaczej całość)."""
+    region = _MAIN_RE.search(html) or _BODY_RE.search(html)
+    lo, hi = (region.start(1), region.end(1)) if region else (0, len(html))
+    site = (site_url or "").rstrip("/")
+    parts: List[str] = []
+    title: List[str] = []
+    h1: List[str] = []
+    in_title = h1_depth = 0
+    h1_done = False
+    description = ""
+    links: Dict[str, None] = {}
+    refs: Dict[str, None] = {}
+    ids: Dict[str, None] = {}
+    internal = set()
+    external = images = no_alt = 0
+    for t in _TOKEN_RE.finditer(html):
+        inside = lo <= t.start() < hi
+        name = t.group(4)
+        if name is None:
+            s = t.group(0)
+            if t.group(1) and t.group(1).lower() == "script" and "src" in t.group(2):
+                src = attrs_of(t.group(2)).get("src", "").strip()
+                if src:
+                    refs.setdefault(src, None)
+            if s.startswith("<"):
+                if inside:
+                    parts.append(" ")
+                continue
+            if inside:
+                parts.append(s)
+            if in_title:
+                title.append(s)
+            if h1_depth:
+                h1.append(s)
+            continue
+        if inside:
+            parts.append(" ")
+        name = name.lower()
+        closing = t.group(3) == "/"
+        raw = t.group(5)
+        if not closing and ("id=" in raw or (name == "a" and "name=" in raw)):
+            a = attrs_of(raw)
+            for key in ("id", "name") if name == "a" else ("id",):
+                if a.get(key):
+                    ids.setdefault(a[key], None)
+        if name == "title":
+            in_title = 0 if closing else (0 if title else 1)
+        elif name == "h1" and not h1_done:
+            if closing and h1_depth:
+                h1_depth -= 1
+                h1_done = h1_depth == 0
+            elif not closing:
+                h1_depth += 1
+        elif closing:
+            continue
+        elif name == "meta" and not description:
+            a = attrs_of(raw)
+            if a.get("name", "").lower() == "description":
+                description = a.get("content", "")
+        elif name == "a":
+            href = attrs_of(raw).get("href", "").strip()
+            if not href:
+                continue
+            links.setdefault(href, None)
+            if not inside or href.startswith("#") or href.lower().startswith(_SKIP_SCHEMES):
+                continue
+            if site and href.startswith(site):
+                href = href[len(site):] or "/"
+            if href.startswith("//") or "://" in href.split("?", 1)[0]:
+                external += 1
+            else:
+                internal.add(href.split("#", 1)[0])
+        elif name in _REF_ATTRS:
+            a = attrs_of(raw)
+            if name == "link" and _NO_REF_RELS & set(a.get("rel", "").lower().split()):
+                continue
+            for key in _REF_ATTRS[name]:
+                value = a.get(key, "").strip()
+                # srcset: „adres deskryptor, adres deskryptor”
+                for ref in (c.split()[0] for c in value.split(",") if c.strip()) if key == "srcset" else (value,):
+                    if ref:
+                        refs.setdefault(ref, None)
+            if name == "img" and inside:
+                images += 1
+                if not a.get("alt", "").strip():
+                    no_alt += 1
+    text = _clean(parts)
+    words = _WORD_RE.findall(text.lower())
+    return PageAnalysis(
+        url=url, lang=lang, title=_clean(title), description=" ".join(description.split()), h1=_clean(h1),
+        text=text, words=len(words), unique_words=len(set(words)), links=list(links), refs=list(refs), ids=list(ids),
+        internal_links=len(internal), external_links=external, images=images, images_without_alt=no_alt,
+    )
+
+# ------------------------------ MAGAZYN ------------------------------
+class AnalysisStore:
+    """Analizy stron w kolejności builda: pamięć + plik spill (zawsze zapisywany)."""
+
+    def __init__(self, path: Path = SPILL, max_in_memory: Optional[int] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if max_in_memory is None:
+            max_in_memory = int(os.getenv("BUILD_ANALYSIS_MEMORY", str(MAX_IN_MEMORY)))
+        self.max_in_memory = max_in_memory
+        self.items: Optional[List[PageAnalysis]] = []
+        self.count = 0
+        self._tmp = self.path.with_suffix(".jsonl.new")
+        self._out = open(self._tmp, "wb")
+        self._prev = open(self.path, "rb") if self.path.exists() else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, analysis: PageAnalysis) -> Tuple[int, int]:
+        """Dopisuje analizę; zwraca (offset, długość) linii w pliku tego builda."""
+        return self._keep(analysis, (json.dumps(analysis.to_dict(), ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def previous(self, ref: Any, url: str) -> Optional[Tuple[PageAnalysis, Tuple[int, int]]]:
+        """Analiza strony z cache: linia ``ref`` (offset, długość) z pliku poprzedniego
+        builda, przepisana do bieżącego; None, gdy linii nie ma albo dotyczy innej strony."""
+        if self._prev is None or not isinstance(ref, list) or len(ref) != 2:
+            return None
+        self._prev.seek(ref[0])
+        raw = self._prev.read(ref[1])
+        try:
+            analysis = PageAnalysis.from_dict(json.loads(raw))
+        except (ValueError, TypeError):
+            return None
+        if analysis.url != url or not raw.endswith(b"\n"):
+            return None
+        return analysis, self._keep(analysis, raw)
+
+    def has_previous(self) -> bool:
+        return self._prev is not None
+
+    def _keep(self, analysis: PageAnalysis, raw: bytes) -> Tuple[int, int]:
+        ref = (self._out.tell(), len(raw))
+        self._out.write(raw)
+        self.count += 1
+        if self.items is not None:
+            if len(self.items) < self.max_in_memory:
+                self.items.append(analysis)
+            else:
+                self.items = None  # duży build: dalej czytamy z pliku
+        return ref
+
+    def close(self) -> None:
+        """Kończy zapis; plik tego builda zastępuje poprzedni (offsety z manifestu wskazują na niego)."""
+        if self._out.closed:
+            return
+        self._out.close()
+        if self._prev is not None:
+            self._prev.close()
+            self._prev = None
+        self._tmp.replace(self.path)
+
+    def __iter__(self) -> Iterator[PageAnalysis]:
+        if self.items is not None:
+            yield from self.items
+            return
+        if not self._out.closed:
+            self._out.flush()
+        with open(self.path if self._out.closed else self._tmp, "rb") as f:
+            for line in f:
+                yield PageAnalysis.from_dict(json.loads(line))
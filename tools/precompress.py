@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prekompresja plików tekstowych dist/ dla tools/build.py (etap po buildzie).
+- Każdy plik tekstowy (TEXT_EXTENSIONS) dostaje obok siebie .br (Brotli,
+  quality 11) i .gz (gzip 9, nagłówek bez nazwy i czasu) — serwer (gzip_static,
+  brotli_static, CDN) wysyła gotowy plik zamiast kompresować przy każdym żądaniu.
+  Wariant nie mniejszy od oryginału nie jest zapisywany.
+- Pomijane: _reports/, _manifest.json, pliki już skompresowane (.gz, .br).
+- Plik, którego rozmiar i mtime albo skrót treści (blake2b) nie zmienił się od
+  poprzedniego builda, nie jest kompresowany ponownie, o ile jego warianty wciąż
+  istnieją (stan: .build-cache/precompress.json). Warianty usuniętych plików
+  są usuwane.
+- Kompresja w puli procesów (jobs > 1 i więcej niż kilka plików).
+- Raport: bajty surowe / gzip / brotli per typ pliku (_reports/compression.json).
+Brotli jest opcjonalne (pakiet Brotli); bez niego powstają tylko pliki .gz.
+"""
+from __future__ import annotations
+import gzip, hashlib, json, os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli opcjonalne
+    brotli = None
+
+STATE = Path(".build-cache") / "precompress.json"
+TEXT_EXTENSIONS = (".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".txt", ".svg", ".webmanifest", ".map")
+EXCLUDE = ("_reports/", "_manifest.json")
+FORMATS = ("br", "gz")
+POOL_MIN_FILES = 16
+
+def available_formats(wanted: Sequence[str] = FORMATS) -> Tuple[str, ...]:
+    return tuple(f for f in wanted if f == "gz" or (f == "br" and brotli is not None))
+
+def _compress(data: bytes, fmt: str) -> bytes:
+    if fmt == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def compress_file(root: str, rel: str, formats: Sequence[str]) -> Tuple[str, str, int, Dict[str, int]]:
+    """Zapisuje warianty jednego pliku; zwraca (rel, skrót, rozmiar, {format: rozmiar albo 0 = pominięty})."""
+    path = Path(root) / rel
+    data = path.read_bytes()
+    sizes: Dict[str, int] = {}
+    for fmt in formats:
+        packed = _compress(data, fmt)
+        sibling = path.with_name(f"{path.name}.{fmt}")
+        if len(packed) < len(data):
+            _write(sibling, packed)
+            sizes[fmt] = len(packed)
+        else:
+            sibling.unlink(missing_ok=True)
+            sizes[fmt] = 0
+    return rel, hashlib.blake2b(data, digest_size=16).hexdigest(), len(data), sizes
+
+def _compress_many(root: str, rels: Sequence[str], formats: Sequence[str]) -> List[Tuple[str, str, int, Dict[str, int]]]:
+    return [compress_file(root, rel, formats) for rel in rels]
+
+def _digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def text_files(root: Path, extensions: Iterable[str] = TEXT_EXTENSIONS, exclude: Iterable[str] = EXCLUDE) -> List[str]:
+    root = Path(root)
+    extensions, exclude = tuple(extensions), tuple(exclude)
+    out: List[str] = []
+    for dirpath, _, names in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for n in names:
+            rel = prefix + n
+            if n.lower().endswith(extensions) and not rel.startswith(exclude) and not n.endswith(".tmp"):
+                out.append(rel)
+    return sorted(out)
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) and data.get("formats") else {}
+
+def run(root: Path, jobs: int = 1, formats: Sequence[str] = FORMATS, state_path: Optional[Path] = STATE,
+        extensions: Iterable[str] = TEXT_EXTENSIONS) -> Dict[str, Any]:
+    """Kompresuje zmienione pliki tekstowe pod ``root``; zwraca raport (per typ + liczniki)."""
+    root = Path(root)
+    formats = available_formats(formats)
+    state = _load(state_path) if state_path else {}
+    known: Dict[str, List[Any]] = state.get("files", {})
+    prev = known if state.get("formats") == list(formats) else {}
+    files: Dict[str, List[Any]] = {}  # rel → [rozmiar, mtime_ns, skrót, {format: rozmiar}]
+    todo: List[str] = []
+    for rel in text_files(root, extensions):
+        path = root / rel
+        st = path.stat()
+        old = prev.get(rel)
+        fresh = bool(old) and all(not size or (root / f"{rel}.{fmt}").exists() for fmt, size in old[3].items())
+        if fresh and old[:2] == [st.st_size, st.st_mtime_ns]:
+            files[rel] = old
+        elif fresh and old[0] == st.st_size and old[2] == _digest(path):
+            files[rel] = [st.st_size, st.st_mtime_ns, old[2], old[3]]  # ta sama treść, nowy mtime (np. kopia assets/)
+        else:
+            todo.append(rel)
+    if jobs > 1 and len(todo) >= POOL_MIN_FILES:
+        chunk = max(1, len(todo) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_compress_many, str(root), todo[i:i + chunk], formats)
+                       for i in range(0, len(todo), chunk)]
+            results = [r for f in futures for r in f.result()]
+    else:
+        results = _compress_many(str(root), todo, formats)
+    for rel, digest, size, sizes in results:
+        files[rel] = [size, (root / rel).stat().st_mtime_ns, digest, sizes]
+    # warianty plików, których już nie ma
+    removed = 0
+    for rel in set(known) - set(files):
+        for fmt, size in known[rel][3].items():
+            if size:
+                try:
+                    (root / f"{rel}.{fmt}").unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    if state_path:
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(state_path).write_text(json.dumps({"formats": list(formats), "files": files}, separators=(",", ":")), "utf-8")
+    return report(files, formats, compressed=len(results), removed=removed)
+
+def report(files: Dict[str, List[Any]], formats: Sequence[str], compressed: int = 0, removed: int = 0) -> Dict[str, Any]:
+    by_type: Dict[str, Dict[str, int]] = {}
+    total = {"files": 0, "raw": 0, **{fmt: 0 for fmt in formats}}
+    for rel, (size, _, _, sizes) in sorted(files.items()):
+        ext = os.path.splitext(rel)[1].lower() or "(none)"
+        row = by_type.setdefault(ext, {"files": 0, "raw": 0, **{fmt: 0 for fmt in formats}})
+        for acc in (row, total):
+            acc["files"] += 1
+            acc["raw"] += size
+            for fmt in formats:
+                acc[fmt] += sizes.get(fmt) or size  # bez wariantu serwer wysyła oryginał
+    return {"formats": list(formats), "brotli_available": brotli is not None, "compressed": compressed,
+            "unchanged": len(files) - compressed, "removed": removed, "total": total,
+            "by_type": dict(sorted(by_type.items()))}
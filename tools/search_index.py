@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indeks wyszukiwarki na stronie (odwrócony, w kawałkach) dla tools/build.py.
+- Źródło: analizy stron z renderu (page_analysis) — tytuł, H1, opis, tekst
+  <main>; dist/ nie jest czytany ponownie.
+- Tokeny: słowa [^\\W_]+ po złożeniu (NFKD bez znaków diakrytycznych, casefold,
+  ł→l itd.), min. MIN_LEN znaków. Klient indeksu musi składać zapytanie tak samo.
+- Waga termu w dokumencie = Σ tf × waga pola (title/h1 3, opis 2, tekst 1),
+  obcięta do MAX_WEIGHT. Listy dokumentów: rosnące id kodowane różnicowo,
+  płasko [Δid, waga, Δid, waga, …].
+- Kawałki po prefiksie termu: mały indeks to jeden kawałek (klucz ""); kawałek
+  większy niż SHARD_POSTINGS dzieli się na prefiksy o znak dłuższe (term równy
+  prefiksowi zostaje w rodzicu). Klient bierze najdłuższy klucz z meta.json
+  będący prefiksem słowa i pobiera tylko ten plik.
+- Dokumenty (ścieżka, tytuł, opis) osobno, paczkami po DOCS_PER_FILE.
+Układ: dist/search/<lang>/meta.json, t-<n>.json (termy), d-<n>.json (dokumenty).
+Strona nie ma jeszcze pola wyszukiwania: indeks jest dla odbiorców zewnętrznych
+(widżety, aplikacje), którzy pobierają go z /search/<lang>/.
+"""
+from __future__ import annotations
+import json, re, unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+VERSION = 1
+MIN_LEN = 2
+MAX_WEIGHT = 255
+SHARD_POSTINGS = 20000
+DOCS_PER_FILE = 500
+FIELDS = (("title", 3), ("h1", 3), ("description", 2), ("text", 1))
+_TOKEN_RE = re.compile(r"[^\W_]+", re.U)
+_EXTRA = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "ı": "i", "æ": "ae", "œ": "oe"})
+
+@lru_cache(maxsize=1 << 16)
+def fold(word: str) -> str:
+    """Postać indeksu: bez diakrytyków i wielkości liter („Łódź” → „lodz”, „Straße” → „strasse”)."""
+    s = "".join(c for c in unicodedata.normalize("NFKD", word) if not unicodedata.combining(c))
+    return s.casefold().translate(_EXTRA)
+
+def tokens(text: str) -> List[str]:
+    return [t for t in (fold(w) for w in _TOKEN_RE.findall(text or "")) if len(t) >= MIN_LEN]
+
+class LangIndex:
+    """Indeks jednego języka budowany dokument po dokumencie."""
+
+    def __init__(self, lang: str):
+        self.lang = lang
+        self.docs: List[Tuple[str, str, str]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)  # term → [id, waga, id, waga, …]
+
+    def add(self, path: str, fields: Dict[str, str]) -> int:
+        doc = len(self.docs)
+        weights: Dict[str, int] = defaultdict(int)
+        for name, w in FIELDS:
+            for t in tokens(fields.get(name) or ""):
+                weights[t] += w
+        for t, w in weights.items():
+            lst = self.postings[t]
+            lst.append(doc)
+            lst.append(min(w, MAX_WEIGHT))
+        self.docs.append((path, fields.get("title") or fields.get("h1") or "", fields.get("description") or ""))
+        return doc
+
+    def shards(self, limit: int = SHARD_POSTINGS) -> Dict[str, List[str]]:
+        """Prefiks → posortowane termy; prefiksy wydłużane, dopóki kawałek jest za duży."""
+        out: Dict[str, List[str]] = {}
+        todo: List[Tuple[str, List[str]]] = [("", sorted(self.postings))]
+        while todo:
+            prefix, terms = todo.pop()
+            size = sum(len(self.postings[t]) // 2 for t in terms)
+            if size <= limit or all(len(t) == len(prefix) for t in terms):
+                out[prefix] = terms
+                continue
+            groups: Dict[str, List[str]] = defaultdict(list)
+            for t in terms:
+                groups[t[:len(prefix) + 1]].append(t)
+            own = groups.pop(prefix, [])  # termy równe prefiksowi zostają w rodzicu
+            if own:
+                out[prefix] = own
+            todo.extend(groups.items())
+        return dict(sorted(out.items()))
+
+    @staticmethod
+    def encode(postings: List[int]) -> List[int]:
+        """[id, waga, …] (id rosnąco) → [Δid, waga, …]."""
+        out: List[int] = []
+        prev = 0
+        for i in range(0, len(postings), 2):
+            out.append(postings[i] - prev)
+            out.append(postings[i + 1])
+            prev = postings[i]
+        return out
+
+    def files(self, limit: int = SHARD_POSTINGS, per_file: int = DOCS_PER_FILE) -> Dict[str, Any]:
+        """Nazwa pliku → zawartość (meta.json, t-<n>.json, d-<n>.json)."""
+        files: Dict[str, Any] = {}
+        shard_names: Dict[str, str] = {}
+        for n, (prefix, terms) in enumerate(self.shards(limit).items()):
+            name = f"t-{n}.json"
+            shard_names[prefix] = name
+            files[name] = {t: self.encode(self.postings[t]) for t in terms}
+        for n in range(0, len(self.docs), per_file):
+            files[f"d-{n // per_file}.json"] = [list(d) for d in self.docs[n:n + per_file]]
+        files["meta.json"] = {
+            "version": VERSION, "lang": self.lang, "docs": len(self.docs), "docs_per_file": per_file,
+            "terms": len(self.postings), "min_len": MIN_LEN, "fields": dict(FIELDS), "shards": shard_names,
+        }
+        return files
+
+def build(pages: Iterable[Any], langs: Iterable[str]) -> Dict[str, LangIndex]:
+    """Indeksy per język z analiz stron (atrybuty url, lang, title, h1, description, text)."""
+    out = {L: LangIndex(L) for L in langs}
+    for page in pages:
+        idx = out.get(page.lang)
+        if idx is not None:
+            idx.add(page.url, {"title": page.title, "h1": page.h1, "description": page.description, "text": page.text})
+    return out
+
+def write(indexes: Dict[str, LangIndex], write_file: Callable[[Any, str], None], root: Any) -> Dict[str, Dict[str, int]]:
+    """Zapisuje pliki indeksów przez ``write_file(ścieżka, tekst)``; zwraca statystyki per język."""
+    stats: Dict[str, Dict[str, int]] = {}
+    for L, idx in indexes.items():
+        if not idx.docs:
+            continue
+        files = idx.files()
+        for name, data in files.items():
+            write_file(root / L / name, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        stats[L] = {"docs": len(idx.docs), "terms": len(idx.postings), "shards": len(files["meta.json"]["shards"])}
+    return stats
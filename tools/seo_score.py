@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ocena SEO stron według seo.scoring z pages.yml dla tools/build.py.
+- Wejściem jest page_analysis.PageAnalysis strony (tekst <main>, linki
+  wewnętrzne i zewnętrzne, obrazy i te bez alt) — HTML nie jest skanowany drugi raz.
+- score_page(): gęstość frazy kluczowej (density.min_pct–max_pct), unikalne
+  słowa, linki wewnętrzne i obrazy (coverage.*) → wynik 0–100 + lista problemów.
+- ScoreReport: agregat do dist/_reports/seo-scores.json oraz metryki
+  thin_content_count i keyword_density_outside_range (reports.metrics).
+Ocena działa w workerze renderu (bez ponownego czytania dist/); strony
+z cache biorą wynik z zapisanej analizy.
+"""
+from __future__ import annotations
+import json, re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+REPORT_VERSION = 1
+DEFAULT_RULES = {
+    "primary_field": "primary_keywords",
+    "min_pct": 0.5,
+    "max_pct": 2.0,
+    "min_unique_words": 200,
+    "min_internal_links": 3,
+    "min_images": 1,
+}
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.U)
+_KW_SPLIT_RE = re.compile(r"[,;|\n]+")
+
+def rules(cfg: Dict[str, Any], site_url: str = "") -> Optional[Dict[str, Any]]:
+    """Progi z seo.scoring; None, gdy ocena jest wyłączona."""
+    sc = (cfg.get("seo", {}) or {}).get("scoring", {}) or {}
+    if not sc.get("enabled", False):
+        return None
+    density = sc.get("density", {}) or {}
+    coverage = sc.get("coverage", {}) or {}
+    r = dict(DEFAULT_RULES)
+    r["primary_field"] = (sc.get("fields", {}) or {}).get("primary") or r["primary_field"]
+    r["min_pct"] = float(density.get("min_pct", r["min_pct"]))
+    r["max_pct"] = float(density.get("max_pct", r["max_pct"]))
+    for k in ("min_unique_words", "min_internal_links", "min_images"):
+        r[k] = int(coverage.get(k, r[k]))
+    r["site_url"] = (site_url or "").rstrip("/")
+    return r
+
+# ------------------------------ OCENA ------------------------------
+def page_keywords(ctx: Dict[str, Any], rule: Dict[str, Any]) -> List[str]:
+    """Frazy z pola primary strony; bez nich — najmocniejszy term TF-IDF."""
+    raw = (ctx.get("page") or {}).get(rule["primary_field"]) or ctx.get(rule["primary_field"])
+    if isinstance(raw, str):
+        raw = _KW_SPLIT_RE.split(raw)
+    kws = [str(k).strip() for k in (raw or []) if str(k).strip()]
+    return kws or list((ctx.get("tfidf") or {}).get("keywords", [])[:1])
+
+def _phrase_count(words: Sequence[str], phrase: Sequence[str]) -> int:
+    n = len(phrase)
+    if n == 1:
+        return words.count(phrase[0])
+    first = phrase[0]
+    return sum(1 for i, w in enumerate(words) if w == first and list(words[i:i + n]) == list(phrase))
+
+def score_page(page: "page_analysis.PageAnalysis", keywords: Sequence[str], rule: Dict[str, Any], found: Any = None) -> Dict[str, Any]:
+    """Wynik strony: 100 × odsetek spełnionych reguł (gęstość liczona, gdy jest fraza).
+
+    ``found`` (keyword_automaton.PageKeywords) to trafienia automatu fraz w tym
+    samym tekście analizy: daje pokrycie fraz, kandydatów autolinków i — gdy fraza
+    strony jest wzorcem automatu — jej liczbę wystąpień bez osobnego skanu.
+    """
+    words = _WORD_RE.findall(page.text.lower())
+    unique = page.unique_words
+    issues: List[str] = []
+    checks = 3
+    keyword = next((k for k in keywords if _WORD_RE.search(k)), None)
+    density = None
+    if keyword is not None:
+        checks += 1
+        n = found.count(keyword) if found is not None else None
+        if n is None:
+            n = _phrase_count(words, _WORD_RE.findall(keyword.lower()))
+        density = round(100.0 * n / len(words), 2) if words else 0.0
+        if density < rule["min_pct"]:
+            issues.append("keyword_density_low")
+        elif density > rule["max_pct"]:
+            issues.append("keyword_density_high")
+    if unique < rule["min_unique_words"]:
+        issues.append("thin_content")
+    if page.internal_links < rule["min_internal_links"]:
+        issues.append("few_internal_links")
+    if page.images < rule["min_images"]:
+        issues.append("few_images")
+    return {
+        "score": round(100 * (checks - len(issues)) / checks),
+        "words": len(words),
+        "unique_words": unique,
+        "keyword": keyword,
+        "density_pct": density,
+        "internal_links": page.internal_links,
+        "external_links": page.external_links,
+        "images": page.images,
+        "images_without_alt": page.images_without_alt,
+        "issues": issues,
+        **({"keywords": found.summary(), "autolink_candidates": len(found.autolink_candidates())}
+           if found is not None else {}),
+    }
+
+# ------------------------------ RAPORT ------------------------------
+class ScoreReport:
+    """Zbiera wyniki stron w kolejności builda; ``metrics()`` dla reports.metrics."""
+
+    def __init__(self, rule: Optional[Dict[str, Any]]):
+        self.rule = rule
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.issues: Counter = Counter()
+        self.total = 0
+
+    def add(self, url: str, lang: str, score: Optional[Dict[str, Any]]) -> None:
+        if score is None:
+            return
+        self.pages[url] = {"lang": lang, **score}
+        self.issues.update(score["issues"])
+        self.total += score["score"]
+
+    def metrics(self) -> Dict[str, Optional[int]]:
+        if self.rule is None:
+            return {"thin_content_count": None, "keyword_density_outside_range": None}
+        return {
+            "thin_content_count": self.issues["thin_content"],
+            "keyword_density_outside_range": self.issues["keyword_density_low"] + self.issues["keyword_density_high"],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        rule = {k: v for k, v in (self.rule or {}).items() if k != "site_url"}
+        return {
+            "version": REPORT_VERSION,
+            "enabled": self.rule is not None,
+            "rules": rule,
+            "pages_count": len(self.pages),
+            "average_score": round(self.total / len(self.pages), 1) if self.pages else None,
+            **self.metrics(),
+            "issues": dict(sorted(self.issues.items())),
+            "pages": self.pages,
+        }
+
+    def write(self, path: Path, write: Optional[Callable[[Path, str], Any]] = None) -> Dict[str, Any]:
+        """``write(path, text)`` pozwala zapisać przez OutputSink builda (zapis tylko przy zmianie)."""
+        data = self.to_dict()
+        path = Path(path)
+        text = json.dumps(data, ensure_ascii=False, indent=1)
+        if write is not None:
+            write(path, text)
+            return data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, "utf-8")
+        return data
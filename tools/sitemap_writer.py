@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Strumieniowy zapis map witryny dla tools/build.py.
+- Wpisy <url> idą od razu do strumienia gzip (sitemap-N.xml.gz), więc w pamięci
+  jest tylko bieżący wpis. Nowa paczka zaczyna się po max_urls adresach (maks.
+  50 000) albo zanim nieskompresowany XML przekroczyłby max_bytes (50 MB).
+- Nagłówek gzip bez nazwy pliku i czasu (mtime=0): ta sama treść = te same bajty,
+  więc OutputSink.adopt() nie rusza niezmienionych paczek.
+- lastmod wpisu podaje build (czas ostatniej zmiany skrótu treści strony);
+  lastmod paczki w indeksie sitemap.xml = najnowszy lastmod jej adresów.
+- changefreq/priority z sitemap.changefreq_by_type / priority_by_type (pages.yml)
+  według typu strony; typ bez wpisu = bez elementu.
+"""
+from __future__ import annotations
+import gzip, os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+          '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">\n')
+FOOTER = "</urlset>"
+
+def url_entry(loc: str, lastmod: str = "", changefreq: str = "", priority: Optional[float] = None,
+              alternates: Optional[Dict[str, str]] = None) -> str:
+    lines = ["  <url>", f"    <loc>{escape(loc)}</loc>"]
+    if lastmod:
+        lines.append(f"    <lastmod>{escape(lastmod)}</lastmod>")
+    if changefreq:
+        lines.append(f"    <changefreq>{escape(changefreq)}</changefreq>")
+    if priority is not None:
+        lines.append(f"    <priority>{float(priority):.1f}</priority>")
+    for L, href in (alternates or {}).items():
+        lines.append(f'    <xhtml:link rel="alternate" hreflang={quoteattr(L)} href={quoteattr(href)}/>')
+    lines.append("  </url>\n")
+    return "\n".join(lines)
+
+class SitemapWriter:
+    """Paczki ``sitemap-N.xml.gz`` pod ``root``; ``commit(tmp, path)`` umieszcza gotowy plik (np. OutputSink.adopt)."""
+
+    def __init__(self, root: Path, site_url: str, max_urls: int = MAX_URLS, max_bytes: int = MAX_BYTES,
+                 commit: Optional[Callable[[Path, Path], Any]] = None, compresslevel: int = 6):
+        self.root = Path(root)
+        self.site_url = site_url.rstrip("/")
+        self.max_urls = max(1, min(MAX_URLS, int(max_urls)))
+        self.max_bytes = min(MAX_BYTES, int(max_bytes))
+        self.commit = commit or (lambda tmp, path: os.replace(tmp, path))
+        self.compresslevel = compresslevel
+        self.shards: List[Tuple[str, str]] = []  # (adres paczki, lastmod)
+        self.urls = 0
+        self._raw = self._gz = None
+        self._count = self._bytes = 0
+        self._lastmod = ""
+
+    def _open(self) -> None:
+        name = f"sitemap-{len(self.shards) + 1}.xml.gz"
+        self._path = self.root / name
+        self._tmp = self.root / f".{name}.{os.getpid()}.tmp"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._raw = open(self._tmp, "wb")
+        self._gz = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0, compresslevel=self.compresslevel)
+        self._gz.write(HEADER.encode("utf-8"))
+        self._count, self._bytes, self._lastmod = 0, len(HEADER.encode("utf-8")), ""
+
+    def _close_shard(self) -> None:
+        self._gz.write(FOOTER.encode("utf-8"))
+        self._gz.close()
+        self._raw.close()
+        self._gz = self._raw = None
+        self.commit(self._tmp, self._path)
+        self.shards.append((f"{self.site_url}/{self._path.name}", self._lastmod))
+
+    def add(self, loc: str, lastmod: str = "", changefreq: str = "", priority: Optional[float] = None,
+            alternates: Optional[Dict[str, str]] = None) -> None:
+        data = url_entry(loc, lastmod, changefreq, priority, alternates).encode("utf-8")
+        if self._gz is not None and (self._count >= self.max_urls
+                                     or self._bytes + len(data) + len(FOOTER) > self.max_bytes):
+            self._close_shard()
+        if self._gz is None:
+            self._open()
+        self._gz.write(data)
+        self._count += 1
+        self._bytes += len(data)
+        self._lastmod = max(self._lastmod, lastmod or "")
+        self.urls += 1
+
+    def close(self) -> List[Tuple[str, str]]:
+        """Zamyka ostatnią paczkę (pusta mapa = jedna pusta paczka); zwraca wpisy indeksu."""
+        if self._gz is None and not self.shards:
+            self._open()
+        if self._gz is not None:
+            self._close_shard()
+        return self.shards
+
+def index_xml(shards: List[Tuple[str, str]]) -> str:
+    idx = ['<?xml version="1.0" encoding="UTF-8"?>',
+           '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for loc, lastmod in shards:
+        mod = f"<lastmod>{escape(lastmod)}</lastmod>" if lastmod else ""
+        idx.append(f"  <sitemap><loc>{escape(loc)}</loc>{mod}</sitemap>")
+    idx.append("</sitemapindex>")
+    return "\n".join(idx)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Szablony Jinja kompilowane z wyprzedzeniem (AOT) dla tools/build.py.
+- precompile(env): kompiluje nieaktualne szablony z templates/ do modułów
+  Pythona w .build-cache/templates (Environment.compile_templates) i zapisuje
+  index.json ze stanem źródeł (mtime, rozmiar, sha256) z chwili kompilacji.
+- AotLoader: ładuje moduł, gdy źródło się nie zmieniło; gdy szablon jest
+  nowszy (albo konfiguracja Jinja inna), wraca do źródła przez FileSystemLoader.
+- bytecode_cache(): trwały FileSystemBytecodeCache dla szablonów ładowanych ze źródła.
+Moduły importowane są zwykłym importem, więc Python trzyma też ich .pyc —
+worker nie lexuje ani nie kompiluje base.html/page.html/_partials/header.html.
+
+  python tools/template_aot.py [templates] [--clear]
+"""
+from __future__ import annotations
+import hashlib, json, os, shutil, sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import jinja2
+from jinja2 import BaseLoader, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader, TemplateNotFound
+
+CACHE_DIR = Path(".build-cache")
+AOT_DIR = CACHE_DIR / "templates"
+BYTECODE_DIR = CACHE_DIR / "jinja-bytecode"
+INDEX = "index.json"
+AOT_VERSION = 1
+AOT_ENV = "BUILD_TEMPLATE_AOT"
+
+def enabled() -> bool:
+    return os.getenv(AOT_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def _stamp(path: Path) -> Dict[str, Any]:
+    st = path.stat()
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": _sha256(path)}
+
+def env_key(env: jinja2.Environment) -> str:
+    """Odcisk opcji wpływających na wygenerowany kod (bez autoescape — ten jest per szablon)."""
+    opts = (
+        jinja2.__version__, sys.version_info[:2],
+        env.block_start_string, env.block_end_string, env.variable_start_string,
+        env.variable_end_string, env.comment_start_string, env.comment_end_string,
+        env.line_statement_prefix, env.line_comment_prefix, env.trim_blocks,
+        env.lstrip_blocks, env.newline_sequence, env.keep_trailing_newline,
+        env.optimized, sorted(env.extensions),
+    )
+    return hashlib.sha256(repr(opts).encode("utf-8")).hexdigest()
+
+def _autoescape(env: jinja2.Environment, name: str) -> bool:
+    return bool(env.autoescape(name) if callable(env.autoescape) else env.autoescape)
+
+# ------------------------------ LOADER ------------------------------
+class AotLoader(BaseLoader):
+    """ModuleLoader z automatycznym powrotem do źródła dla zmienionych szablonów.
+
+    ``get_source``/``list_templates`` idą do FileSystemLoader, więc analiza
+    zależności szablonów (build_cache.template_deps) działa bez zmian.
+    """
+
+    has_source_access = True
+
+    def __init__(self, searchpath: Path, compiled: Path = AOT_DIR):
+        self.searchpath = Path(searchpath)
+        self.compiled = Path(compiled)
+        self.source = FileSystemLoader(str(self.searchpath))
+        self.modules = ModuleLoader(str(self.compiled))
+        self.index = _read_index(self.compiled)
+        self.hits = 0
+        self.fallbacks = 0
+
+    def reload_index(self) -> None:
+        self.index = _read_index(self.compiled)
+
+    def get_source(self, environment, template):
+        return self.source.get_source(environment, template)
+
+    def list_templates(self) -> List[str]:
+        return self.source.list_templates()
+
+    def is_fresh(self, environment, name: str) -> bool:
+        rec = self.index.get("templates", {}).get(name)
+        if not rec or self.index.get("env") != env_key(environment):
+            return False
+        if rec.get("autoescape") != _autoescape(environment, name):
+            return False
+        path = self.searchpath / name
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if (st.st_mtime_ns, st.st_size) == (rec.get("mtime_ns"), rec.get("size")):
+            return True
+        # mtime zmienia się np. po checkout — liczy się treść
+        return st.st_size == rec.get("size") and _sha256(path) == rec.get("sha256")
+
+    def load(self, environment, name, globals=None):
+        if self.is_fresh(environment, name):
+            try:
+                tpl = self.modules.load(environment, name, globals)
+                self.hits += 1
+                return tpl
+            except TemplateNotFound:
+                pass
+        self.fallbacks += 1
+        return self.source.load(environment, name, globals)
+
+def _read_index(compiled: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads((Path(compiled) / INDEX).read_text("utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == AOT_VERSION else {}
+
+def loader(templates: Path) -> BaseLoader:
+    return AotLoader(templates) if enabled() else FileSystemLoader(str(templates))
+
+def bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    if not enabled():
+        return None
+    BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(str(BYTECODE_DIR))
+
+# ------------------------------ KOMPILACJA ------------------------------
+def precompile(env: jinja2.Environment, templates: Optional[Path] = None,
+               target: Path = AOT_DIR) -> Tuple[int, int]:
+    """Kompiluje szablony nieaktualne względem index.json; zwraca (skompilowane, aktualne)."""
+    lo = env.loader
+    if templates is None:
+        sp = getattr(lo, "searchpath", "templates")
+        templates = sp[0] if isinstance(sp, (list, tuple)) else sp
+    templates = Path(templates)
+    target = Path(target)
+    index = _read_index(target)
+    key = env_key(env)
+    if index.get("env") != key:
+        index = {}
+    known: Dict[str, Any] = index.get("templates", {})
+    check = AotLoader(templates, target)
+    check.index = {"env": key, "templates": known}
+    names = FileSystemLoader(str(templates)).list_templates()
+    stale = [n for n in names if not (check.is_fresh(env, n) and (target / ModuleLoader.get_module_filename(n)).exists())]
+    if stale:
+        target.mkdir(parents=True, exist_ok=True)
+        for n in stale:  # stary moduł nie może przeżyć nieudanej kompilacji
+            (target / ModuleLoader.get_module_filename(n)).unlink(missing_ok=True)
+        todo = set(stale)
+        env.compile_templates(str(target), zip=None, filter_func=todo.__contains__,
+                              log_function=lambda _msg: None, ignore_errors=True)
+    templates_out = {}
+    for n in names:
+        if not (target / ModuleLoader.get_module_filename(n)).exists():
+            continue  # błąd składni — szablon zostaje ładowany ze źródła
+        if n in known and n not in stale:
+            templates_out[n] = known[n]
+        else:
+            templates_out[n] = {**_stamp(templates / n), "autoescape": _autoescape(env, n)}
+    target.mkdir(parents=True, exist_ok=True)
+    tmp = target / (INDEX + ".tmp")
+    tmp.write_text(json.dumps({"version": AOT_VERSION, "env": key, "templates": templates_out},
+                              ensure_ascii=False, indent=1), "utf-8")
+    tmp.replace(target / INDEX)
+    if isinstance(lo, AotLoader):
+        lo.reload_index()
+    return len(stale), len(names) - len(stale)
+
+def clear(target: Path = AOT_DIR) -> None:
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.rmtree(BYTECODE_DIR, ignore_errors=True)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Prekompilacja szablonów Jinja do .build-cache/templates")
+    ap.add_argument("templates", nargs="?", default="templates")
+    ap.add_argument("--clear", action="store_true", help="usuń skompilowane moduły i bytecode cache")
+    args = ap.parse_args(argv)
+    if args.clear:
+        clear()
+        print(f"[aot] cleared {AOT_DIR} {BYTECODE_DIR}")
+        return 0
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import build
+    env = build.make_env(build.build_context().cfg, Path(args.templates))
+    compiled, fresh = precompile(env, Path(args.templates))
+    print(f"[aot] compiled={compiled} fresh={fresh} -> {AOT_DIR}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
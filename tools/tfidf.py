@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Korpusowy model TF-IDF stron (osobno dla każdego języka) dla tools/build.py.
+- Macierz term × dokument jest rzadka: słownik termów → id, a dokument to
+  dwie tablice array('I') (id termów, liczności) + skrót tekstu.
+- Przyrostowo: dokument o niezmienionym tekście nie jest ponownie tokenizowany,
+  a częstości dokumentowe (df) są korygowane tylko o zmienione strony.
+  Stan trzymany jest w .build-cache/tfidf.json.gz.
+- keywords(): top-k termów strony (tf = 1 + log n, idf wygładzone);
+  related(): strony o wspólnych termach z top-k (indeks odwrócony), wynik
+  deterministyczny (remisy po kluczu).
+"""
+from __future__ import annotations
+import gzip, hashlib, heapq, json, math, re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE = Path(".build-cache") / "tfidf.json.gz"
+MODEL_VERSION = 1
+TOP_K = 8
+RELATED_K = 5
+RELATED_TERMS = 4   # related() pyta o najmocniejsze termy strony…
+MAX_POSTINGS = 64   # …i ogląda najwyżej tyle stron na term (najwyższe wagi pierwsze)
+
+_WORD_RE = re.compile(r"[^\W\d_]{3,}", re.U)
+STOPWORDS = {
+    "pl": set("""aby ale albo ani bez był była było były być będzie czy dla dlaczego gdy gdzie jak jaki jest
+        jestem już lub może można nad nas nie nich nim oraz jej jego ich nam one ono pod przez przy się tak
+        tam też tego tej ten tym które który która które więc wraz według jako kiedy także tylko żeby""".split()),
+    "en": set("""and are but for from has have how into its not our that the their then there these this
+        those was were what when where which who will with you your can all any more also""".split()),
+    "de": set("""aber als auch auf aus bei bis das dass dem den der des die ein eine einer eines für hat
+        ist mit nach nicht oder sich sie sind und von vor wie wir zum zur über""".split()),
+}
+
+def tokenize(text: str, lang: str = "") -> List[str]:
+    stop = STOPWORDS.get(lang, ())
+    return [w for w in _WORD_RE.findall((text or "").lower()) if w not in stop]
+
+def _text_digest(text: str) -> str:
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=12).hexdigest()
+
+# ------------------------------ MODEL ------------------------------
+class LangModel:
+    """Korpus jednego języka: słownik, df i rzadkie wiersze dokumentów."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.df: List[int] = []
+        self.docs: Dict[str, Tuple[str, array, array]] = {}
+        self._idf: Optional[List[float]] = None
+        self._top: Optional[Dict[str, List[Tuple[int, float]]]] = None
+        self._postings: Optional[Dict[int, List[Tuple[str, float]]]] = None
+
+    def _term_id(self, term: str) -> int:
+        tid = self.vocab.get(term)
+        if tid is None:
+            tid = self.vocab[term] = len(self.terms)
+            self.terms.append(term)
+            self.df.append(0)
+        return tid
+
+    def _invalidate(self) -> None:
+        self._idf = self._top = self._postings = None
+
+    def set_doc(self, key: str, digest: str, ids: array, counts: array) -> None:
+        old = self.docs.get(key)
+        if old is not None:
+            for tid in old[1]:
+                self.df[tid] -= 1
+        for tid in ids:
+            self.df[tid] += 1
+        self.docs[key] = (digest, ids, counts)
+        self._invalidate()
+
+    def update(self, key: str, text: str, lang: str = "") -> bool:
+        """Wstawia/aktualizuje dokument; False, gdy tekst się nie zmienił."""
+        digest = _text_digest(text)
+        old = self.docs.get(key)
+        if old is not None and old[0] == digest:
+            return False
+        tf = Counter(self._term_id(t) for t in tokenize(text, lang))
+        ids = array("I", sorted(tf))
+        self.set_doc(key, digest, ids, array("I", (tf[i] for i in ids)))
+        return True
+
+    def remove(self, key: str) -> None:
+        old = self.docs.pop(key, None)
+        if old is not None:
+            for tid in old[1]:
+                self.df[tid] -= 1
+            self._invalidate()
+
+    def idf(self) -> List[float]:
+        if self._idf is None:
+            n = len(self.docs)
+            self._idf = [math.log((1 + n) / (1 + d)) + 1.0 for d in self.df]
+        return self._idf
+
+    def weights(self, key: str) -> List[Tuple[int, float]]:
+        """Znormalizowane (L2) wagi tf-idf dokumentu."""
+        doc = self.docs.get(key)
+        if doc is None:
+            return []
+        idf = self.idf()
+        w = [(tid, (1.0 + math.log(c)) * idf[tid]) for tid, c in zip(doc[1], doc[2])]
+        norm = math.sqrt(sum(x * x for _, x in w)) or 1.0
+        return [(tid, x / norm) for tid, x in w]
+
+    def top(self, key: str, k: int = TOP_K) -> List[Tuple[int, float]]:
+        if self._top is None:
+            self._top = {}
+        hit = self._top.get(key)
+        if hit is None or len(hit) < k:
+            terms = self.terms
+            hit = self._top[key] = heapq.nsmallest(k, self.weights(key), key=lambda tw: (-tw[1], terms[tw[0]]))
+        return hit[:k]
+
+    def keywords(self, key: str, k: int = TOP_K) -> List[str]:
+        return [self.terms[tid] for tid, _ in self.top(key, k)]
+
+    def related(self, key: str, k: int = RELATED_K, top_k: int = TOP_K) -> List[str]:
+        """Strony o najwyższej sumie iloczynów wag wspólnych termów z top-k.
+
+        Listy stron per term są posortowane malejąco po wadze i przycięte, więc
+        koszt zapytania nie zależy od liczby stron w korpusie.
+        """
+        if self._postings is None:
+            postings: Dict[int, List[Tuple[str, float]]] = {}
+            for other in self.docs:
+                for tid, w in self.top(other, top_k):
+                    postings.setdefault(tid, []).append((other, w))
+            for tid, lst in postings.items():
+                lst.sort(key=lambda ow: (-ow[1], ow[0]))
+                del lst[MAX_POSTINGS + 1:]  # +1: sama strona też bywa na liście
+            self._postings = postings
+        scores: Dict[str, float] = {}
+        shared = [(tid, w) for tid, w in self.top(key, top_k) if self.df[tid] > 1]  # df=1: nikt inny
+        for tid, w in shared[:RELATED_TERMS]:
+            for other, w2 in self._postings.get(tid, ()):
+                if other != key:
+                    scores[other] = scores.get(other, 0.0) + w * w2
+        return [o for o, _ in heapq.nsmallest(k, scores.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+    # -------------------------- serializacja --------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        """Zapis z kompaktowaniem słownika (termy o df=0 znikają)."""
+        remap: Dict[int, int] = {}
+        terms: List[str] = []
+        for tid, d in enumerate(self.df):
+            if d > 0:
+                remap[tid] = len(terms)
+                terms.append(self.terms[tid])
+        return {
+            "terms": terms,
+            "docs": {key: [dg, [remap[t] for t in ids], list(cnt)] for key, (dg, ids, cnt) in self.docs.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LangModel":
+        m = cls()
+        m.terms = list(data.get("terms", []))
+        m.vocab = {t: i for i, t in enumerate(m.terms)}
+        m.df = [0] * len(m.terms)
+        for key, (dg, ids, cnt) in data.get("docs", {}).items():
+            m.set_doc(key, dg, array("I", ids), array("I", cnt))
+        return m
+
+class Corpus:
+    """Modele per język + liczniki aktualizacji z bieżącego builda."""
+
+    def __init__(self, langs: Optional[Dict[str, LangModel]] = None):
+        self.langs: Dict[str, LangModel] = langs or {}
+        self.seen: Dict[str, set] = {}
+        self.updated = 0
+        self.reused = 0
+
+    def model(self, lang: str) -> LangModel:
+        m = self.langs.get(lang)
+        if m is None:
+            m = self.langs[lang] = LangModel()
+        return m
+
+    def update(self, lang: str, key: str, text: str) -> None:
+        self.seen.setdefault(lang, set()).add(key)
+        if self.model(lang).update(key, text, lang):
+            self.updated += 1
+        else:
+            self.reused += 1
+
+    def prune(self) -> int:
+        """Usuwa dokumenty, których nie było w tym buildzie; zwraca ich liczbę."""
+        removed = 0
+        for lang, m in list(self.langs.items()):
+            seen = self.seen.get(lang, set())
+            for key in [k for k in m.docs if k not in seen]:
+                m.remove(key)
+                removed += 1
+            if not m.docs:
+                del self.langs[lang]
+        return removed
+
+    def keywords(self, lang: str, key: str, k: int = TOP_K) -> List[str]:
+        m = self.langs.get(lang)
+        return m.keywords(key, k) if m else []
+
+    def related(self, lang: str, key: str, k: int = RELATED_K) -> List[str]:
+        m = self.langs.get(lang)
+        return m.related(key, k) if m else []
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {L: {"docs": len(m.docs), "terms": sum(1 for d in m.df if d > 0)} for L, m in sorted(self.langs.items())}
+
+    def save(self, path: Path = CACHE) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"version": MODEL_VERSION, "langs": {L: m.to_dict() for L, m in self.langs.items()}},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = CACHE) -> "Corpus":
+        try:
+            with gzip.open(Path(path), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != MODEL_VERSION:
+            return cls()
+        return cls({L: LangModel.from_dict(d) for L, d in data.get("langs", {}).items()})